@@ -74,7 +74,7 @@ class Globals(QObject):
         if self.thread_pool_executor is not None and max_workers > self._thread_pool_executor_max_workers:
             logger.info(
                 f"thread pool max_workers not enough, reset max_workers {self._thread_pool_executor_max_workers} -> {max_workers}")
-            self.shutdown_task_executor()
+            self.shutdown_thread_pool_executor()
 
         if self.thread_pool_executor is None:
             logger.info(f"create thread pool executor, max_workers: {max_workers}")
@@ -1,18 +1,30 @@
+import time
+
 from ok import Logger, BaseScene
+from src.utils.ScenePredicates import ScenePredicates
 
 logger = Logger.get_logger(__name__)
 
+# 谓词耗时统计的日志输出间隔 (秒)
+STATS_LOG_INTERVAL = 60
+
 
-class DNAScene(BaseScene):
+class DNAScene(BaseScene, ScenePredicates):
+    """
+    每帧共享的场景模型。
+
+    各触发任务通过 in_team / interact_prompt / prompt(kind, box) 查询共享谓词 (见 ScenePredicates)，
+    同一帧内每个谓词只求值一次，结果在所有触发任务间共享；执行器每次截新帧 (reset_scene) 时清空。
+    """
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._in_team = None
+        BaseScene.__init__(self, *args, **kwargs)
+        ScenePredicates.__init__(self)
+        self._last_stats_log = time.time()
 
     def reset(self):
-        self._in_team = None
-
-    def in_team(self, fun):
-        if self._in_team is None:
-            self._in_team = fun()
-        return self._in_team
+        self.clear()
+        if time.time() - self._last_stats_log >= STATS_LOG_INTERVAL:
+            self._last_stats_log = time.time()
+            if self.stats:
+                logger.debug(f"scene predicates: {self.summary()}")
@@ -79,7 +79,7 @@ class AutoDefence(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             self.open_in_mission_menu()
 
         while True:
-            if self.in_team():
+            if self.poll_in_team():
                 self.handle_in_mission()
 
             _status = self.handle_mission_interface(stop_func=self.stop_func)
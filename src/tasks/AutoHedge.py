@@ -1,11 +1,11 @@
 from qfluentwidgets import FluentIcon
 import time
 import re
-import cv2
 
 from ok import Logger, TaskDisabledException
 from src.tasks.CommissionsTask import CommissionsTask, QuickMoveTask, Mission, _default_movement
 from src.tasks.BaseCombatTask import BaseCombatTask
+from src.tasks.BaseDNATask import IN_TEAM_MAX_AGE
 from src.tasks.DNAOneTimeTask import DNAOneTimeTask
 from src.tasks.trigger.AutoRouletteTask import AutoRouletteTask
 from src.tasks.trigger.AutoMazeTask import AutoMazeTask
@@ -15,6 +15,15 @@ logger = Logger.get_logger(__name__)
 DEFAULT_ACTION_TIMEOUT = 10
 
 
+def parse_percent(texts):
+    """进度 OCR 结果 "xx%" -> int；无法识别时返回 None。"""
+    if texts and "%" in texts[0].name:
+        name = texts[0].name.replace("%", "")
+        if name.isdigit():
+            return int(name)
+    return None
+
+
 class AutoHedge(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
 
     def __init__(self, *args, **kwargs):
@@ -46,7 +55,6 @@ class AutoHedge(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
 
         self.track_point_pos = 0
         self.mission_complete = False
-        self.ocr_future = None
         self.last_ocr_result = -1
         self.roulette_task = None
         self.maze_task = None
@@ -92,7 +100,7 @@ class AutoHedge(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             self.open_in_mission_menu()
 
         while True:
-            if self.in_team():
+            if self.poll_in_team():
                 self.handle_in_mission()
             else:
                 self.roulette_task.run()
@@ -117,7 +125,8 @@ class AutoHedge(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         self.current_round = 0
         self.track_point_pos = 0
         self.mission_complete = False
-        self.ocr_future = None
+        self.ocr_service.reset('serum_process')
+        self.change_gate.invalidate('serum_ocr')
         self.last_ocr_result = -1
 
     def init_for_next_round(self):
@@ -202,29 +211,25 @@ class AutoHedge(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
                 self.runtime_state["in_progress"] = True
 
     def get_serum_process_info(self):
-        if self.ocr_future and self.ocr_future.done():
-            texts = self.ocr_future.result()
-            self.ocr_future = None
-            if texts and "%" in texts[0].name:
-                name = texts[0].name.replace("%", "")
-                if name.isdigit():
-                    pct = int(name)
-                    if pct > self.last_ocr_result and pct <= 100:
-                        self.last_ocr_result = pct
-                        # self.info_set("进度", f"{pct}%")
-            return self.last_ocr_result
-        if self.ocr_future is None:
+        if 'serum_process' not in self.ocr_service.regions:
             box = self.box_of_screen_scaled(2560, 1440, 115, 399, 217, 461, name="process_info", hcenter=True)
-            frame = self.frame.copy()
-            self.ocr_future = self.thread_pool_executor.submit(self.ocr, frame=frame, box=box, match=re.compile(r"\d+%"))
+            self.ocr_service.register('serum_process', box, match=re.compile(r"\d+%"), parse=parse_percent,
+                                      interval=0, digits=True)
+        self.when_changed('serum_ocr', lambda: self.ocr_service.update(self.frame, names=('serum_process',)),
+                          roi=self.ocr_service.regions['serum_process'].box)
+        pct = self.ocr_service.value('serum_process')
+        if pct is not None and self.last_ocr_result < pct <= 100:
+            self.last_ocr_result = pct
+            # self.info_set("进度", f"{pct}%")
         return self.last_ocr_result
 
     def find_top_right_track_pos(self):
-        box = self.box_of_screen_scaled(2560, 1440, 2183, 82, 2414, 140, name="track_point", hcenter=True)
-        template = cv2.resize(self.get_feature_by_name("track_point").mat, None, fx=0.79, fy=0.79,
-                              interpolation=cv2.INTER_LINEAR)
+        search_box = self.box_of_screen_scaled(2560, 1440, 2183, 82, 2414, 140, name="track_point", hcenter=True)
         ret = -1
-        box = self.find_track_point(box=box, template=template, filter_track_color=True)
+        # 罗盘区域无变化时沿用上次的追踪点位置；结果驱动移动，最多沿用 IN_TEAM_MAX_AGE 秒
+        box = self.when_changed('track_point', lambda: self.find_track_point(box=search_box, template_scale=0.79,
+                                                                              filter_track_color=True),
+                                roi=search_box, max_age=IN_TEAM_MAX_AGE)
         if box is not None:
             ret = box.x
         return ret
@@ -51,7 +51,7 @@ class AutoSkill(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         self.init_all()
         self.wait_until(self.in_team, time_out=30)
         while True:
-            if self.in_team():
+            if self.poll_in_team():
                 self.skill_tick()
                 self.aim_shoot_tick()
             else:
@@ -1,3 +1,4 @@
+import threading
 import time
 from typing import Protocol, Callable, Union
 import numpy as np
@@ -12,6 +13,15 @@ from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
 
 from ok import BaseTask, Box, Logger, color_range_to_bound, run_in_new_thread, og, GenshinInteraction, PyDirectInteraction
+from src.utils.ChangeGate import ChangeGate
+from src.utils.FrameCache import FrameCache
+from src.utils.FrameSampler import FrameSampler
+from src.utils.IconArea import IconAreaMatcher
+from src.utils.DigitReader import DigitReader
+from src.utils.OcrService import OcrService
+from src.utils.PromptDetector import PromptDetector
+from src.utils.MacroEngine import MacroPlayer, OP_KEY_DOWN, OP_KEY_UP, OP_MOUSE_DOWN, OP_MOUSE_UP, OP_MOVE
+from src.utils.PrecisionTimer import PrecisionTimer
 
 logger = Logger.get_logger(__name__)
 f_black_color = {
@@ -20,6 +30,13 @@ f_black_color = {
     'b': (0, 20)  # Blue range
 }
 
+# 截图设备不保证线程安全 (如桌面复制)，后台截图线程与任务线程的 next_frame 共用这把锁
+_capture_lock = threading.Lock()
+
+# poll_in_team 沿用上次结果的最长时间 (秒)：约为主循环 1~2 次轮询 (0.1~0.2 秒)，
+# 离开队伍界面后过期的 "在队伍中" 最多让技能/射击/寻路多执行一轮
+IN_TEAM_MAX_AGE = 0.2
+
 class Ticker(Protocol):
     """
     技能循环计时器接口。
@@ -78,6 +95,12 @@ class BaseDNATask(BaseTask):
         self._logged_in = False
         self.hold_lalt = False
         self.sensitivity_config = self.get_global_config('Game Sensitivity Config')  # 游戏灵敏度配置
+        self.detection_cache = FrameCache()
+        self.ultimate_icon_matcher = IconAreaMatcher()
+        self._track_templates = {}
+        self.change_gate = ChangeGate()
+        self.digit_readers = {}
+        self.prompt_detectors = {}
 
     @property
     def f_search_box(self) -> Box:
@@ -101,6 +124,120 @@ class BaseDNATask(BaseTask):
     def shared_frame(self, value):
         og.my_app.shared_frame = value
 
+    def next_frame(self):
+        """与后台截图线程互斥地获取下一帧 (见 grab_frame)。"""
+        with _capture_lock:
+            return super().next_frame()
+
+    def grab_frame(self, timeout=0.1):
+        """
+        在后台截图线程中截取一帧，锁被占用超过 timeout 秒或当前无法截图时返回 None。
+
+        不经过 executor 的 next_frame：它会重置 scene 并替换任务线程正在使用的帧，只能在任务线程调用。
+        因此采到的帧不会成为 self.frame，也不会送入 executor 的模糊遮罩处理。
+        截图设备与任务线程的 next_frame 用同一把锁互斥；ok 内部的截图 (wait_until、sleep_check 等)
+        不经过这把锁，所以采样线程只应运行在任务自己掌控截图的阶段 (宏播放、溜鱼循环)，
+        这些阶段内任务线程只通过 next_frame 截图。
+        """
+        if not _capture_lock.acquire(timeout=timeout):
+            return None
+        try:
+            if not self.executor.can_capture():
+                return None
+            return self.executor.method.get_frame()
+        finally:
+            _capture_lock.release()
+
+    def create_frame_sampler(self, fps) -> FrameSampler:
+        """
+        创建后台截图线程，采到的帧直接写入 shared_frame，不经过 next_frame (见 grab_frame)。
+        """
+
+        def publish(frame):
+            self.shared_frame = frame
+
+        return FrameSampler(self.grab_frame, fps, on_frame=publish)
+
+    def create_roi_sampler(self, box: Box, fps=240) -> FrameSampler:
+        """
+        创建只订阅 box 区域的截图线程：每次截图只拷贝区域裁剪图，
+        截图设备返回同一帧对象 (画面未更新) 时不发布。截图方式与限制见 grab_frame。
+
+        Args:
+            box (Box): 订阅区域。
+            fps (float): 截图频率上限。
+        """
+        last_frame = None
+
+        def grab():
+            nonlocal last_frame
+            frame = self.grab_frame()
+            if frame is None or frame is last_frame:
+                return None
+            last_frame = frame
+            return box.crop_frame(frame).copy()
+
+        return FrameSampler(grab, fps)
+
+    def create_ocr_service(self) -> OcrService:
+        """
+        创建异步 OCR 服务，识别在线程池中进行，任务只读取最新结果。
+        """
+
+        def run_ocr(crop, region):
+            # crop 为该区域的裁剪图，返回的坐标相对于裁剪图
+            if region.digits:
+                return self.read_digits(region.name, match=region.match, frame=crop,
+                                        frame_processor=region.frame_processor)
+            return self.ocr(frame=crop, match=region.match, frame_processor=region.frame_processor)
+
+        def on_error(region, e):
+            logger.error(f"ocr {region.name} error", e)
+
+        def submit(fn, *args):
+            return self.thread_pool_executor.submit(fn, *args)
+
+        return OcrService(submit, run_ocr, on_error=on_error)
+
+    def read_digits(self, name, box=None, match=None, frame=None, frame_processor=None):
+        """
+        读取固定位置、固定字体的数字 (波次、轮次、进度等)，返回值与 ocr 相同。
+
+        先用该区域已学习的字形做最近邻识别；未校准、置信度不足或不符合 match 时回退到完整 OCR，
+        并用 OCR 结果继续学习字形。box 为 None 时 frame 本身即为数字区域的裁剪图。
+        """
+        if frame is None:
+            frame = self.frame
+        if box is None:
+            crop = frame
+            box = Box(0, 0, frame.shape[1], frame.shape[0])
+        else:
+            crop = box.crop_frame(frame)
+        if frame_processor is not None:
+            crop = frame_processor(crop)
+        reader = self.digit_readers.get(name)
+        if reader is None:
+            reader = self.digit_readers[name] = DigitReader()
+        result = reader.read(crop)
+        if result is not None and (match is None or match.search(result[0])):
+            return [Box(box.x, box.y, box.width, box.height, result[1], result[0])]
+        texts = self.ocr(frame=frame, box=box, match=match, frame_processor=frame_processor)
+        if len(texts) == 1:
+            reader.learn(crop, texts[0].name)
+        return texts
+
+    def detect_prompt(self, name, box, match, frame=None) -> bool:
+        """
+        检测固定位置的按键提示 (如 "space")，只在遇到新画面时才用 OCR 确认。
+        """
+        detector = self.prompt_detectors.get(name)
+        if detector is None:
+            detector = self.prompt_detectors[name] = PromptDetector(
+                lambda crop: self.ocr(frame=crop, match=match))
+        if frame is None:
+            frame = self.frame
+        return detector.check(box.crop_frame(frame))
+
     @cached_property
     def genshin_interaction(self):
         """
@@ -119,22 +256,67 @@ class BaseDNATask(BaseTask):
         # 确保引用的是正确的类
         return PyDirectInteraction(self.executor.interaction.capture, self.hwnd)
 
+    def find_one(self, feature_name=None, horizontal_variance=0, vertical_variance=0, threshold=0,
+                 use_gray_scale=False, box=None, canny_lower=0, canny_higher=0, frame_processor=None, template=None,
+                 mask_function=None, frame=None, screenshot=False, **kwargs) -> Box | None:
+        """
+        同一帧上参数相同的查找直接复用结果。
+
+        传入 frame_processor / template / mask_function 或需要截图保存时不缓存。
+        """
+
+        def compute():
+            return super(BaseDNATask, self).find_one(
+                feature_name, horizontal_variance=horizontal_variance, vertical_variance=vertical_variance,
+                threshold=threshold, use_gray_scale=use_gray_scale, box=box, canny_lower=canny_lower,
+                canny_higher=canny_higher, frame_processor=frame_processor, template=template,
+                mask_function=mask_function, frame=frame, screenshot=screenshot, **kwargs)
+
+        if frame_processor is not None or template is not None or mask_function is not None or screenshot:
+            return compute()
+        if frame is None:
+            frame = self.frame
+        if isinstance(box, Box):
+            box_key = (box.x, box.y, box.width, box.height)
+        else:
+            box_key = box
+        key = (feature_name, box_key, threshold, horizontal_variance, vertical_variance, use_gray_scale,
+               canny_lower, canny_higher, tuple(sorted(kwargs.items())))
+        return self.detection_cache.get(frame, key, compute)
+
+    def when_changed(self, key, compute, roi=None, frame=None, max_age=None):
+        """
+        区域画面自上次求值后没有变化时直接返回上次结果，否则调用 compute() 重新检测。
+
+        Args:
+            key (str): 检测名称。
+            compute (callable): 无参检测函数，应基于 self.frame / frame 求值。
+            roi (Box | tuple | list, optional): 检测依赖的区域，Box 或 (x1, y1, x2, y2)，或它们的列表；默认整帧。
+        """
+        if frame is None:
+            frame = self.frame
+        if roi is not None:
+            rois = roi if isinstance(roi, list) else [roi]
+            roi = [(r.x, r.y, r.x + r.width, r.y + r.height) if isinstance(r, Box) else r for r in rois]
+        return self.change_gate.get(key, frame, compute, roi=roi, max_age=max_age)
+
     def in_team(self, frame=None) -> bool:
         _frame = self.frame if frame is None else frame
         if self.find_one('lv_text', frame=frame, threshold=0.8):
             return True
-        # start_time = time.perf_counter()
-        mat = self.get_feature_by_name("ultimate_key_icon").mat
-        mat2 = self.get_box_by_name("ultimate_key_icon").crop_frame(_frame)
-        max_area1 = invert_max_area_only(mat)[2]
-        max_area2 = invert_max_area_only(mat2)[2]
-        result = False
-        if max_area1 > 0:
-            if abs(max_area1 - max_area2) / max_area1 < 0.15:
-                result = True
-        # elapsed = time.perf_counter() - start_time
-        # logger.debug(f"in_team check took {elapsed:.4f} seconds.")
-        return result
+        template = self.get_feature_by_name("ultimate_key_icon").mat
+        crop = self.get_box_by_name("ultimate_key_icon").crop_frame(_frame)
+        return self.ultimate_icon_matcher.matches(template, crop)
+
+    def poll_in_team(self, max_age=IN_TEAM_MAX_AGE):
+        """
+        主循环轮询用的 in_team：等级文字与终结技图标区域无变化时沿用上次结果。
+        进出队伍界面时这两块区域变化很大，会立即重新判断；结果驱动按键输入，复用时间限制在 1~2 次轮询内。
+        需要逐帧结果的地方仍调用 in_team。
+        """
+        return self.when_changed('in_team', self.in_team,
+                                 roi=[self.get_box_by_name('lv_text'), self.get_box_by_name('ultimate_key_icon')],
+                                 max_age=max_age)
 
     def in_team_and_world(self):
         return self.in_team()
@@ -280,20 +462,49 @@ class BaseDNATask(BaseTask):
         return ret
 
     def find_track_point(self, threshold: float = 0, box: Box | None = None, template=None, frame_processor=None,
-                         mask_function=None, filter_track_color=False) -> Box | None:
-        frame = None
+                         mask_function=None, filter_track_color=False, template_scale=1.0) -> Box | None:
+        """
+        Args:
+            filter_track_color (bool): 只保留追踪点颜色后再匹配；过滤只作用于搜索区域，不处理整帧。
+            template_scale (float): 未传 template 时使用按该比例缩放后的 track_point 模板 (结果会被缓存)。
+        """
         if box is None:
             box = self.box_of_screen_scaled(2560, 1440, 454, 265, 2110, 1094, name="find_track_point", hcenter=True)
         # if isinstance(box, Box):
         #     self.draw_boxes(box.name, box, "blue")
-        if filter_track_color:
-            if template is None:
-                template = self.get_feature_by_name("track_point").mat
+        if template is None:
+            if filter_track_color or template_scale != 1.0:
+                template = self.get_track_template(template_scale, filter_track_color)
+        elif filter_track_color:
             template = color_filter(template, track_point_color)
-            frame = color_filter(self.frame, track_point_color)
-        return self.find_one("track_point", threshold=threshold, box=box, template=template, frame=frame,
+        if filter_track_color:
+            processor = frame_processor
+
+            def filter_search_area(search_area):
+                search_area = color_filter(search_area, track_point_color)
+                return processor(search_area) if processor is not None else search_area
+
+            frame_processor = filter_search_area
+        return self.find_one("track_point", threshold=threshold, box=box, template=template,
                              frame_processor=frame_processor, mask_function=mask_function)
 
+    def get_track_template(self, scale=1.0, filter_track_color=False):
+        """
+        获取缩放/颜色过滤后的 track_point 模板，特征重新加载 (如分辨率变化) 后自动重建。
+        """
+        mat = self.get_feature_by_name("track_point").mat
+        key = (scale, filter_track_color)
+        cached = self._track_templates.get(key)
+        if cached is None or cached[0] is not mat:
+            template = mat
+            if scale != 1.0:
+                template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+            if filter_track_color:
+                template = color_filter(template, track_point_color)
+            cached = (mat, template)
+            self._track_templates[key] = cached
+        return cached[1]
+
     def is_mouse_in_window(self) -> bool:
         """
         检测鼠标是否在游戏窗口范围内。
@@ -373,6 +584,30 @@ class BaseDNATask(BaseTask):
             down_time, post_sleep, after_sleep
         )
 
+    def create_macro_timer(self) -> PrecisionTimer:
+        """
+        创建宏播放计时器。
+
+        粗等待使用任务的 sleep，保证宏播放期间仍可暂停/停止；
+        自旋余量可通过配置项 "宏计时自旋余量(毫秒)" 调整。
+        """
+        spin_margin = self.config.get('宏计时自旋余量(毫秒)', 1.0) / 1000
+        return PrecisionTimer(coarse_sleep=self.sleep, spin_margin=spin_margin)
+
+    def create_macro_player(self, timer: PrecisionTimer, handlers: dict = None) -> MacroPlayer:
+        """
+        创建宏播放器，内置鼠标移动/点击与按键的执行方式，handlers 可追加或覆盖。
+        """
+        base_handlers = {
+            OP_MOVE: self.move_mouse_relative_raw,
+            OP_MOUSE_DOWN: lambda button: self.mouse_down(key=button),
+            OP_MOUSE_UP: lambda button: self.mouse_up(key=button),
+            OP_KEY_DOWN: self.send_key_down,
+            OP_KEY_UP: self.send_key_up,
+        }
+        base_handlers.update(handlers or {})
+        return MacroPlayer(timer, base_handlers)
+
     def sleep_random(self, timeout, random_range: tuple = (1.0, 1.0)):
         multiplier = random.uniform(random_range[0], random_range[1])
         final_timeout = timeout * multiplier
@@ -511,6 +746,10 @@ class BaseDNATask(BaseTask):
 
     def move_mouse_relative(self, dx, dy, original_Xsensitivity=1.0, original_Ysensitivity=1.0):
         dx, dy = self.calculate_sensitivity(dx, dy, original_Xsensitivity, original_Ysensitivity)
+        self.move_mouse_relative_raw(dx, dy)
+
+    def move_mouse_relative_raw(self, dx, dy):
+        """按已换算好灵敏度的像素值相对移动鼠标。"""
         self.try_bring_to_front()
         self.genshin_interaction.move_mouse_relative(int(dx), int(dy))
 
@@ -2,8 +2,17 @@ import re
 import time
 from enum import Enum
 
-from ok import find_boxes_by_name, TaskDisabledException
+from ok import Box, find_boxes_by_name, TaskDisabledException
+from src.config import config
 from src.tasks.BaseDNATask import BaseDNATask, isolate_white_text_to_black
+from src.utils.MissionClassifier import InterfaceCheck, MissionInterfaceClassifier, MissionState
+
+
+def parse_wave(texts):
+    """波次 OCR 结果 "当前/总数" -> 当前波次；无法识别时返回 None。"""
+    if texts and len(texts) == 1 and (m := re.match(r"(\d)/\d", texts[0].name)):
+        return int(m.group(1))
+    return None
 
 
 class Mission(Enum):
@@ -21,7 +30,9 @@ class CommissionsTask(BaseDNATask):
         self.current_wave = -1
         self.mission_status = None
         self.action_timeout = 15
-        self.wave_future = None
+        self.ocr_service = self.create_ocr_service()
+        self._mission_classifier = None
+        self._mission_classifier_size = None
 
     def setup_commission_config(self):
         self.default_config.update({
@@ -110,28 +121,35 @@ class CommissionsTask(BaseDNATask):
 
     def find_continue_btn(self, threshold=0, box=None):
         if box is None:
-            box = self.box_of_screen(0.610, 0.671, 0.647, 0.714, name="continue_mission", hcenter=True)
+            box = self.continue_btn_box()
         return self.find_one("ingame_continue_icon", threshold=threshold, box=box)
 
+    def continue_btn_box(self):
+        return self.box_of_screen(0.610, 0.671, 0.647, 0.714, name="continue_mission", hcenter=True)
+
     def find_bottom_start_btn(self, threshold=0):
-        return self.find_start_btn(
-            threshold=threshold, box=self.box_of_screen_scaled(2560, 1440, 2094, 1262, 2153, 1328, name="start_mission",
-                                                               hcenter=True))
+        return self.find_start_btn(threshold=threshold, box=self.bottom_start_btn_box())
+
+    def bottom_start_btn_box(self):
+        return self.box_of_screen_scaled(2560, 1440, 2094, 1262, 2153, 1328, name="start_mission", hcenter=True)
 
     def find_big_bottom_start_btn(self, threshold=0):
-        return self.find_start_btn(
-            threshold=threshold, box=self.box_of_screen_scaled(2560, 1440, 1667, 1259, 1728, 1328, name="start_mission",
-                                                               hcenter=True))
+        return self.find_start_btn(threshold=threshold, box=self.big_bottom_start_btn_box())
+
+    def big_bottom_start_btn_box(self):
+        return self.box_of_screen_scaled(2560, 1440, 1667, 1259, 1728, 1328, name="start_mission", hcenter=True)
 
     def find_letter_btn(self, threshold=0):
-        return self.find_start_btn(
-            threshold=threshold, box=self.box_of_screen_scaled(2560, 1440, 1630, 852, 1884, 920, name="letter_btn",
-                                                               hcenter=True))
+        return self.find_start_btn(threshold=threshold, box=self.letter_btn_box())
+
+    def letter_btn_box(self):
+        return self.box_of_screen_scaled(2560, 1440, 1630, 852, 1884, 920, name="letter_btn", hcenter=True)
 
     def find_letter_reward_btn(self, threshold=0):
-        return self.find_start_btn(
-            threshold=threshold, box=self.box_of_screen_scaled(2560, 1440, 1071, 1160, 1120, 1230,
-                                                               name="letter_reward_btn", hcenter=True))
+        return self.find_start_btn(threshold=threshold, box=self.letter_reward_btn_box())
+
+    def letter_reward_btn_box(self):
+        return self.box_of_screen_scaled(2560, 1440, 1071, 1160, 1120, 1230, name="letter_reward_btn", hcenter=True)
 
     def find_drop_rate_btn(self, threshold=0):
         return self.find_start_btn(
@@ -756,7 +774,7 @@ class CommissionsTask(BaseDNATask):
         box = self.box_of_screen(0.241, 0.361, 0.259, 0.394, name="green_mark", hcenter=True)
         self.wait_until(lambda: self.calculate_color_percentage(green_mark_color, box) > 0.135, time_out=1)
         round_info_box = self.box_of_screen_scaled(2560, 1440, 531, 517, 618, 602, name="round_info", hcenter=True)
-        texts = self.ocr(box=round_info_box)
+        texts = self.read_digits('round', round_info_box)
 
         prev_round = self.current_round
         new_round_from_ocr = None
@@ -770,35 +788,29 @@ class CommissionsTask(BaseDNATask):
 
         if prev_round != self.current_round:
             self.info_set("当前轮次", self.current_round)
+            self.info_set("检测缓存", self.detection_cache.summary())
+            self.info_set("画面变化门控", self.change_gate.summary())
 
     def get_wave_info(self):
-        if not self.in_team():
-            return
-        if self.wave_future and self.wave_future.done():
-            texts = self.wave_future.result()
-            self.wave_future = None
-            if texts and len(texts) == 1:
-                prev_wave = self.current_wave
-                if (m := re.match(r"(\d)/\d", texts[0].name)):
-                    self.current_wave = int(m.group(1))
-                else:
-                    return
-                if prev_wave != self.current_wave:
-                    self.info_set("当前波次", self.current_wave)
+        if not self.poll_in_team():
             return
-        if self.wave_future is None:
+        if 'wave' not in self.ocr_service.regions:
             mission_info_box = self.box_of_screen_scaled(2560, 1440, 275, 372, 445, 470, name="mission_info",
                                                          hcenter=True)
-            frame = self.frame.copy()
-            self.wave_future = self.thread_pool_executor.submit(self.ocr, frame=frame,
-                                                                box=mission_info_box,
-                                                                frame_processor=isolate_white_text_to_black,
-                                                                match=re.compile(r"\d/\d"))
+            self.ocr_service.register('wave', mission_info_box, match=re.compile(r"\d/\d"), parse=parse_wave,
+                                      interval=0, frame_processor=isolate_white_text_to_black, digits=True)
+        # 波次区域没有变化时不再提交识别
+        self.when_changed('wave_ocr', lambda: self.ocr_service.update(self.frame, names=('wave',)),
+                          roi=self.ocr_service.regions['wave'].box)
+        wave = self.ocr_service.value('wave')
+        if wave is not None and wave != self.current_wave:
+            self.current_wave = wave
+            self.info_set("当前波次", self.current_wave)
+            self.info_set("后台OCR", self.ocr_service.summary())
 
     def reset_wave_info(self):
-        if self.wave_future is not None:
-            self.wave_future.cancel()
-            self.wave_future = None
+        self.ocr_service.reset('wave')
+        self.change_gate.invalidate('wave_ocr')
         self.current_wave = -1
         self.info_set("当前波次", self.current_wave)
 
@@ -809,31 +821,35 @@ class CommissionsTask(BaseDNATask):
             self.sleep(0.2)
 
     def handle_mission_interface(self, stop_func=lambda: False):
-        if self.in_team():
+        if self.poll_in_team():
             return False
 
         self.check_for_monthly_card()
 
-        if self.find_letter_reward_btn():
+        # 结算/菜单界面通常是静态的，区域无变化时沿用上次的判断结果
+        state = self.when_changed('mission_interface', lambda: self.classify_mission_interface()[0],
+                                  roi=self.mission_interface_rois())
+
+        if state == MissionState.LETTER_REWARD:
             self.log_info("处理任务界面: 选择密函奖励")
             self.choose_letter_reward()
             return
 
-        if self.find_letter_interface():
+        if state == MissionState.LETTER:
             self.log_info("处理任务界面: 选择密函")
             self.choose_letter()
             return self.get_return_status()
-        elif self.find_drop_item() or self.find_drop_item(800):
+        elif state == MissionState.DROP_RATE:
             self.log_info("处理任务界面: 选择委托手册")
             self.choose_drop_rate()
             return self.get_return_status()
 
-        if self.find_retry_btn() or self.find_bottom_start_btn() or self.find_big_bottom_start_btn():
+        if state == MissionState.START:
             self.log_info("处理任务界面: 开始任务")
             self.start_mission()
             self.mission_status = Mission.START
             return
-        elif self.find_continue_btn():
+        elif state == MissionState.CONTINUE:
             if stop_func():
                 self.log_info("处理任务界面: 终止任务")
                 return Mission.STOP
@@ -841,12 +857,76 @@ class CommissionsTask(BaseDNATask):
             self.continue_mission()
             self.mission_status = Mission.CONTINUE
             return
-        elif self.find_esc_menu():
+        elif state == MissionState.ESC_MENU:
             self.log_info("处理任务界面: 放弃任务")
             self.give_up_mission()
             return Mission.GIVE_UP
         return False
 
+    def classify_mission_interface(self, frame=None):
+        """
+        一次遍历判断当前任务界面状态。
+
+        Returns:
+            tuple: (MissionState, list[Box])
+        """
+        if frame is None:
+            frame = self.frame
+        state, hits = self._ensure_mission_classifier(frame).classify(frame)
+        return state, [Box(hit.x, hit.y, hit.width, hit.height, hit.confidence, hit.name) for hit in hits]
+
+    def mission_interface_rois(self):
+        """classify_mission_interface 用到的全部检测区域。"""
+        self._ensure_mission_classifier(self.frame)
+        return self._mission_classifier.rois
+
+    def _ensure_mission_classifier(self, frame):
+        height, width = frame.shape[:2]
+        if self._mission_classifier is None or self._mission_classifier_size != (width, height):
+            self._mission_classifier = self._build_mission_classifier(width, height)
+            self._mission_classifier_size = (width, height)
+        return self._mission_classifier
+
+    def _build_mission_classifier(self, width, height):
+        """
+        按当前分辨率构建检测列表，顺序与原先逐个 find_xxx 的判断顺序一致。
+        阈值与默认偏移量读取 config.py 的 template_matching，与 find_one 不传 threshold/box 时相同。
+        """
+        template_matching = config['template_matching']
+
+        def roi_of(box):
+            return box.x, box.y, box.x + box.width, box.y + box.height
+
+        def default_roi(name):
+            # 与 find_one 不传 box 时相同：以标注位置为中心，按默认偏移量扩展
+            box = self.get_box_by_name(name)
+            x_offset = width * template_matching['default_horizontal_variance']
+            y_offset = height * template_matching['default_vertical_variance']
+            return box.x - x_offset, box.y - y_offset, box.x + box.width + x_offset, box.y + box.height + y_offset
+
+        def template(name):
+            return self.get_feature_by_name(name).mat
+
+        start_icon = template('start_icon')
+        checks = [
+            InterfaceCheck(MissionState.LETTER_REWARD, 'start_icon', start_icon, roi_of(self.letter_reward_btn_box())),
+            InterfaceCheck(MissionState.LETTER, 'start_icon', start_icon, roi_of(self.letter_btn_box())),
+            InterfaceCheck(MissionState.LETTER, 'not_use_letter', template('not_use_letter'),
+                           default_roi('not_use_letter')),
+            InterfaceCheck(MissionState.DROP_RATE, 'drop_item_2000', template('drop_item_2000'),
+                           default_roi('drop_item_2000')),
+            InterfaceCheck(MissionState.DROP_RATE, 'drop_item_800', template('drop_item_800'),
+                           default_roi('drop_item_800')),
+            InterfaceCheck(MissionState.START, 'retry_icon', template('retry_icon'), default_roi('retry_icon')),
+            InterfaceCheck(MissionState.START, 'start_icon', start_icon, roi_of(self.bottom_start_btn_box())),
+            InterfaceCheck(MissionState.START, 'start_icon', start_icon, roi_of(self.big_bottom_start_btn_box())),
+            InterfaceCheck(MissionState.CONTINUE, 'ingame_continue_icon', template('ingame_continue_icon'),
+                           roi_of(self.continue_btn_box())),
+            InterfaceCheck(MissionState.ESC_MENU, 'quit_big_icon', template('quit_big_icon'),
+                           default_roi('quit_big_icon')),
+        ]
+        return MissionInterfaceClassifier(checks, threshold=template_matching['default_threshold'])
+
     def get_return_status(self):
         ret = self.mission_status if self.mission_status else Mission.START
         self.mission_status = None
@@ -8,6 +8,7 @@ from src.tasks.DNAOneTimeTask import DNAOneTimeTask
 from src.tasks.BaseCombatTask import BaseCombatTask
 from src.tasks.CommissionsTask import CommissionsTask, Mission
 from src.tasks.trigger.AutoMazeTask import AutoMazeTask
+from src.utils.MacroEngine import compile_actions
 
 logger = Logger.get_logger(__name__)
 
@@ -27,6 +28,7 @@ class AutoEscortTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             {
                 "刷几次": 999,
                 "我已阅读注意事项并确认配置": False,
+                "宏计时自旋余量(毫秒)": 1.0,
             }
         )
 
@@ -43,6 +45,7 @@ class AutoEscortTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             {
                 "刷几次": "完成几次护送任务后停止",
                 "我已阅读注意事项并确认配置": "必须勾选才能执行任务！",
+                "宏计时自旋余量(毫秒)": "动作前最后多少毫秒改为自旋等待，越大越准但CPU占用越高",
             }
         )
 
@@ -66,6 +69,8 @@ class AutoEscortTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         }
 
         self.maze_task = None
+        self.macro_timer = None
+        self.macro_player = None
 
     def _load_escort_paths(self):
         """从 JSON 文件加载护送路径数据"""
@@ -89,6 +94,8 @@ class AutoEscortTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         DNAOneTimeTask.run(self)
         self.move_mouse_to_safe_position(save_current_pos=False)
         self.set_check_monthly_card()
+        self.macro_timer = self.create_macro_timer()
+        self.macro_player = self.create_macro_player(self.macro_timer)
         try:
             return self.do_run()
         except TaskDisabledException:
@@ -404,6 +411,7 @@ class AutoEscortTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
                     # 解密失败，需要重新开始任务
                     return False
 
+        self.info_set("宏计时抖动", self.macro_timer.stats.summary())
         logger.info("护送路径执行完成")
         return True
 
@@ -442,50 +450,25 @@ class AutoEscortTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         新格式：每个动作包含 delay 字段（距离上一个动作的时间间隔）
         这样在解密等待后，后续动作可以立即继续，不会因为绝对时间错位
 
+        片段先编译为按片段开始时刻对齐的动作表，播放时单个动作的等待误差不会累积
+
         Args:
             segment: 路径片段（动作列表）
             skip_first_delay: 是否跳过第一个动作的 delay（解密等待后使用）
         """
-        for i, action in enumerate(segment):
-            action_type = action.get("type")
-            delay = action.get("delay", 0)
-
-            # 如果是第一个动作且需要跳过 delay，则不等待
-            if i == 0 and skip_first_delay:
-                logger.debug(
-                    f"跳过片段首个动作的 delay ({delay:.3f}s)，解密等待已消耗此时间"
-                )
-                delay = 0
-
-            # 等待指定的延迟时间（使用高精度等待）
-            target = time.perf_counter() + delay
-            if delay > 0.02:
-                self.sleep(delay - 0.02)
-
-            while time.perf_counter() < target:
-                pass
-
-            # 执行不同类型的动作
-            if action_type == "mouse_rotation":
-                self.execute_mouse_rotation(action)
-            elif action_type == "mouse_down":
-                button = action.get("button", "left")
-                self.mouse_down(key=button)
-                logger.debug(f"按下鼠标: {button}")
-            elif action_type == "mouse_up":
-                button = action.get("button", "left")
-                self.mouse_up(key=button)
-                logger.debug(f"释放鼠标: {button}")
-            elif action_type == "key_down":
-                key = action.get("key")
-                self.send_key_down(key)
-                logger.debug(f"按下键: {key}")
-            elif action_type == "key_up":
-                key = action.get("key")
-                self.send_key_up(key)
-                logger.debug(f"释放键: {key}")
-            else:
-                logger.warning(f"未知动作类型: {action_type}")
+        if skip_first_delay and segment:
+            logger.debug(
+                f"跳过片段首个动作的 delay ({segment[0].get('delay', 0):.3f}s)，解密等待已消耗此时间"
+            )
+        macro = compile_actions(
+            segment,
+            scale_mouse=self.calculate_sensitivity,
+            skip_first_delay=skip_first_delay,
+            strict=False,
+        )
+        for action in macro.skipped:
+            logger.warning(f"未知动作类型: {action.get('type')}")
+        self.macro_player.play(macro)
 
     def wait_for_puzzle_completion(self, timeout=10):
         """等待 AutoMazeTask 完成解密
@@ -517,32 +500,3 @@ class AutoEscortTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         logger.warning(f"❌ 等待解密完成超时（{timeout}秒），重新开始任务...")
         self.give_up_mission()
         return False
-
-    def execute_mouse_rotation(self, action):
-        """执行鼠标视角旋转动作
-
-        使用 GenshinInteraction 的 move_mouse_relative 方法进行相对鼠标移动
-        注意：PostMessageInteraction 不支持相对移动，需要使用 GenshinInteraction
-        """
-        direction = action.get("direction", "up")
-        angle = action.get("angle", 0)
-        sensitivity = action.get("sensitivity", 10)
-
-        # 根据 escort-A.py 的计算方式：pixels = angle * sensitivity
-        pixels = angle * sensitivity
-
-        # 计算移动方向
-        if direction == "left":
-            dx, dy = -pixels, 0
-        elif direction == "right":
-            dx, dy = pixels, 0
-        elif direction == "up":
-            dx, dy = 0, -pixels
-        elif direction == "down":
-            dx, dy = 0, pixels
-        else:
-            logger.warning(f"未知的鼠标方向: {direction}")
-            return
-        
-        self.move_mouse_relative(dx, dy)
-        logger.debug(f"鼠标视角旋转: {direction}, 角度: {angle}, 像素: {pixels}")
@@ -1,10 +1,11 @@
 from qfluentwidgets import FluentIcon
 import time
-import cv2
 
 from ok import Logger, TaskDisabledException
 from src.tasks.BaseDNATask import BaseDNATask
 from src.tasks.DNAOneTimeTask import DNAOneTimeTask
+from src.utils.FishingControl import CONTROLLERS, FishingLoop
+from src.utils.FishingVision import DETECTORS, NOT_FOUND
 
 logger = Logger.get_logger(__name__)
 
@@ -13,9 +14,6 @@ class AutoFishTask(DNAOneTimeTask, BaseDNATask):
     """AutoFishTask
     无悠闲全自动钓鱼
     """
-    BAR_MIN_AREA = 1200
-    ICON_MIN_AREA = 70
-    ICON_MAX_AREA = 400
     CONTROL_ZONE_RATIO = 0.25
 
     def __init__(self, *args, **kwargs):
@@ -32,6 +30,10 @@ class AutoFishTask(DNAOneTimeTask, BaseDNATask):
             "MAX_START_SEC": 20.0,
             "MAX_FIGHT_SEC": 60.0,
             "MAX_END_SEC": 20.0,
+            "ROI_CAPTURE_FPS": 240,
+            "PROJECTION_DETECTOR": False,
+            "CONTROL_MODE": "滞回",
+            "INPUT_LATENCY_MS": 30,
         })
 
         # ROI 配置（鱼条和鱼标搜索区域，基于 1920x1080）
@@ -44,7 +46,12 @@ class AutoFishTask(DNAOneTimeTask, BaseDNATask):
             "MAX_START_SEC": "开始阶段超时(秒)",
             "MAX_FIGHT_SEC": "溜鱼阶段超时(秒)",
             "MAX_END_SEC": "结束阶段超时(秒)",
+            "ROI_CAPTURE_FPS": "溜鱼阶段只截取鱼条区域的截图帧率上限(0为关闭，使用整帧)",
+            "PROJECTION_DETECTOR": "使用行投影检测鱼条和鱼标(关闭时使用轮廓检测)",
+            "CONTROL_MODE": "滞回: 按当前鱼标位置控制; 预测: 跟踪速度并补偿延迟",
+            "INPUT_LATENCY_MS": "预测控制: 按键发出到游戏生效的额外延迟(毫秒)",
         })
+        self.config_type["CONTROL_MODE"] = {"type": "drop_down", "options": list(CONTROLLERS)}
 
         # runtime
         self.stats = {
@@ -105,133 +112,36 @@ class AutoFishTask(DNAOneTimeTask, BaseDNATask):
             return True, (box.x + box.width // 2, box.y + box.height // 2)
         return False, (0, 0)
 
-    def find_bar_and_fish_by_area(self):
+    def fish_roi_box(self):
+        return self.box_of_screen_scaled(1920, 1080, 1620, 325, 1645, 725, name="fish_roi")
+
+    def detect_fish(self, roi_img=None):
         """基于 ROI 找到鱼条和鱼标的区域与面积
 
-        返回：((has_bar, bar_center, bar_rect), (has_icon, icon_center, icon_rect))
-        注意：bar_center 和 icon_center 是相对于 ROI 内部的坐标，bar_rect 和 icon_rect 也是
+        参数：roi_img 为已裁剪好的 ROI 图像 (ROI 截图模式)，为 None 时从当前帧裁剪
+        返回：FishDetection，其中的中心与外接矩形都是相对于 ROI 内部的坐标
         """
-
-        # 获取 ROI 区域
-        box = self.box_of_screen_scaled(1920, 1080, 1620, 325, 1645, 725, name="fish_roi")
-
         try:
-            # frame = self.frame
-            # Box 对象使用 x, y, width, height 属性
-            # box_x1, box_y1 = box.x, box.y
-            # box_x2, box_y2 = box.x + box.width, box.y + box.height
-            # box_x1 = max(0, min(box_x1, frame_width - 1))
-            # box_y1 = max(0, min(box_y1, frame_height - 1))
-            # box_x2 = max(box_x1 + 1, min(box_x2, frame_width))
-            # box_y2 = max(box_y1 + 1, min(box_y2, frame_height))
-            # roi_img = frame[box_y1:box_y2, box_x1:box_x2]
-            frame_height, _ = self.frame.shape[:2]
-            res_ratio = frame_height / 1080
-            roi_img = box.crop_frame(self.frame)
-
-            # 转换为灰度图
-            gray = cv2.cvtColor(roi_img, cv2.COLOR_BGR2GRAY)
-
-            # 二值化：提取亮色区域（鱼条和图标都是白色/亮色）
-            _, scene_bin = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
-
-            # 查找轮廓
-            contours, _ = cv2.findContours(scene_bin, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-
-            # 收集所有符合最小面积的轮廓
-            blobs = []
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                if area > self.ICON_MIN_AREA * res_ratio ** 2:
-                    blobs.append({"contour": contour, "area": area})
-
-            # 按面积降序排列
-            blobs.sort(key=lambda b: b["area"], reverse=True)
-
-            # Debug only
-            # output_img = roi_img.copy()
-            # colors = [
-            #     (0, 0, 255),     # 红
-            #     (0, 255, 0),     # 绿
-            #     (255, 0, 0),     # 蓝
-            #     (0, 255, 255),   # 黄
-            #     (255, 0, 255),   # 紫
-            #     (255, 255, 0),   # 青
-            #     (255, 255, 255), # 白
-            # ]
-            # for i, blob in enumerate(blobs):
-            #     color = colors[i % len(colors)]  # 超过列表长度循环使用
-            #     cv2.drawContours(output_img, [blob["contour"]], -1, color, 2)
-            # Debug only
-
-            has_bar = has_icon = False
-            bar_center = bar_rect = icon_center = icon_rect = None
-            bar_area = icon_area = 0.0
-
-            # 查找鱼条（最大的符合条件的轮廓）
-            for blob in blobs:
-                if blob["area"] > self.BAR_MIN_AREA * res_ratio ** 2:
-                    contour = blob["contour"]
-                    moments = cv2.moments(contour)
-                    if moments["m00"] > 0:
-                        has_bar = True
-                        bar_area = blob["area"]
-                        # 注意：这里是 ROI 内部坐标，不加 box_x1, box_y1
-                        bar_center = (
-                            int(moments["m10"] / moments["m00"]),
-                            int(moments["m01"] / moments["m00"]),
-                        )
-                        x, y, w, h = cv2.boundingRect(contour)
-                        # 矩形也是 ROI 内部坐标
-                        bar_rect = (x, y, x + w, y + h)
-                    break
-
-            # 查找鱼标（第二大的符合条件的轮廓，排除鱼条）
-            for blob in blobs:
-                if blob["area"] == bar_area:
-                    continue
-                if self.ICON_MIN_AREA * res_ratio ** 2 < blob["area"] < self.ICON_MAX_AREA * res_ratio ** 2:
-                    contour = blob["contour"]
-                    moments = cv2.moments(contour)
-                    if moments["m00"] > 0:
-                        has_icon = True
-                        icon_area = blob["area"]
-                        # ROI 内部坐标
-                        icon_center = (
-                            int(moments["m10"] / moments["m00"]),
-                            int(moments["m01"] / moments["m00"]),
-                        )
-                        x, y, w, h = cv2.boundingRect(contour)
-                        icon_rect = (x, y, x + w, y + h)
-                    break
-
-            if has_bar:
-                zone_ratio = bar_area / box.area()
-                if self.CONTROL_ZONE_RATIO <= 0 or abs(
-                        zone_ratio - self.CONTROL_ZONE_RATIO) / self.CONTROL_ZONE_RATIO > 0.1:
-                    self.CONTROL_ZONE_RATIO = zone_ratio
-                    self.log_info(f"set CONTROL_ZONE_RATIO {self.CONTROL_ZONE_RATIO}")
+            res_ratio = self.screen_height / 1080
+            if roi_img is None:
+                roi_img = self.fish_roi_box().crop_frame(self.frame)
 
-            # Debug only
-            # cv2.imshow("Contours", output_img)
-            # cv2.waitKey(1)
-            # Debug only
+            detector = DETECTORS['projection' if self.config.get("PROJECTION_DETECTOR", False) else 'contour']
+            detection = detector(roi_img, res_ratio)
 
             # 更新统计信息
             self.stats.update({
-                "last_bar_found": has_bar,
-                "last_bar_area": float(bar_area),
-                "last_icon_found": has_icon,
-                "last_icon_area": float(icon_area),
+                "last_bar_found": detection.has_bar,
+                "last_bar_area": detection.bar_area,
+                "last_icon_found": detection.has_icon,
+                "last_icon_area": detection.icon_area,
             })
-
-            return (has_bar, bar_center, bar_rect), (has_icon, icon_center, icon_rect)
+            return detection
         except TaskDisabledException:
-            # cv2.destroyAllWindows()
             raise
         except Exception as e:
-            logger.error("find_bar_and_fish_by_area error", e)
-            return (False, None, None), (False, None, None)
+            logger.error("detect_fish error", e)
+            return NOT_FOUND
 
     # ---- phases ----
     def phase_start(self) -> bool:
@@ -340,25 +250,23 @@ class AutoFishTask(DNAOneTimeTask, BaseDNATask):
 
         # 硬编码的常量
         BAR_MISSING_TIMEOUT = 2.5  # 鱼条丢失超时
-        MERGE_GRACE_SECONDS = 0.20  # 合并宽限时间
 
         # 运行时状态
-        is_holding_space = False
-        icon_was_visible_prev = False
-        last_known_icon_y_relative = 0.0
-
         bar_missing_start_time = None
-        merge_start_time = None
 
-        def set_hold(target_hold: bool):
-            nonlocal is_holding_space
-            if target_hold != is_holding_space:
-                if target_hold:
-                    self.send_key_down("space")
-                else:
-                    self.send_key_up("space")
-                is_holding_space = target_hold
-                self.stats["last_hold_state"] = is_holding_space
+        # 单帧步骤 (检测 -> 控制区比例 -> 控制器 -> 按键) 与离线模拟器共用
+        fishing = FishingLoop(self.detect_fish, CONTROLLERS.get(cfg.get("CONTROL_MODE"), CONTROLLERS["滞回"])(),
+                              self, self.fish_roi_box().area(), zone_ratio=self.CONTROL_ZONE_RATIO,
+                              extra_latency=cfg.get("INPUT_LATENCY_MS", 30) / 1000)
+
+        # ROI 截图模式：后台线程只截取鱼条区域，控制循环每来一帧处理一次
+        roi_fps = cfg.get("ROI_CAPTURE_FPS", 240)
+        sampler = self.create_roi_sampler(self.fish_roi_box(), fps=roi_fps).start() if roi_fps > 0 else None
+        seen = 0
+        last_executor_frame = time.monotonic()
+        latency_total = 0.0
+        latency_count = 0
+        last_latency_report = time.monotonic()
 
         try:
             while True:
@@ -367,14 +275,26 @@ class AutoFishTask(DNAOneTimeTask, BaseDNATask):
                     logger.info("溜鱼超时")
                     return False
 
-                (has_bar, bar_center, bar_rect), (has_icon, icon_center, icon_rect) = self.find_bar_and_fish_by_area()
-
-                # 记录鱼标相对位置（用于合并处理）
-                if has_bar and has_icon:
-                    last_known_icon_y_relative = icon_center[1] - bar_center[1]
+                roi_img = None
+                captured_at = time.perf_counter()
+                if sampler is not None:
+                    roi_img, seen, captured_at = sampler.wait_next(seen, timeout=0.5)
+                    if roi_img is None or not self.enabled or now - last_executor_frame >= 1.0:
+                        # 区域截图暂不可用时退回整帧模式；停止/暂停由 next_frame 处理，每秒至少走一次
+                        self.next_frame()
+                        last_executor_frame = now
+                        if roi_img is None:
+                            captured_at = time.perf_counter()
+                detection = fishing.step(roi_img, captured_at)
+                if fishing.zone_ratio != self.CONTROL_ZONE_RATIO:
+                    self.CONTROL_ZONE_RATIO = fishing.zone_ratio
+                    self.log_info(f"set CONTROL_ZONE_RATIO {self.CONTROL_ZONE_RATIO}")
+                self.stats["last_hold_state"] = fishing.holding
+                if fishing.controller.last_merge_event is not None:
+                    self.stats["last_merge_event"] = fishing.controller.last_merge_event
 
                 # 检查鱼条是否丢失
-                if not has_bar:
+                if not detection.has_bar:
                     if bar_missing_start_time is None:
                         bar_missing_start_time = now
                     elif now - bar_missing_start_time >= BAR_MISSING_TIMEOUT:
@@ -383,63 +303,25 @@ class AutoFishTask(DNAOneTimeTask, BaseDNATask):
                 else:
                     bar_missing_start_time = None
 
-                # 主控制逻辑：两层控制系统
-                if has_bar and bar_rect:
-                    bar_top = bar_rect[1]
-                    bar_bottom = bar_rect[3]
-                    bar_height = bar_bottom - bar_top
-
-                    if bar_height <= 0:
-                        bar_height = 1
-
-                    # 计算控制区域边界
-                    control_zone_ratio = self.CONTROL_ZONE_RATIO
-                    control_height = int(bar_height * control_zone_ratio)
-                    control_top = bar_top + control_height
-                    control_bottom = bar_bottom - control_height
-
-                    is_merged = has_bar and (not has_icon) and icon_was_visible_prev
-
-                    if has_icon:
-                        merge_start_time = None
-                        icon_y = icon_center[1]
-
-                        # 简化的两层控制逻辑
-                        if icon_y < control_top:
-                            # 鱼标在上控制区 -> 按住空格
-                            set_hold(True)
-                        elif icon_y > control_bottom:
-                            # 鱼标在下控制区 -> 松开空格
-                            set_hold(False)
-                        # else: 鱼标在中立区 -> 保持当前状态（滞回控制）
-
-                    else:
-                        # 处理鱼标与鱼条合并的情况
-                        if is_merged:
-                            if merge_start_time is None:
-                                merge_start_time = now
-                                self.stats["last_merge_event"] = (f"merged, last_rel={last_known_icon_y_relative:.1f}")
-                                # logger.info("检测到合并，处理...")
-                            elapsed = now - merge_start_time
-                            if elapsed <= MERGE_GRACE_SECONDS:
-                                # 根据上次已知的相对位置决定操作
-                                if last_known_icon_y_relative < 0:
-                                    set_hold(True)
-                                else:
-                                    set_hold(False)
-                        else:
-                            merge_start_time = None
-                else:
-                    set_hold(False)
-
-                icon_was_visible_prev = has_icon
+                # 从截图完成到本次控制完成的延迟
+                latency_total += time.perf_counter() - captured_at
+                latency_count += 1
+                if now - last_latency_report >= 1.0:
+                    self.info_set("溜鱼延迟", f"{latency_total / latency_count * 1000:.1f}ms "
+                                              f"({latency_count / (now - last_latency_report):.0f}次/秒)")
+                    latency_total = 0.0
+                    latency_count = 0
+                    last_latency_report = now
 
-                self.next_frame()
+                if sampler is None:
+                    self.next_frame()
 
         except TaskDisabledException:
             self.send_key_up("space")
             raise
         finally:
+            if sampler is not None:
+                sampler.stop()
             self.send_key_up("space")
 
     def phase_end(self) -> bool:
@@ -1,5 +1,6 @@
 from qfluentwidgets import FluentIcon
 import re
+import threading
 import time
 import cv2
 import os
@@ -17,6 +18,14 @@ from src.tasks.BaseCombatTask import BaseCombatTask
 from src.tasks.AutoDefence import AutoDefence
 from src.tasks.AutoExpulsion import AutoExpulsion
 from src.tasks.AutoExploration import AutoExploration
+from src.utils.MapMatcher import CERTAIN_CONFIDENCE, ScreenPyramid, match_template_exhaustive, match_template_pyramid, \
+    refine_peak, score_candidates
+from src.utils.MapRoiStore import MapRoiStore, ROI_MIN_CONFIDENCE, ROI_RECORD_CONFIDENCE
+from src.utils.TemplateCache import TemplateCache
+from src.utils.ModNodeIndex import ModNodeIndex
+from src.utils.ModPack import ModPack, compile_mod
+from src.utils.NodePrematcher import NodePrematcher
+from src.utils.MacroEngine import OP_DELAY, OP_INTERACT_DOWN, OP_INTERACT_UP, OP_TRANSPORT, compile_actions
 
 logger = Logger.get_logger(__name__)
 
@@ -42,6 +51,16 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             '轮次': 10,
             '外部文件夹': "",
             '副本类型': "默认",
+            '金字塔地图匹配': True,
+            '缓存缩放模板到磁盘': False,
+            '使用编译模组包': True,
+            '自动编译模组包': False,
+            '并行地图匹配': True,
+            '确定匹配阈值': CERTAIN_CONFIDENCE,
+            '预匹配下一节点': True,
+            '学习匹配区域': True,
+            '宏计时自旋余量(毫秒)': 1.0,
+            '宏采样帧率': 10,
             # '使用内建机关解锁': False,
         })
         self.config_type['外部文件夹'] = {
@@ -61,6 +80,16 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         self.config_description.update({
             '轮次': '如果是无尽关卡，选择打几个轮次',
             '外部文件夹': '选择mod目录下的外部逻辑',
+            '金字塔地图匹配': '先在1/4尺度粗匹配再精确匹配，置信度与全图匹配一致，CPU占用更低',
+            '缓存缩放模板到磁盘': '非1080p时把缩放后的地图模板保存到mod目录下的.cache，下次启动无需重新缩放',
+            '使用编译模组包': 'mod目录下存在且未过期的mod.pack时直接内存映射加载，否则读取map/scripts文件夹',
+            '自动编译模组包': 'mod.pack不存在或已过期时自动编译，编译后下次启动生效更快',
+            '并行地图匹配': '在线程池上同时评估多个候选地图，分支节点处选择更快',
+            '确定匹配阈值': '某个候选地图的匹配度达到该值时立即采用，不再评估其余候选',
+            '预匹配下一节点': '宏播放期间在后台匹配下一节点，宏结束后结果稳定即继续，无需固定等待2秒',
+            '学习匹配区域': '记录每张地图的匹配位置(mod目录下roi.json)，之后只在该位置附近搜索，匹配度不足时回退全屏',
+            '宏计时自旋余量(毫秒)': '动作前最后多少毫秒改为自旋等待，越大越准但CPU占用越高',
+            '宏采样帧率': '宏播放期间后台截图的帧率，供预匹配等使用，动作执行不再等待截图',
             # '使用内建解密': '使用ok内建解密功能',
         })
 
@@ -68,6 +97,14 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         self.aim_shoot_tick = self.create_aim_shoot_ticker()
         self.action_timeout = 10
         self.quick_move_task = QuickMoveTask(self)
+        self.template_cache = TemplateCache()
+        self.mod_folder = None
+        self.node_index = ModNodeIndex([])
+        self.mod_pack = None
+        self.roi_store = MapRoiStore()
+        self.macro_timer = None
+        self.macro_player = None
+        self.compiled_macros = {}
 
     def run(self):
         DNAOneTimeTask.run(self)
@@ -75,8 +112,14 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         self.set_check_monthly_card()
         try:
             path = Path.cwd()
-            self.script = self.process_json_files(f'{path}\mod\{self.config.get("外部文件夹")}\scripts')
-            self.img = self.load_png_files(f'{path}\mod\{self.config.get("外部文件夹")}\map')
+            self.mod_folder = self.config.get("外部文件夹")
+            self.load_mod(f'{path}\mod\{self.mod_folder}')
+            self.macro_timer = self.create_macro_timer()
+            self.macro_player = self.create_macro_player(self.macro_timer, {
+                OP_INTERACT_DOWN: lambda: self._send_interact("key_down"),
+                OP_INTERACT_UP: lambda: self._send_interact("key_up"),
+                OP_TRANSPORT: self.reset_and_transport,
+            })
             _to_do_task = self
             if self.config.get('副本类型') == '扼守无尽':
                 _to_do_task = self.get_task_by_class(AutoDefence)
@@ -93,6 +136,24 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         except Exception as e:
             logger.error('AutoDefence error', e)
             raise
+        finally:
+            self.save_roi_store()
+            self.close_mod_pack()
+
+    def close_mod_pack(self):
+        """释放 mod.pack 的内存映射；之后再访问模板时会重新映射。"""
+        if self.mod_pack is not None:
+            # 模板缓存中保存着指向 mmap 的视图，先丢弃才能真正关闭映射 (mod_folder 可能已切换为新的 mod)
+            self.template_cache.clear()
+            if not self.mod_pack.close():
+                self.log_info(f"mod.pack 内存映射仍被引用，未能释放: {self.mod_pack.path}")
+
+    def save_roi_store(self):
+        try:
+            if self.roi_store.save():
+                self.log_info(f"已保存地图匹配区域: {self.roi_store.path}")
+        except Exception as e:
+            self.log_error("保存地图匹配区域失败", e)
 
     def do_run(self):
         self.init_all()
@@ -101,7 +162,7 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             self.open_in_mission_menu()
             self.sleep(0.5)
         while True:
-            if self.in_team():
+            if self.poll_in_team():
                 self.get_wave_info()
                 if self.current_wave != -1:
                     if self.current_wave != self.runtime_state["wave"]:
@@ -164,6 +225,32 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
                 folders.append(item)
         return folders
 
+    def load_mod(self, mod_dir):
+        """加载 mod：优先使用编译好的 mod.pack，不可用时回退到 map/scripts 文件夹。"""
+        self.close_mod_pack()
+        self.mod_pack = None
+        if self.config.get('使用编译模组包', True):
+            self.mod_pack = ModPack.open(mod_dir)
+            if self.mod_pack is None and self.config.get('自动编译模组包', False):
+                try:
+                    compile_mod(mod_dir)
+                    self.log_info(f"已编译 mod.pack: {mod_dir}")
+                    self.mod_pack = ModPack.open(mod_dir)
+                except Exception as e:
+                    self.log_error(f"编译 mod.pack 失败 {mod_dir}", e)
+        if self.mod_pack is not None:
+            self.log_info(f"使用 mod.pack: {self.mod_pack.path}")
+            self.script = self.mod_pack.scripts
+            self.img = self.mod_pack.templates()
+        else:
+            self.script = self.process_json_files(f'{mod_dir}\scripts')
+            self.img = self.load_png_files(f'{mod_dir}\map')
+        self.node_index = ModNodeIndex(self.img.keys(), self.script)
+        self.compiled_macros = {}
+        self.template_cache.persist = self.config.get('缓存缩放模板到磁盘', False)
+        self.template_cache.register(self.mod_folder, self.img, f'{mod_dir}\map', self.mod_pack)
+        self.roi_store = MapRoiStore.for_mod(mod_dir)
+
     def process_json_files(self, folder_path):
         json_files = {}
         for filename in os.listdir(folder_path):
@@ -229,9 +316,12 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         # maze_task = self.get_task_by_class(AutoMazeTask)
         # roulette_task = self.get_task_by_class(AutoRouletteTask)
 
+        next_index = None
         while True:
             start_time = time.perf_counter()
-            map_index = None
+            # 宏结束时预匹配已得到稳定结果的，直接跳过搜索
+            map_index = next_index
+            next_index = None
 
             # 尝试在 5 秒内找到匹配的地图
             while map_index is None and time.perf_counter() - start_time < 5:
@@ -273,7 +363,7 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             if map_index is not None:
                 self.log_info(f'开始执行宏: {map_index}')
                 try:
-                    self.play_macro_actions(map_index)
+                    next_index = self.play_macro_actions(map_index)
                     # 更新前置节点，用于下一次逻辑判断
                     former_index = map_index
                 except MacroFailedException:
@@ -292,77 +382,15 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         """
         在当前屏幕中寻找匹配度最高的地图模板。
         """
-        # 1. 提取图像处理逻辑到循环外 (极大的性能提升)
-        # 假设 box 定义不变，可以提取出来
-        box = self.box_of_screen_scaled(2560, 1440, 1, 1, 2559, 1439, name="full_screen", hcenter=True)
-
-        # 只裁剪和转换一次屏幕
         frame = self.frame
         self.shared_frame = frame
-        cropped_screen = box.crop_frame(frame)
-        screen_gray = cv2.cvtColor(cropped_screen, cv2.COLOR_BGR2GRAY)
-
-        count = 0
-        max_index = None
-        best_threshold = max_conf  # 使用传入的阈值作为基准，低于此值不认为是匹配
 
-        # 如果没有传入预编译的正则，则临时编译
-        if pattern is None:
-            pattern = re.compile(r'[a-zA-Z]$')
+        # 候选节点由加载 mod 时构建的节点树直接给出，无需逐个过滤全部节点
+        candidates = self.node_index.candidates(index, pattern)
+        count = len(candidates)
 
-        for name, template_gray in self.img.items():
-            # --- 过滤逻辑 ---
-            # 逻辑 1: 起始状态 (index is None)
-            if index is None and not pattern.search(name):
-                continue
-
-            if index is not None:
-                # 逻辑 2: 不匹配自己 (先判断这个效率最高)
-                if index == name:
-                    continue
-
-                # 逻辑 3: 严格的前缀匹配
-                
-                # 1. 必须是以 index 开头
-                if not name.startswith(index):
-                    continue
-                
-                # 2. 获取去掉 index 后的剩余部分
-                # 例如: index="A-1", name="A-1-1" -> suffix="-1"
-                # 例如: index="A-1", name="A-10"  -> suffix="0"
-                suffix = name[len(index):]
-
-                # 3. 检查分隔符：如果不是以 '-' 开头，说明不是层级递进，而是数字扩展 (如 1 -> 10)
-                # 这一步阻止了 "60角色-A-1-1" 匹配到 "60角色-A-1-10"
-                if not suffix.startswith('-'):
-                    continue
-                
-                # 4. 层级限制
-                # 如果剩余部分包含 2 个或以上的 '-', 说明是跨级节点 (如 A -> A-1-1)
-                # 也就是 suffix 只能是 "-1", 不能是 "-1-1"
-                if suffix.count('-') >= 2:
-                    continue
-
-                # 5. 长度限制 (保留作为最后的防线)
-                # 由于上面限制了只能有一个 '-', 这个长度限制其实主要限制 "-xxxxx" 后面数字或字符太长的情况
-                if len(suffix) > 4: 
-                    continue
-
-            count += 1
-
-            if self.height != 1080:
-                scale_factor = self.height / 1080
-                template_gray = cv2.resize(template_gray, (0, 0), fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_LINEAR)
-            # 执行匹配
-            result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-            _, threshold, _, _, = cv2.minMaxLoc(result)
-
-            # 只记录比当前最佳结果更好的
-            if threshold > best_threshold:
-                best_threshold = threshold
-                max_index = name
-                # 只有当发现更好的匹配时才打印 debug 日志，减少刷屏
-                # logger.debug(f"发现潜在匹配: {name} conf={threshold:.4f}")
+        executor = self.thread_pool_executor if self.config.get('并行地图匹配', True) else None
+        max_index, best_threshold = self.match_frame(frame, candidates, max_conf, executor)
 
         if max_index is not None:
             self.log_info(f"成功匹配: {max_index} (conf={best_threshold:.4f})")
@@ -373,6 +401,58 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
 
         return max_index, count
 
+    def match_frame(self, frame, candidates, min_conf=0.0, executor=None):
+        """
+        在指定帧中评估候选模板，返回 (name, confidence)。
+
+        所有候选都已记录过位置时，先只在记录位置附近搜索；
+        区域内没有候选达到置信度要求时，再回退到全屏搜索。
+        """
+        # 1. 提取图像处理逻辑到循环外 (极大的性能提升)
+        # 假设 box 定义不变，可以提取出来
+        box = self.box_of_screen_scaled(2560, 1440, 1, 1, 2559, 1439, name="full_screen", hcenter=True)
+
+        # 只裁剪和转换一次屏幕
+        cropped_screen = box.crop_frame(frame)
+        screen_gray = cv2.cvtColor(cropped_screen, cv2.COLOR_BGR2GRAY)
+        screen_h, screen_w = screen_gray.shape[:2]
+        certain_conf = self.config.get('确定匹配阈值', CERTAIN_CONFIDENCE)
+        roi_store = self.roi_store
+
+        if self.config.get('学习匹配区域', True) and candidates and all(name in roi_store for name in candidates):
+            padding = roi_store.padding(screen_h)
+
+            def score_roi(name):
+                template_gray = self.template_cache.get(self.mod_folder, name, self.height)
+                x, y = roi_store.get(name, screen_w, screen_h)
+                conf, loc = refine_peak(screen_gray, template_gray, x, y, padding)
+                if loc is not None and conf >= ROI_MIN_CONFIDENCE:
+                    roi_store.record(name, loc, screen_w, screen_h)
+                return conf
+
+            name, conf = score_candidates(candidates, score_roi, executor, max(min_conf, ROI_MIN_CONFIDENCE),
+                                          certain_conf)
+            if name is not None:
+                return name, conf
+
+        # 粗层只构建一次，所有候选模板共享
+        pyramid = ScreenPyramid(screen_gray) if self.config.get('金字塔地图匹配', True) else None
+
+        def score(name):
+            # 缩放后的模板按 (mod, 模板名, 分辨率) 缓存，只在首次使用或分辨率变化时缩放
+            template_gray = self.template_cache.get(self.mod_folder, name, self.height)
+            if pyramid is not None:
+                template_small = self.template_cache.get_small(self.mod_folder, name, self.height, pyramid.scale)
+                conf, loc = match_template_pyramid(pyramid, template_gray, template_small)
+            else:
+                conf, loc = match_template_exhaustive(screen_gray, template_gray)
+            if loc is not None and conf >= ROI_RECORD_CONFIDENCE:
+                roi_store.record(name, loc, screen_w, screen_h)
+            return conf
+
+        # 低于 min_conf 不认为是匹配；达到确定阈值的候选直接采用
+        return score_candidates(candidates, score, executor, min_conf, certain_conf)
+
     @cached_property
     def genshin_interaction(self):
         """
@@ -383,105 +463,107 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
         return GenshinInteraction(self.executor.interaction.capture, self.hwnd)
 
     def play_macro_actions(self, map_index):
-        actions = self.script[map_index]["actions"]
-
-        if "original_x_sensitivity" and "original_y_sensitivity" in self.script[map_index] :
-            self.original_Xsensitivity = self.script[map_index]["original_x_sensitivity"]
-            self.original_Ysensitivity = self.script[map_index]["original_y_sensitivity"]
-        else:
-            self.original_Xsensitivity = 1.0
-            self.original_Ysensitivity = 1.0
-      
-        # 使用 perf_counter 获得更高精度的时间
-        start_time = time.perf_counter()
-
-        for action in actions:
-            target_time = action['time']
-
-            if self.check_for_monthly_card()[0]:
-                raise MacroFailedException
-
-            self.next_frame()
-            self.shared_frame = self.frame
+        """
+        播放节点宏。
 
-            current_offset = time.perf_counter() - start_time
-            delay = target_time - current_offset
-            target = time.perf_counter() + delay
-            if delay > 0.02:
-                self.sleep(delay - 0.02)
+        Returns:
+            str: 宏结束后预匹配得到的下一节点，未启用或未稳定时为 None。
+        """
+        macro = self.get_compiled_macro(map_index)
 
-            while time.perf_counter() < target:
-                pass
+        prematcher = None
+        stop_event = threading.Event()
+        candidates = self.node_index.candidates(map_index)
+        if self.config.get('预匹配下一节点', True) and candidates:
+            prematcher = NodePrematcher(candidates, self.match_frame)
+            self.start_prematch(prematcher, stop_event)
 
-            if action['type'] == "delay":
-                self.delay_index = map_index
-            else:
-                self.delay_index = None
-                self.execute_action(action)
-
-        self.sleep(2)
+        # 截图在独立线程中按固定帧率进行，动作循环不再等待截图
+        sampler = self.create_frame_sampler(self.config.get('宏采样帧率', 10)).start()
+        try:
+            return self._play_actions(map_index, macro, prematcher)
+        finally:
+            stop_event.set()
+            sampler.stop()
 
-    def execute_action(self, action):
+    def get_compiled_macro(self, map_index):
         """
-        分发动作执行，替代原有的 execute_key_action
+        获取编译后的节点宏；按键映射与灵敏度换算在编译时完成，每个节点只编译一次。
         """
-        action_type = action['type']
-
-        try:
-            if action_type == "mouse_move":
-                self.move_mouse_relative(action['dx'], action['dy'], self.original_Xsensitivity, self.original_Ysensitivity)
-
-            elif action_type == "mouse_rotation":
-                self.execute_mouse_rotation(action)
-
-            elif action_type in ("mouse_down", "mouse_up"):
-                self._handle_mouse_click(action_type, action['button'])
+        macro = self.compiled_macros.get(map_index)
+        if macro is None:
+            script = self.script[map_index]
+            original_x = script.get("original_x_sensitivity", 1.0)
+            original_y = script.get("original_y_sensitivity", 1.0)
+            macro = compile_actions(
+                script["actions"],
+                name=map_index,
+                key_map={
+                    'lshift': self.get_dodge_key(),
+                    '4': self.get_spiral_dive_key(),
+                    'e': self.get_combat_key(),
+                    'q': self.get_ultimate_key(),
+                },
+                scale_mouse=lambda dx, dy: self.calculate_sensitivity(dx, dy, original_x, original_y),
+                game_keys=True,
+                normalize_keys=True,
+                truncate_rotation=True,
+            )
+            self.compiled_macros[map_index] = macro
+        return macro
+
+    def _play_actions(self, map_index, macro, prematcher):
+        def before_step(step):
+            if self.should_check_monthly_card():
+                # 月卡检测使用主线程的帧，只在检测时段内截图
+                self.next_frame()
+                if self.check_for_monthly_card()[0]:
+                    raise MacroFailedException
+            self.delay_index = map_index if step.op == OP_DELAY else None
+
+        self.macro_player.play(macro, before_step=before_step, on_error=self._on_macro_step_error)
+
+        self.info_set('宏计时抖动', self.macro_timer.stats.summary())
+
+        if prematcher is None:
+            self.sleep(2)
+            return None
+        return self.wait_prematch(prematcher)
+
+    def _on_macro_step_error(self, step, e):
+        # 获取 key 信息用于日志，如果不存在则为 None
+        key_info = step.source.get('key') or step.source.get('button') or 'N/A'
+        self.log_info(f"执行动作失败 -> type: {step.source.get('type')}, key/btn: {key_info}, Error: {e}")
+
+    def start_prematch(self, prematcher, stop_event, interval=0.1):
+        """在线程池中持续用 shared_frame 给子节点评分，直到 stop_event 被设置。"""
+
+        def _prematch_loop_task():
+            while not stop_event.is_set() and not self.executor.exit_event.is_set():
+                try:
+                    prematcher.feed(self.shared_frame)
+                except Exception as e:
+                    logger.error("prematch error", e)
+                    return
+                stop_event.wait(interval)
 
-            elif action_type in ("key_down", "key_up"):
-                self._handle_keyboard(action_type, action['key'])
+        self.thread_pool_executor.submit(_prematch_loop_task)
 
-            else:
-                raise ValueError(f"Unknown action type: {action_type}")
-
-        except Exception as e:
-            # 获取 key 信息用于日志，如果不存在则为 None
-            key_info = action.get('key') or action.get('button') or 'N/A'
-            self.log_info(f"执行动作失败 -> type: {action_type}, key/btn: {key_info}, Error: {e}")
-            raise
-
-    def _handle_mouse_click(self, action_type, button):
-        if action_type == "mouse_down":
-            self.mouse_down(key=button)
-        else:
-            self.mouse_up(key=button)
-
-    def _handle_keyboard(self, action_type, key):
-        key = normalize_key(key)
-
-        if key == 'f4':
-            if action_type == "key_down":
-                self.reset_and_transport()
-            return
-
-        # 3. 统一应用动态按键映射
-        if key == 'lshift':
-            key = self.get_dodge_key()
-        elif key == 'f':
-            key = self._resolve_f_key(action_type)
-        elif key == '4':
-            key = self.get_spiral_dive_key()
-        elif key == 'e':
-            key = self.get_combat_key()
-        elif key == 'q':
-            key = self.get_ultimate_key()
-        elif 'alt' in key:
-            return
-
-        # 4. 执行实际按键操作
-        if action_type == "key_down":
-            self.send_key_down(key)
-        elif action_type == "key_up":
-            self.send_key_up(key)
+    def wait_prematch(self, prematcher, timeout=2.0):
+        """
+        宏结束后等待预匹配稳定，最多等待 timeout 秒 (原固定等待时长)。
+        新帧由宏播放期间的采样线程持续写入 shared_frame。
+        """
+        # 只接受宏结束之后的帧参与确认，避免采用角色仍在移动时的结果
+        end_mark = prematcher.frames
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            name, conf = prematcher.stable_match(after=end_mark)
+            if name is not None:
+                self.log_info(f"预匹配命中: {name} (conf={conf:.4f})")
+                return name
+            self.sleep(0.05)
+        return None
 
     def _resolve_f_key(self, action_type):
         """
@@ -511,35 +593,9 @@ class ImportTask(DNAOneTimeTask, CommissionsTask, BaseCombatTask):
             else:
                 return 'f'
 
-    def execute_mouse_rotation(self, action):
-        direction = action.get("direction", "up")
-        angle = action.get("angle", 0)
-        sensitivity = action.get("sensitivity", 10)
-
-        pixels = int(angle * sensitivity)
-
-        # 使用字典映射替代 if-elif 链，更简洁
-        direction_map = {"left": (-pixels, 0), "right": (pixels, 0), "up": (0, -pixels), "down": (0, pixels)}
-
-        if direction not in direction_map:
-            logger.warning(f"未知的鼠标方向: {direction}")
-            return
-
-        dx, dy = direction_map[direction]
-        self.move_mouse_relative(dx, dy, self.original_Xsensitivity, self.original_Ysensitivity)
-        logger.debug(f"鼠标视角旋转: {direction}, 角度: {angle}, 像素: {pixels}")
-
-
-def normalize_key(key: str) -> str:
-    """
-    标准化按键名称
-    """
-    if not isinstance(key, str):
-        return key
-
-    key_lower = key.lower()
-    if key_lower == 'shift':
-        return 'lshift'
-    if key_lower == 'ctrl':
-        return 'lcontrol'
-    return key
+    def _send_interact(self, action_type):
+        key = self._resolve_f_key(action_type)
+        if action_type == "key_down":
+            self.send_key_down(key)
+        else:
+            self.send_key_up(key)
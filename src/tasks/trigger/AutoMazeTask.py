@@ -37,16 +37,18 @@ class AutoMazeTask(BaseDNATask, TriggerTask):
     def scan_puzzles(self):
         """扫描所有拼图位置"""
         found_any = False
-        if self.find_one("mech_retry",
-                         box=self.box_of_screen_scaled(2560, 1440, 2287, 1006, 2414, 1132, name="mech_retry",
-                                                       hcenter=True), threshold=0.65):
+        # 由 AutoHedge 在结算/菜单等静态界面反复调用，提示区域无变化时沿用上次结果
+        retry_f_box = self.box_of_screen_scaled(2560, 1440, 2287, 1006, 2414, 1132, name="mech_retry", hcenter=True)
+        if self.scene.prompt("mech_retry", retry_f_box, lambda: self.when_changed(
+                "mech_retry_f", lambda: self.find_one("mech_retry", box=retry_f_box, threshold=0.65),
+                roi=retry_f_box)):
             self.sleep_random(0.5, random_range=(1, 1.2))
             self.send_key("f", after_sleep=1)
             self._unlocked = True
             return
-        if not self.find_one("mech_retry",
-                             box=self.box_of_screen_scaled(3840, 2160, 3367, 1632, 3548, 1811, name="mech_retry",
-                                                           hcenter=True), threshold=0.65):
+        retry_box = self.box_of_screen_scaled(3840, 2160, 3367, 1632, 3548, 1811, name="mech_retry", hcenter=True)
+        if not self.scene.prompt("mech_retry", retry_box, lambda: self.when_changed(
+                "mech_retry", lambda: self.find_one("mech_retry", box=retry_box, threshold=0.65), roi=retry_box)):
             return
         
         self.rel_move_if_in_win()
@@ -28,7 +28,8 @@ class AutoPickTask(TriggerTask, BaseDNATask):
             return
         start = time.time()
         while time.time() - start < 1:
-            f = self.find_best_match_in_box(self.f_search_box, ["pick_up_f", "pick_up_e"], threshold=0.8)
+            f = self.scene.interact_prompt(lambda: self.find_best_match_in_box(
+                self.f_search_box, ["pick_up_f", "pick_up_e"], threshold=0.8))
             if not f:
                 return
             percent = self.calculate_color_percentage(f_black_color, f)
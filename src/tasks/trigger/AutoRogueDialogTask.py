@@ -25,9 +25,9 @@ class AutoRogueDialogTask(BaseDNATask, TriggerTask):
         rogue_gift = self.find_feature("rogue_gift", box=self.rogue_dialog_box)
         if (len(rogue_dialogs) == 1 and len(rogue_gift) == 0):
             self.click_box(rogue_dialogs)
-        if self.ocr(
-                box=self.box_of_screen_scaled(2560, 1440, 2092, 1380, 2183, 1418, name="space_text", hcenter=True),
-                match=re.compile("space", re.IGNORECASE)):
+        space_box = self.box_of_screen_scaled(2560, 1440, 2092, 1380, 2183, 1418, name="space_text", hcenter=True)
+        if self.scene.prompt("space", space_box, lambda: self.detect_prompt(
+                "rogue_space", space_box, re.compile("space", re.IGNORECASE))):
             self.sleep(0.4)
             self.send_key("space", down_time=3)
             self.sleep(0.5)
@@ -1,4 +1,3 @@
-from collections import deque
 import math
 import cv2
 import numpy as np
@@ -7,6 +6,7 @@ import re
 from ok import TriggerTask
 from qfluentwidgets import FluentIcon
 from src.tasks.BaseDNATask import BaseDNATask
+from src.utils.MechWheelSolver import solve as solve_wheel, tentacle_offsets
 
 class AutoRouletteTask(BaseDNATask, TriggerTask):
     def __init__(self, *args, **kwargs):
@@ -26,78 +26,26 @@ class AutoRouletteTask(BaseDNATask, TriggerTask):
         
     def solve_mech_wheel(self, mech_wheel, control):
         """
-        使用广度优先搜索 (BFS) 算法解决机械轮盘谜题。
+        解决机械轮盘谜题：GF(2) 高斯消元求操作次数最少的解 (见 MechWheelSolver)，结果带缓存。
 
         参数:
         mech_wheel (list): 开关状态的初始列表 (e.g., [True, False, ...])。
         control (list): 控制装置的定义 (e.g., [0, 120, 0])。
 
         返回:
-        list: 如果有解，返回操作位置的序列 (e.g., [4, 1, 0])。
+        list: 如果有解，返回操作位置的序列 (e.g., [0, 1, 4])。
         str: 如果无解，返回一个说明字符串。
         """
-        # --- 步骤 1: 解析 control 来确定操作模式 ---
-        # 根据您的解释, "60代表相邻", 所以我们用60作为单位长度。
-        # control = [0, 120, 0] 意味着触角在相对位置 0 和 120/60 = 2。
-        tentacle_relative_pos = [0]
-        current_pos = 0
-        # 假设 control 总是以0开始和结束
-        if len(control) > 1:
-            for i in range(1, len(control), 2):
-                distance = control[i]
-                step = distance // 60  # 计算相对步长
-                current_pos += step
-                tentacle_relative_pos.append(current_pos)
-
-        num_wheels = len(mech_wheel)
-
-        # --- 步骤 2: （可选）通过奇偶性检查快速判断无解情况 ---
-        initial_falses = sum(1 for w in mech_wheel if not w)
-        num_tentacles = len(tentacle_relative_pos)
         # 如果目标是0个False(偶数), 而初始是奇数个False, 并且每次操作翻转偶数个开关，则无解。
-        if initial_falses % 2 != 0 and num_tentacles % 2 == 0:
+        initial_falses = sum(1 for w in mech_wheel if not w)
+        if initial_falses % 2 != 0 and len(tentacle_offsets(control)) % 2 == 0:
             return "此问题无解 (无法从奇数个'False'通过每次翻转偶数个开关达到全'True'状态)。"
 
-        # --- 步骤 3: 设置 BFS ---
-        initial_state = tuple(mech_wheel)
-        target_state = tuple([True] * num_wheels)
-
-        if initial_state == target_state:
-            return []  # 已经完成，无需操作
-
-        # 队列中存储 (当前状态, 到达该状态的操作路径)
-        queue = deque([(initial_state, [])])
-        # visited集合用来存储已经访问过的状态，防止无限循环
-        visited = {initial_state}
-
-        # --- 步骤 4: 执行 BFS 搜索 ---
-        while queue:
-            current_state, path = queue.popleft()
-
-            # 尝试在每一个可能的位置 (0 到 num_wheels-1) 进行一次操作
-            for i in range(num_wheels):
-                next_state_list = list(current_state)
+        solution = solve_wheel(mech_wheel, control)
+        if solution is None:
+            return "此问题无解"
+        return solution
 
-                # 根据 control 的模式翻转对应位置的开关
-                for rel_pos in tentacle_relative_pos:
-                    flip_index = (i + rel_pos) % num_wheels
-                    next_state_list[flip_index] = not next_state_list[flip_index]
-
-                next_state = tuple(next_state_list)
-
-                # 如果达到目标状态，返回路径
-                if next_state == target_state:
-                    return path + [i]
-
-                # 如果是一个未曾访问过的新状态，则加入队列和visited集合
-                if next_state not in visited:
-                    visited.add(next_state)
-                    new_path = path + [i]
-                    queue.append((next_state, new_path))
-
-        # 如果队列为空，意味着已经探索了所有可能的状态但仍未找到解
-        return "此问题无解"
-    
     def get_croppe_img(self):
         len_height_ratio = 0.28
         cx, cy = self.width_of_screen(0.75) , self.height_of_screen(0.5)
@@ -327,13 +275,15 @@ class AutoRouletteTask(BaseDNATask, TriggerTask):
         if self.scene.in_team(self.in_team_and_world):
             return
         
-        if not self.ocr(box=self.box_of_screen_scaled(2560, 1440, 1878, 736, 1963, 769, name="space_text", hcenter=True),
-                    match=re.compile("space", re.IGNORECASE)):
+        space_box = self.box_of_screen_scaled(2560, 1440, 1878, 736, 1963, 769, name="space_text", hcenter=True)
+        if not self.scene.prompt("space", space_box, lambda: self.detect_prompt(
+                "roulette_space", space_box, re.compile("space", re.IGNORECASE))):
             return
         else:
             self.sleep(0.1)
 
-        if self.find_one("pick_up_f", box=self.box_of_screen_scaled(2560, 1440, 2275, 1235, 2365, 1315, name="f_search", hcenter=True)) :
+        f_box = self.box_of_screen_scaled(2560, 1440, 2275, 1235, 2365, 1315, name="f_search", hcenter=True)
+        if self.scene.prompt("f", f_box, lambda: self.find_one("pick_up_f", box=f_box)):
             self.sleep(0.5)
             self.send_key("f", after_sleep=1)
             self._unlocked = True
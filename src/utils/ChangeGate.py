@@ -0,0 +1,132 @@
+"""
+画面变化门控
+对检测区域做降采样灰度缩略图，与上次求值时的缩略图比较平均绝对差；
+区域没有变化时直接返回上次的检测结果，静态的结算/菜单界面几乎不再消耗 CPU
+"""
+
+import threading
+import time
+
+import cv2
+
+# 缩略图尺寸 (宽, 高)
+DEFAULT_THUMB_SIZE = (32, 18)
+# 平均绝对差 (0-255) 超过该值视为变化
+DEFAULT_CHANGE_THRESHOLD = 2.0
+# 即使画面不变，超过该秒数也重新求值，防止缓慢渐变或误判导致结果长期不更新
+DEFAULT_MAX_AGE = 1.0
+
+
+def thumbnail(frame, roi=None, size=DEFAULT_THUMB_SIZE):
+    """
+    Args:
+        frame (np.ndarray): BGR 或灰度帧。
+        roi (tuple, optional): (x1, y1, x2, y2)，为 None 时使用整帧。
+    """
+    if roi is not None:
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = roi
+        frame = frame[max(0, int(y1)):min(height, int(y2)), max(0, int(x1)):min(width, int(x2))]
+    if frame.size == 0:
+        return None
+    small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small[:, :, :3], cv2.COLOR_BGR2GRAY)
+    return small
+
+
+def difference(thumb1, thumb2):
+    """两张缩略图的平均绝对差。"""
+    return cv2.mean(cv2.absdiff(thumb1, thumb2))[0]
+
+
+def _thumbnails(frame, rois, size):
+    if rois is None or isinstance(rois[0], (int, float)):
+        rois = [rois]
+    return [thumbnail(frame, roi, size) for roi in rois]
+
+
+def _unchanged(thumbs1, thumbs2, threshold):
+    """每个区域的差异都小于阈值时视为未变化。"""
+    if thumbs2 is None or len(thumbs1) != len(thumbs2):
+        return False
+    for thumb1, thumb2 in zip(thumbs1, thumbs2):
+        if thumb1 is None or thumb2 is None or thumb1.shape != thumb2.shape:
+            return False
+        if difference(thumb1, thumb2) >= threshold:
+            return False
+    return True
+
+
+class ChangeGate:
+    """
+    按 key 缓存检测结果，只有对应区域发生变化 (或结果过期) 时才重新求值。
+
+    Example:
+        state = gate.get('mission_interface', frame, classify, roi=(0, 0, w, h))
+    """
+
+    def __init__(self, threshold=DEFAULT_CHANGE_THRESHOLD, max_age=DEFAULT_MAX_AGE, size=DEFAULT_THUMB_SIZE,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = size
+        self.clock = clock
+        # key -> (frame, thumb, result, evaluated_at)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.evaluations = 0
+        self.skips = 0
+
+    def get(self, key, frame, compute, roi=None, max_age=None):
+        """
+        Args:
+            key (hashable): 检测名称。
+            frame (np.ndarray): 当前帧。
+            compute (callable): 无参，返回检测结果。
+            roi (tuple | list, optional): 检测依赖的区域 (x1, y1, x2, y2)，或多个区域的列表。
+            max_age (float, optional): 覆盖默认的最长复用时间。
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+        thumb = None
+        if entry is not None and now - entry[3] < max_age:
+            if frame is entry[0]:
+                self.skips += 1
+                return entry[2]
+            thumb = _thumbnails(frame, roi, self.size)
+            if _unchanged(thumb, entry[1], self.threshold):
+                self.skips += 1
+                return entry[2]
+        if thumb is None:
+            thumb = _thumbnails(frame, roi, self.size)
+        result = compute()
+        self.evaluations += 1
+        with self._lock:
+            self._entries[key] = (frame, thumb, result, now)
+        return result
+
+    def changed(self, key, frame, roi=None):
+        """
+        只判断区域是否相对上次调用发生变化，不缓存结果。首次调用返回 True。
+        """
+        thumb = _thumbnails(frame, roi, self.size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and _unchanged(thumb, entry[1], self.threshold):
+                return False
+            self._entries[key] = (frame, thumb, None, self.clock())
+        return True
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def summary(self):
+        total = self.evaluations + self.skips
+        return f"求值{self.evaluations} 跳过{self.skips} ({self.skips / total if total else 0:.0%})"
@@ -0,0 +1,134 @@
+"""
+HUD 数字快速识别
+波次 (1/5)、轮次、进度 (37%) 等位置与字体固定的读数，用最近邻字形匹配代替完整 OCR:
+区域二值化后按连通域切分字形，缩放到固定尺寸，与已学习的样本逐个比较。
+样本来自完整 OCR 的结果 (自校准)，置信度不足时由调用方回退到 OCR 并继续学习
+"""
+
+import threading
+
+import cv2
+
+# 字形归一化尺寸 (宽, 高)
+GLYPH_SIZE = (10, 14)
+# 小于该面积 (像素) 的连通域视为噪点
+MIN_GLYPH_AREA = 4
+# 每个字符最多保留的样本数
+MAX_SAMPLES_PER_CHAR = 8
+# 识别结果的最低置信度 (1 - 归一化平均差)
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+
+def binarize(image):
+    """Otsu 二值化，保证字形为前景 (255)：取像素数较少的一类作为前景。"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size // 2:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+
+def segment(binary):
+    """
+    切分字形，返回按 x 排序的归一化字形列表 (uint8, GLYPH_SIZE)。
+
+    x 方向重叠的连通域合并为同一个字形 (如 % 的上下两个圆与斜线)。
+    """
+    num_labels, _, stats, _ = cv2.connectedComponentsWithStats(binary)
+    boxes = []
+    for i in range(1, num_labels):
+        x, y, w, h, area = stats[i]
+        if area >= MIN_GLYPH_AREA:
+            boxes.append([x, y, x + w, y + h])
+    boxes.sort(key=lambda b: b[0])
+    merged = []
+    for box in boxes:
+        if merged and box[0] < merged[-1][2]:
+            last = merged[-1]
+            last[0], last[1] = min(last[0], box[0]), min(last[1], box[1])
+            last[2], last[3] = max(last[2], box[2]), max(last[3], box[3])
+        else:
+            merged.append(box)
+    return [cv2.resize(binary[y1:y2, x1:x2], GLYPH_SIZE, interpolation=cv2.INTER_AREA)
+            for x1, y1, x2, y2 in merged]
+
+
+def glyph_distance(glyph, sample):
+    """归一化平均绝对差，0 为完全相同，1 为完全相反。"""
+    return cv2.mean(cv2.absdiff(glyph, sample))[0] / 255
+
+
+class DigitReader:
+    """
+    单个读数区域的最近邻字形识别器。
+
+    Example:
+        result = reader.read(crop)
+        if result is None:
+            text = full_ocr(crop)
+            reader.learn(crop, text)
+    """
+
+    def __init__(self, min_confidence=DEFAULT_MIN_CONFIDENCE, max_samples=MAX_SAMPLES_PER_CHAR):
+        self.min_confidence = min_confidence
+        self.max_samples = max_samples
+        self.samples = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.fallbacks = 0
+
+    @property
+    def calibrated(self):
+        return bool(self.samples)
+
+    def learn(self, image, text):
+        """
+        用完整 OCR 的结果学习字形；字形数量与文本字符数不一致时放弃 (区域内有其他干扰)。
+
+        Returns:
+            bool: 是否学习成功。
+        """
+        chars = [c for c in text if not c.isspace()]
+        glyphs = segment(binarize(image))
+        if not chars or len(glyphs) != len(chars):
+            return False
+        with self._lock:
+            for char, glyph in zip(chars, glyphs):
+                samples = self.samples.setdefault(char, [])
+                # 与已有样本几乎相同时不再重复保存
+                if any(glyph_distance(glyph, s) < 0.02 for s in samples):
+                    continue
+                samples.append(glyph)
+                if len(samples) > self.max_samples:
+                    samples.pop(0)
+        return True
+
+    def read(self, image):
+        """
+        Returns:
+            tuple | None: (文本, 置信度)；未校准、无字形或任一字形置信度不足时返回 None。
+        """
+        with self._lock:
+            if not self.samples:
+                self.fallbacks += 1
+                return None
+            samples = [(char, s) for char, items in self.samples.items() for s in items]
+        glyphs = segment(binarize(image))
+        if not glyphs:
+            self.fallbacks += 1
+            return None
+        text = []
+        confidence = 1.0
+        for glyph in glyphs:
+            char, distance = min(((c, glyph_distance(glyph, s)) for c, s in samples), key=lambda item: item[1])
+            confidence = min(confidence, 1 - distance)
+            if confidence < self.min_confidence:
+                self.fallbacks += 1
+                return None
+            text.append(char)
+        self.reads += 1
+        return ''.join(text), confidence
+
+    def summary(self):
+        return f"快速{self.reads} 回退{self.fallbacks} 字符{len(self.samples)}"
+
@@ -0,0 +1,248 @@
+"""
+钓鱼溜鱼控制器
+每帧输入检测结果 (ROI 内部坐标)，输出是否按住空格 (True 按住 / False 松开 / None 保持):
+    HysteresisController: 原 phase_fight 的滞回控制，鱼标在上控制区按住，在下控制区松开
+    PredictiveController: 用 alpha-beta 滤波跟踪鱼标与鱼条的位置和速度，
+        预测按键真正生效时 (处理延迟 + 输入延迟之后) 的位置再做滞回判断；
+        鱼标与鱼条重合而看不到鱼标时按速度外推，代替固定的合并宽限时间
+FishingLoop 是溜鱼控制循环的单帧步骤 (检测 -> 控制区比例 -> 控制器 -> 按键)，
+AutoFishTask.phase_fight 与离线模拟器 (FishingSimulator) 共用
+"""
+
+import time
+
+# 鱼标与鱼条合并后，按合并前相对位置继续操作的时间
+MERGE_GRACE_SECONDS = 0.20
+# 预测控制器看不到鱼标时最长外推时间
+MAX_COAST_SECONDS = 0.5
+
+
+def adapt_zone_ratio(current, bar_area, roi_area):
+    """控制区比例跟随鱼条面积占 ROI 的比例，变化超过 10% 时才更新。"""
+    zone_ratio = bar_area / roi_area
+    if current <= 0 or abs(zone_ratio - current) / current > 0.1:
+        return zone_ratio
+    return current
+
+
+def zone_hold(icon_y, bar_top, bar_bottom, zone_ratio):
+    """鱼标在上控制区返回 True，在下控制区返回 False，在中立区返回 None。"""
+    bar_height = max(1, bar_bottom - bar_top)
+    control_height = int(bar_height * zone_ratio)
+    if icon_y < bar_top + control_height:
+        return True
+    if icon_y > bar_bottom - control_height:
+        return False
+    return None
+
+
+class AlphaBetaTracker:
+    """
+    一维 alpha-beta 滤波，跟踪位置与速度 (像素/秒)。
+
+    Args:
+        alpha (float): 位置修正系数。
+        beta (float): 速度修正系数。
+        max_gap (float): 两次观测间隔超过该值 (秒) 时重新初始化。
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1, max_gap=0.5):
+        self.alpha = alpha
+        self.beta = beta
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self.position = None
+        self.velocity = 0.0
+        self.time = None
+
+    def update(self, t, measured):
+        if self.position is None or t - self.time > self.max_gap:
+            self.position = float(measured)
+            self.velocity = 0.0
+            self.time = t
+            return self.position
+        dt = t - self.time
+        if dt <= 0:
+            return self.position
+        predicted = self.position + self.velocity * dt
+        residual = measured - predicted
+        self.position = predicted + self.alpha * residual
+        self.velocity += self.beta * residual / dt
+        self.time = t
+        return self.position
+
+    def predict(self, t):
+        """t 时刻的预测位置，尚无观测时返回 None。"""
+        if self.position is None:
+            return None
+        return self.position + self.velocity * (t - self.time)
+
+
+class HysteresisController:
+    """原 phase_fight 的滞回控制，行为保持不变。"""
+
+    def __init__(self, merge_grace=MERGE_GRACE_SECONDS):
+        self.merge_grace = merge_grace
+        self.reset()
+
+    def reset(self):
+        self.icon_was_visible = False
+        self.last_relative = 0.0
+        self.merge_start = None
+        self.last_merge_event = None
+
+    def update(self, t, bar_rect, bar_center, icon_center, zone_ratio, lead=0.0):
+        """
+        Args:
+            t (float): 帧的采集时刻 (秒)。
+            bar_rect (tuple | None): 鱼条 (x1, y1, x2, y2)，未检测到为 None。
+            bar_center (tuple | None): 鱼条中心。
+            icon_center (tuple | None): 鱼标中心，未检测到为 None。
+            zone_ratio (float): 控制区占鱼条高度的比例。
+            lead (float): 从采集到按键生效的延迟 (秒)，滞回控制不使用。
+
+        Returns:
+            bool | None: 是否按住空格，None 表示保持当前状态。
+        """
+        has_icon = icon_center is not None
+        was_visible, self.icon_was_visible = self.icon_was_visible, has_icon
+        if bar_rect is None:
+            return False
+        if has_icon:
+            if bar_center is not None:
+                self.last_relative = icon_center[1] - bar_center[1]
+            self.merge_start = None
+            return zone_hold(icon_center[1], bar_rect[1], bar_rect[3], zone_ratio)
+        if not was_visible:
+            self.merge_start = None
+            return None
+        # 鱼标与鱼条合并: 宽限时间内按合并前的相对位置操作
+        if self.merge_start is None:
+            self.merge_start = t
+            self.last_merge_event = f"merged, last_rel={self.last_relative:.1f}"
+        if t - self.merge_start <= self.merge_grace:
+            return self.last_relative < 0
+        return None
+
+
+class PredictiveController:
+    """
+    预测控制：跟踪鱼标和鱼条上下沿，在 t + lead 时刻的预测位置上做滞回判断。
+
+    Args:
+        alpha (float): 传给 AlphaBetaTracker。
+        beta (float): 传给 AlphaBetaTracker。
+        max_coast (float): 看不到鱼标时最长外推时间 (秒)，超过后保持当前状态。
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1, max_coast=MAX_COAST_SECONDS):
+        self.max_coast = max_coast
+        self.icon = AlphaBetaTracker(alpha, beta)
+        self.bar_top = AlphaBetaTracker(alpha, beta)
+        self.bar_bottom = AlphaBetaTracker(alpha, beta)
+        self.reset()
+
+    def reset(self):
+        self.icon.reset()
+        self.bar_top.reset()
+        self.bar_bottom.reset()
+        self.coasting = False
+        self.last_merge_event = None
+
+    def update(self, t, bar_rect, bar_center, icon_center, zone_ratio, lead=0.0):
+        """参数与返回值同 HysteresisController.update。"""
+        if bar_rect is None:
+            self.reset()
+            return False
+        self.bar_top.update(t, bar_rect[1])
+        self.bar_bottom.update(t, bar_rect[3])
+        if icon_center is not None:
+            self.icon.update(t, icon_center[1])
+            self.coasting = False
+        elif self.icon.time is None or t - self.icon.time > self.max_coast:
+            return None
+        elif not self.coasting:
+            self.coasting = True
+            self.last_merge_event = f"coast, v={self.icon.velocity:.0f}px/s"
+
+        target = t + lead
+        bar_top = self.bar_top.predict(target)
+        bar_bottom = self.bar_bottom.predict(target)
+        icon_y = self.icon.predict(target)
+        if self.coasting:
+            # 看不到鱼标说明它与鱼条重合，外推结果限制在鱼条范围内
+            icon_y = min(max(icon_y, bar_top), bar_bottom)
+        return zone_hold(icon_y, bar_top, bar_bottom, zone_ratio)
+
+
+class FishingLoop:
+    """
+    溜鱼控制的单帧步骤，截图来源与按键接口由调用方提供。
+
+    Args:
+        detect (callable): detect(roi_img) -> FishDetection。
+        controller: CONTROLLERS 中控制器的实例。
+        keyboard: 提供 send_key_down(key) / send_key_up(key) 的按键接口。
+        roi_area (float): ROI 面积 (像素)，控制区比例按鱼条面积占比自适应。
+        zone_ratio (float): 初始控制区比例。
+        extra_latency (float): 按键发出到游戏生效的额外延迟 (秒)。
+        clock (callable): 与帧采集时刻同一时基的时钟 (秒)。
+        key (str): 控制鱼条的按键。
+    """
+
+    def __init__(self, detect, controller, keyboard, roi_area, zone_ratio=0.25, extra_latency=0.0,
+                 clock=time.perf_counter, key="space"):
+        self.detect = detect
+        self.controller = controller
+        self.keyboard = keyboard
+        self.roi_area = roi_area
+        self.zone_ratio = zone_ratio
+        self.extra_latency = extra_latency
+        self.clock = clock
+        self.key = key
+        self.holding = False
+        # 按键发送耗时 (平滑)，计入控制器的提前量
+        self.send_latency = 0.0
+
+    def step(self, roi_img, captured_at):
+        """
+        处理一帧 ROI：检测、更新控制区比例、按控制器结果按住/松开按键。
+
+        Args:
+            roi_img (np.ndarray): 鱼条区域截图。
+            captured_at (float): 截图的采集时刻 (clock 时基)。
+
+        Returns:
+            FishDetection: 本帧的检测结果。
+        """
+        detection = self.detect(roi_img)
+        if detection.has_bar:
+            self.zone_ratio = adapt_zone_ratio(self.zone_ratio, detection.bar_area, self.roi_area)
+        # 按键在 处理延迟 + 发送耗时 + 输入延迟 之后生效
+        lead = self.clock() - captured_at + self.send_latency + self.extra_latency
+        target_hold = self.controller.update(captured_at, detection.bar_rect if detection.has_bar else None,
+                                             detection.bar_center,
+                                             detection.icon_center if detection.has_icon else None,
+                                             self.zone_ratio, lead)
+        if target_hold is not None:
+            self.set_hold(target_hold)
+        return detection
+
+    def set_hold(self, hold):
+        if hold == self.holding:
+            return
+        sent_at = self.clock()
+        if hold:
+            self.keyboard.send_key_down(self.key)
+        else:
+            self.keyboard.send_key_up(self.key)
+        self.send_latency = self.send_latency * 0.8 + (self.clock() - sent_at) * 0.2
+        self.holding = hold
+
+
+CONTROLLERS = {
+    '滞回': HysteresisController,
+    '预测': PredictiveController,
+}
@@ -0,0 +1,257 @@
+"""
+离线钓鱼模拟器
+按可配置的鱼标运动、截图延迟、输入延迟与噪声渲染合成的鱼条区域 ROI，
+以模拟画面为截图来源、模拟按键接口为输入，驱动与 AutoFishTask.phase_fight 相同的单帧步骤 (FishingLoop)，
+统计鱼标在鱼条内的时间占比、每秒按键切换次数、每帧检测+控制的 CPU 时间以及收线用时。
+不依赖游戏与 ok，可在 Linux CI 上对比检测器/控制器的改动
+
+模拟画面约定 (1080p, ROI 25x400):
+    鱼条为白色实心矩形，按住空格时向上加速，松开时向下加速；
+    鱼标在鱼条外为白色圆点，在鱼条内为鱼条上的暗色圆点
+
+用法:
+    python -m src.utils.FishingSimulator [秒数]
+
+参考结果 (20 秒 x 3 个种子，截图延迟 20ms，输入延迟 30ms；CPU 时间随机器变化):
+    contour    滞回  鱼条内 62.9%  切换 1.2次/秒  ~98us/帧   收线 10.8s
+    contour    预测  鱼条内 74.8%  切换 1.2次/秒  ~99us/帧   收线 7.9s
+    projection 滞回  鱼条内 51.9%  切换 0.8次/秒  ~179us/帧  收线 16.1s (3轮中2轮)
+    projection 预测  鱼条内 55.9%  切换 1.0次/秒  ~182us/帧  收线 8.8s (3轮中2轮)
+    projection 看不到画在鱼条内的暗色鱼标，只能在鱼标位于鱼条外时控制
+"""
+
+import sys
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from src.utils.FishingControl import CONTROLLERS, FishingLoop
+from src.utils.FishingVision import DETECTORS
+
+# ROI 尺寸 (1080p, 宽, 高)
+ROI_SIZE = (25, 400)
+BAR_HEIGHT = 110
+ICON_RADIUS = 7
+BACKGROUND = 60
+
+
+class FishDynamics:
+    """
+    鱼标运动：每隔一段随机时间选择新的目标位置，以有限速度移动过去，带随机抖动。
+
+    Args:
+        speed (float): 最大速度 (像素/秒)。
+        change_interval (tuple): 更换目标的间隔范围 (秒)。
+        jitter (float): 速度抖动 (像素/秒)。
+    """
+
+    def __init__(self, speed=150.0, change_interval=(0.4, 1.2), jitter=20.0):
+        self.speed = speed
+        self.change_interval = change_interval
+        self.jitter = jitter
+
+    def start(self, rng, height):
+        self.rng = rng
+        self.height = height
+        self.y = height / 2
+        self.target = self.y
+        self.next_change = 0.0
+
+    def step(self, t, dt):
+        if t >= self.next_change:
+            self.target = self.rng.uniform(ICON_RADIUS, self.height - ICON_RADIUS)
+            self.next_change = t + self.rng.uniform(*self.change_interval)
+        velocity = np.clip((self.target - self.y) * 4, -self.speed, self.speed) + self.rng.normal(0, self.jitter)
+        self.y = float(np.clip(self.y + velocity * dt, ICON_RADIUS, self.height - ICON_RADIUS))
+        return self.y
+
+
+class StubKeyboard:
+    """模拟按键接口，按下/松开在 latency 秒后才对模拟生效。"""
+
+    def __init__(self, clock, latency=0.0):
+        self.clock = clock
+        self.latency = latency
+        self.events = deque()
+        self.toggles = 0
+        self._state = False
+
+    def send_key_down(self, key="space"):
+        self._send(True)
+
+    def send_key_up(self, key="space"):
+        self._send(False)
+
+    def _send(self, down):
+        self.toggles += 1
+        self.events.append((self.clock() + self.latency, down))
+
+    def pressed(self, t):
+        """t 时刻游戏看到的按键状态。"""
+        while self.events and self.events[0][0] <= t:
+            self._state = self.events.popleft()[1]
+        return self._state
+
+
+class FishingSimulator:
+    """
+    Args:
+        detector (str): DETECTORS 的键。
+        controller (str): CONTROLLERS 的键。
+        fps (float): 截图帧率，也是控制循环频率。
+        capture_latency (float): 画面渲染到截图可用的延迟 (秒)。
+        input_latency (float): 按键发出到游戏生效的延迟 (秒)。
+        noise (int): 均匀噪声幅度 (灰度)。
+        res_ratio (float): 分辨率缩放 (屏幕高度 / 1080)。
+        fish (FishDynamics, optional): 鱼标运动。
+        lift (float): 按住时鱼条向上的加速度 (像素/秒²)。
+        gravity (float): 松开时鱼条向下的加速度 (像素/秒²)。
+        bar_speed (float): 鱼条最大速度 (像素/秒)。
+        catch_rate (float): 鱼标在鱼条内时每秒增加的收线进度，进度达到 1 时结束。
+        escape_rate (float): 鱼标在鱼条外时每秒减少的收线进度。
+        seed (int): 随机种子，相同参数与种子的结果完全一致 (CPU 时间除外)。
+    """
+
+    def __init__(self, detector='contour', controller='滞回', fps=120.0, capture_latency=0.02,
+                 input_latency=0.03, noise=8, res_ratio=1.0, fish=None, lift=1500.0, gravity=1500.0,
+                 bar_speed=250.0, catch_rate=0.25, escape_rate=0.15, seed=0):
+        self.detect = DETECTORS[detector]
+        self.controller = CONTROLLERS[controller]()
+        self.fps = fps
+        self.capture_latency = capture_latency
+        self.input_latency = input_latency
+        self.noise = noise
+        self.res_ratio = res_ratio
+        self.fish = fish or FishDynamics()
+        self.lift = lift
+        self.gravity = gravity
+        self.bar_speed = bar_speed
+        self.catch_rate = catch_rate
+        self.escape_rate = escape_rate
+        self.seed = seed
+
+    def render(self, bar_top, icon_y, rng):
+        """渲染 1080p 下的 ROI，再按 res_ratio 缩放。"""
+        width, height = ROI_SIZE
+        roi = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+        bar_top, icon_y = int(round(bar_top)), int(round(icon_y))
+        cv2.rectangle(roi, (3, bar_top), (21, bar_top + BAR_HEIGHT), (255, 255, 255), -1)
+        inside = bar_top + ICON_RADIUS + 2 < icon_y < bar_top + BAR_HEIGHT - ICON_RADIUS - 2
+        outside = icon_y + ICON_RADIUS + 2 < bar_top or icon_y - ICON_RADIUS - 2 > bar_top + BAR_HEIGHT
+        if inside:
+            cv2.circle(roi, (12, icon_y), ICON_RADIUS, (BACKGROUND,) * 3, -1)
+        elif outside:
+            cv2.circle(roi, (12, icon_y), ICON_RADIUS, (240, 240, 240), -1)
+        # 与鱼条边缘相交时两者在画面上合并，看不到鱼标
+        if self.res_ratio != 1.0:
+            roi = cv2.resize(roi, None, fx=self.res_ratio, fy=self.res_ratio)
+        if self.noise > 0:
+            noise = rng.integers(-self.noise, self.noise + 1, roi.shape, dtype=np.int16)
+            roi = np.clip(roi + noise, 0, 255).astype(np.uint8)
+        return roi
+
+    def run(self, duration=10.0, stop_when_caught=False):
+        """
+        Returns:
+            dict: in_zone (鱼标在鱼条内的时间占比), toggles_per_sec, cpu_us (每帧检测+控制),
+                frames, catch_time (收线进度达到 1 的时刻，未达到为 None)。
+        """
+        # 鱼标运动与画面噪声使用独立的随机序列，不同检测器/控制器面对完全相同的鱼
+        fish_rng, noise_rng = (np.random.default_rng(seed) for seed in np.random.SeedSequence(self.seed).spawn(2))
+        dt = 1 / self.fps
+        height = ROI_SIZE[1]
+        roi_area = ROI_SIZE[0] * ROI_SIZE[1] * self.res_ratio ** 2
+        self.fish.start(fish_rng, height)
+        self.controller.reset()
+
+        t = 0.0
+        keyboard = StubKeyboard(lambda: t, self.input_latency)
+        # 与 AutoFishTask.phase_fight 相同的单帧步骤，时钟使用模拟时间
+        loop = FishingLoop(lambda roi: self.detect(roi, self.res_ratio), self.controller, keyboard, roi_area,
+                           extra_latency=self.input_latency, clock=lambda: t)
+        bar_top, bar_velocity = (height - BAR_HEIGHT) / 2, 0.0
+        snapshots = deque()
+        in_zone = 0
+        progress = 0.0
+        catch_time = None
+        cpu_total = 0.0
+        frames = 0
+        steps = int(duration * self.fps)
+
+        for step in range(steps):
+            t = step * dt
+            # 游戏侧: 按键状态 -> 鱼条运动，鱼标运动，收线进度
+            acceleration = -self.lift if keyboard.pressed(t) else self.gravity
+            bar_velocity = min(max(bar_velocity + acceleration * dt, -self.bar_speed), self.bar_speed)
+            bar_top += bar_velocity * dt
+            if bar_top < 0 or bar_top > height - BAR_HEIGHT:
+                bar_top = min(max(bar_top, 0), height - BAR_HEIGHT)
+                bar_velocity = 0.0
+            icon_y = self.fish.step(t, dt)
+            if bar_top <= icon_y <= bar_top + BAR_HEIGHT:
+                in_zone += 1
+                progress += self.catch_rate * dt
+            else:
+                progress = max(0.0, progress - self.escape_rate * dt)
+            if catch_time is None and progress >= 1:
+                catch_time = t
+                if stop_when_caught:
+                    steps = step + 1
+                    break
+            snapshots.append((t, bar_top, icon_y))
+
+            # 脚本侧: 只能拿到 capture_latency 之前的画面
+            snapshot = None
+            while snapshots and snapshots[0][0] <= t - self.capture_latency + 1e-9:
+                snapshot = snapshots.popleft()
+            if snapshot is None:
+                continue
+            captured_at, shown_top, shown_icon = snapshot
+            roi = self.render(shown_top, shown_icon, noise_rng)
+
+            start = time.thread_time()
+            loop.step(roi, captured_at)
+            cpu_total += time.thread_time() - start
+            frames += 1
+
+        elapsed = steps * dt
+        return {
+            'in_zone': in_zone / max(1, steps),
+            'toggles_per_sec': keyboard.toggles / elapsed if elapsed > 0 else 0.0,
+            'cpu_us': cpu_total / max(1, frames) * 1e6,
+            'frames': frames,
+            'catch_time': catch_time,
+        }
+
+
+def benchmark(duration=10.0, seeds=(0, 1, 2), **kwargs):
+    """
+    所有检测器 x 控制器组合在相同种子下的平均指标。
+
+    Returns:
+        dict: {(detector, controller): 指标 dict}，catch_time 为收线成功轮次的平均值。
+    """
+    results = {}
+    for detector in DETECTORS:
+        for controller in CONTROLLERS:
+            runs = [FishingSimulator(detector, controller, seed=seed, **kwargs).run(duration) for seed in seeds]
+            caught = [run['catch_time'] for run in runs if run['catch_time'] is not None]
+            results[(detector, controller)] = {
+                'in_zone': sum(run['in_zone'] for run in runs) / len(runs),
+                'toggles_per_sec': sum(run['toggles_per_sec'] for run in runs) / len(runs),
+                'cpu_us': sum(run['cpu_us'] for run in runs) / len(runs),
+                'catch_time': sum(caught) / len(caught) if caught else None,
+                'caught': len(caught),
+            }
+    return results
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    for (detector, controller), stats in benchmark(seconds).items():
+        catch = f"{stats['catch_time']:.1f}s" if stats['catch_time'] is not None else "-"
+        print(f"{detector:<10} {controller:<4} 鱼条内{stats['in_zone'] * 100:5.1f}% "
+              f"切换{stats['toggles_per_sec']:5.1f}次/秒 检测+控制{stats['cpu_us']:6.1f}us/帧 "
+              f"收线{catch} ({stats['caught']}轮)")
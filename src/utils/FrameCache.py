@@ -0,0 +1,63 @@
+"""
+单帧检测结果缓存
+同一帧上重复调用的检测 (如同一循环内多次 in_team / find_retry_btn) 直接返回上次结果，
+帧对象变化时整体失效
+"""
+
+import threading
+
+_MISSING = object()
+
+
+class FrameCache:
+    """
+    以帧对象本身 (is 判断) 为版本的检测结果缓存。
+
+    只保存当前帧的结果；传入新帧时清空旧结果，因此不会因帧对象被回收、id 复用而误命中。
+    """
+
+    def __init__(self):
+        self._frame = None
+        self._results = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, frame, key, compute):
+        """
+        Args:
+            frame (np.ndarray): 检测所用的帧。
+            key (hashable): 检测参数，如 (特征名, 区域, 阈值)。
+            compute (callable): 未命中时调用，返回值 (包括 None) 会被缓存。
+        """
+        with self._lock:
+            if frame is self._frame:
+                result = self._results.get(key, _MISSING)
+                if result is not _MISSING:
+                    self.hits += 1
+                    return result
+        result = compute()
+        with self._lock:
+            self.misses += 1
+            if frame is not self._frame:
+                self._frame = frame
+                self._results = {}
+            self._results[key] = result
+        return result
+
+    def invalidate(self):
+        with self._lock:
+            self._frame = None
+            self._results = {}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return f"命中{self.hits} 未命中{self.misses} 命中率{self.hit_rate:.0%}"
@@ -0,0 +1,120 @@
+"""
+后台帧采样线程
+按固定帧率在独立线程中截图，使用方只读取最新一帧的引用，不再等待截图；
+也可以只订阅一小块区域 (grab 返回裁剪图)，以截图设备的最高帧率驱动控制循环
+"""
+
+import threading
+import time
+
+DEFAULT_FPS = 10
+# grab 返回 None (无法截图、画面未更新) 时的最短等待，避免不限速时空转占满一个核心
+IDLE_BACKOFF = 0.002
+
+
+class FrameSampler:
+    """
+    固定帧率的截图线程。
+
+    Example:
+        sampler = FrameSampler(grab, fps=10, on_frame=publish)
+        with sampler:
+            frame = sampler.latest
+    """
+
+    def __init__(self, grab, fps=DEFAULT_FPS, on_frame=None, idle_backoff=IDLE_BACKOFF):
+        """
+        Args:
+            grab (callable): 截图函数，返回 np.ndarray 或 None。
+            fps (float): 采样帧率，None 表示不限速 (由 grab 本身的耗时决定)。
+            on_frame (callable, optional): 每采到一帧时回调 (在采样线程中执行)。
+            idle_backoff (float): grab 没有返回帧时至少等待的秒数。
+        """
+        self.grab = grab
+        self.interval = 0.0 if fps is None else 1.0 / max(fps, 0.1)
+        self.on_frame = on_frame
+        self.idle_backoff = idle_backoff
+        self.frames = 0
+        self.errors = 0
+        self.last_error = None
+        self.capture_time = 0.0
+        self._latest = (None, 0.0)
+        self._stop_event = threading.Event()
+        self._new_frame = threading.Condition()
+        self._thread = None
+
+    @property
+    def latest(self):
+        """最新一帧，尚未采到时为 None。"""
+        return self._latest[0]
+
+    @property
+    def latest_time(self):
+        """最新一帧的采集时刻 (perf_counter)。"""
+        return self._latest[1]
+
+    @property
+    def average_capture_time(self):
+        return self.capture_time / self.frames if self.frames else 0.0
+
+    def wait_next(self, seen=0, timeout=1.0):
+        """
+        等待第 seen 帧之后的新帧。
+
+        Args:
+            seen (int): 已处理过的帧序号 (即上次返回的序号)。
+
+        Returns:
+            tuple: (frame, 序号, 采集时刻)；超时或已停止时返回 (None, seen, 0.0)。
+        """
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self.frames > seen or self._stop_event.is_set(), timeout)
+            if self.frames <= seen:
+                return None, seen, 0.0
+            frame, captured_at = self._latest
+            return frame, self.frames, captured_at
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='FrameSampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        with self._new_frame:
+            self._new_frame.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                frame = self.grab()
+            except Exception as e:
+                frame = None
+                self.errors += 1
+                self.last_error = e
+            now = time.perf_counter()
+            if frame is not None:
+                with self._new_frame:
+                    self.frames += 1
+                    self.capture_time += now - start
+                    self._latest = (frame, now)
+                    self._new_frame.notify_all()
+                if self.on_frame is not None:
+                    self.on_frame(frame)
+            # 截图过慢时不补帧，直接从当前时刻重新计时；没有取到帧时至少退避 idle_backoff
+            next_tick = max(next_tick + self.interval, now + (0.0 if frame is not None else self.idle_backoff))
+            self._stop_event.wait(next_tick - time.perf_counter())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
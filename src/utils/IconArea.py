@@ -0,0 +1,59 @@
+"""
+图标连通区域面积
+in_team 通过比较大招图标与屏幕对应区域的 "最大区域反转后的最大连通面积" 判断是否在队伍中，
+这里提供只计算面积的快速实现，以及按模板缓存的参考面积
+"""
+
+import cv2
+
+# 与 in_team 原有判定一致: 面积相对误差小于该值视为匹配
+AREA_TOLERANCE = 0.15
+
+
+def max_inverted_area(mat, reject_below=0):
+    """
+    与 BaseDNATask.invert_max_area_only(mat)[2] 结果相同，但不生成中间掩码图。
+
+    1. 非零像素二值化，取最大连通区域 L
+    2. 返回 L 之外像素的最大连通区域面积
+
+    Args:
+        reject_below (float): L 之外的像素总数已小于该值时 (结果必然更小) 跳过第二次连通分析，直接返回 0。
+    """
+    gray = cv2.cvtColor(mat, cv2.COLOR_BGR2GRAY) if mat.ndim == 3 else mat
+    binary = cv2.compare(gray, 0, cv2.CMP_GT)
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(binary)
+    if num_labels <= 1:
+        return 0
+    max_idx = int(stats[1:, cv2.CC_STAT_AREA].argmax()) + 1
+    if binary.size - stats[max_idx, cv2.CC_STAT_AREA] < reject_below:
+        return 0
+    inverted = cv2.compare(labels, max_idx, cv2.CMP_NE)
+    num_labels2, _, stats2, _ = cv2.connectedComponentsWithStats(inverted)
+    if num_labels2 <= 1:
+        return 0
+    return int(stats2[1:, cv2.CC_STAT_AREA].max())
+
+
+class IconAreaMatcher:
+    """
+    缓存模板一侧的参考面积，模板对象变化 (如切换分辨率后重新加载特征) 时才重新计算。
+    """
+
+    def __init__(self, tolerance=AREA_TOLERANCE):
+        self.tolerance = tolerance
+        self._template = None
+        self._reference = 0
+
+    def reference_area(self, template):
+        if template is not self._template:
+            self._reference = max_inverted_area(template)
+            self._template = template
+        return self._reference
+
+    def matches(self, template, crop):
+        reference = self.reference_area(template)
+        if reference <= 0:
+            return False
+        area = max_inverted_area(crop, reject_below=reference * (1 - self.tolerance))
+        return abs(reference - area) / reference < self.tolerance
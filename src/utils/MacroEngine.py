@@ -0,0 +1,199 @@
+"""
+宏编译与播放引擎
+把外部逻辑脚本 (绝对时间 time) 和护送路径 (相对时间 delay) 编译成统一的扁平动作表，
+按键映射与灵敏度换算在编译时完成，播放时按绝对时间轴对齐以消除累计漂移
+"""
+
+import time
+from collections import namedtuple
+
+# 编译后的动作类型
+OP_MOVE = 'move'  # (dx, dy) 已换算灵敏度的像素
+OP_MOUSE_DOWN = 'mouse_down'  # (button,)
+OP_MOUSE_UP = 'mouse_up'  # (button,)
+OP_KEY_DOWN = 'key_down'  # (key,) 已映射的按键
+OP_KEY_UP = 'key_up'  # (key,)
+OP_INTERACT_DOWN = 'interact_down'  # () F 键，交互/快速破解需在运行时按间隔判定
+OP_INTERACT_UP = 'interact_up'  # ()
+OP_TRANSPORT = 'transport'  # () F4，复位并传送
+OP_DELAY = 'delay'  # () 等待标记
+
+# 迟到超过该值 (如任务暂停) 时整体平移时间轴，避免恢复后连续补发动作
+DEFAULT_RESYNC_THRESHOLD = 0.25
+
+MacroStep = namedtuple('MacroStep', ['at', 'op', 'args', 'source'])
+
+ROTATION_DIRECTIONS = {"left": (-1, 0), "right": (1, 0), "up": (0, -1), "down": (0, 1)}
+
+
+def normalize_key(key: str) -> str:
+    """
+    标准化按键名称
+    """
+    if not isinstance(key, str):
+        return key
+
+    key_lower = key.lower()
+    if key_lower == 'shift':
+        return 'lshift'
+    if key_lower == 'ctrl':
+        return 'lcontrol'
+    return key
+
+
+class CompiledMacro:
+    """编译后的宏：按时间排序的 MacroStep 列表。"""
+
+    def __init__(self, steps, name='', skipped=None):
+        self.steps = steps
+        self.name = name
+        # 无法识别而被跳过的原始动作
+        self.skipped = skipped or []
+
+    @property
+    def duration(self):
+        return self.steps[-1].at if self.steps else 0.0
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+
+def compile_actions(actions, name='', key_map=None, scale_mouse=None, game_keys=False, skip_first_delay=False,
+                    strict=True, normalize_keys=False, truncate_rotation=False):
+    """
+    编译动作列表。
+
+    Args:
+        actions (list): 原始动作，每个动作含 time (绝对秒) 或 delay (距上一动作的秒数)。
+        name (str): 宏名称，用于日志。
+        key_map (dict, optional): 标准化后的按键 -> 实际按键，如 {'lshift': 闪避键}。
+        scale_mouse (callable, optional): (dx, dy) -> (dx, dy)，灵敏度换算。
+        game_keys (bool): 启用外部逻辑的特殊按键规则: F 运行时判定交互、F4 复位传送、忽略 alt。
+        skip_first_delay (bool): 忽略第一个动作的 delay (解密等待后继续执行时使用)。
+        strict (bool): 遇到未知动作类型时抛出 ValueError，否则记录到 skipped。
+        normalize_keys (bool): 先用 normalize_key 标准化按键 (shift -> lshift, ctrl -> lcontrol) 再映射。
+        truncate_rotation (bool): mouse_rotation 的像素 (angle * sensitivity) 在灵敏度换算前先取整，
+            与外部逻辑原先的行为一致；护送路径不取整，换算后才截断。
+
+    Returns:
+        CompiledMacro
+    """
+    key_map = key_map or {}
+    steps = []
+    skipped = []
+    at = 0.0
+    for i, action in enumerate(actions):
+        if 'time' in action:
+            at = float(action['time'])
+        else:
+            delay = 0.0 if i == 0 and skip_first_delay else float(action.get('delay', 0))
+            at += delay
+
+        step = _compile_action(action, key_map, scale_mouse, game_keys, normalize_keys, truncate_rotation)
+        if step is None:
+            continue
+        if step is NotImplemented:
+            if strict:
+                raise ValueError(f"Unknown action type: {action.get('type')}")
+            skipped.append(action)
+            continue
+        op, args = step
+        steps.append(MacroStep(at, op, args, action))
+
+    # 绝对时间脚本理论上有序，排序以防手工编辑造成乱序 (sorted 稳定，同一时刻保持原顺序)
+    steps.sort(key=lambda s: s.at)
+    return CompiledMacro(steps, name, skipped)
+
+
+def _compile_action(action, key_map, scale_mouse, game_keys, normalize_keys, truncate_rotation):
+    """返回 (op, args)；None 表示该动作无需执行；NotImplemented 表示未知类型。"""
+    action_type = action.get('type')
+
+    if action_type == 'delay':
+        return OP_DELAY, ()
+
+    if action_type in ('mouse_move', 'mouse_rotation'):
+        if action_type == 'mouse_move':
+            dx, dy = action['dx'], action['dy']
+        else:
+            direction = ROTATION_DIRECTIONS.get(action.get('direction', 'up'))
+            if direction is None:
+                return None
+            pixels = action.get('angle', 0) * action.get('sensitivity', 10)
+            if truncate_rotation:
+                pixels = int(pixels)
+            dx, dy = direction[0] * pixels, direction[1] * pixels
+        if scale_mouse is not None:
+            dx, dy = scale_mouse(dx, dy)
+        return OP_MOVE, (int(dx), int(dy))
+
+    if action_type in ('mouse_down', 'mouse_up'):
+        op = OP_MOUSE_DOWN if action_type == 'mouse_down' else OP_MOUSE_UP
+        return op, (action.get('button', 'left'),)
+
+    if action_type in ('key_down', 'key_up'):
+        key = action.get('key')
+        if normalize_keys:
+            key = normalize_key(key)
+        down = action_type == 'key_down'
+        if game_keys:
+            if key == 'f4':
+                return (OP_TRANSPORT, ()) if down else None
+            if key == 'f':
+                return (OP_INTERACT_DOWN if down else OP_INTERACT_UP), ()
+            if isinstance(key, str) and 'alt' in key:
+                return None
+        key = key_map.get(key, key)
+        return (OP_KEY_DOWN if down else OP_KEY_UP), (key,)
+
+    return NotImplemented
+
+
+class MacroPlayer:
+    """
+    宏播放器。
+
+    所有动作按 "开始时刻 + step.at" 对齐，单个动作的等待误差不会累积到后续动作。
+    """
+
+    def __init__(self, timer, handlers, resync_threshold=DEFAULT_RESYNC_THRESHOLD):
+        """
+        Args:
+            timer: 提供 wait_until(target) 的计时器 (PrecisionTimer)。
+            handlers (dict): op -> callable(*args)。
+            resync_threshold (float): 迟到超过该秒数时平移时间轴。
+        """
+        self.timer = timer
+        self.handlers = handlers
+        self.resync_threshold = resync_threshold
+        self.resyncs = 0
+
+    def play(self, macro, before_step=None, on_error=None):
+        """
+        播放宏。
+
+        Args:
+            macro (CompiledMacro): 编译后的宏。
+            before_step (callable, optional): 每个动作等待前调用，参数为 MacroStep。
+            on_error (callable, optional): 动作执行异常时调用 (step, exception)，之后异常继续抛出。
+        """
+        start = time.perf_counter()
+        for step in macro.steps:
+            if before_step is not None:
+                before_step(step)
+            late = self.timer.wait_until(start + step.at)
+            if late > self.resync_threshold:
+                start += late
+                self.resyncs += 1
+            handler = self.handlers.get(step.op)
+            if handler is None:
+                continue
+            try:
+                handler(*step.args)
+            except Exception as e:
+                if on_error is not None:
+                    on_error(step, e)
+                raise
@@ -0,0 +1,171 @@
+"""
+外部逻辑地图模板匹配工具
+提供与 cv2.matchTemplate(TM_CCOEFF_NORMED) 全图搜索等价的金字塔(粗到细)匹配，
+以及在线程池上并行评估多个候选模板
+"""
+
+from concurrent.futures import as_completed
+
+import cv2
+import numpy as np
+
+# 粗匹配缩放比例 (1/4)
+PYRAMID_SCALE = 0.25
+# 粗匹配保留的候选峰值数量
+PYRAMID_TOP_K = 3
+# 粗匹配时模板最短边下限，过小的模板直接走全图匹配
+PYRAMID_MIN_TEMPLATE_SIZE = 16
+# 置信度达到该值即认为已确定，不再评估其余候选
+CERTAIN_CONFIDENCE = 0.95
+
+
+def match_template_exhaustive(screen_gray, template_gray):
+    """全分辨率全图匹配，返回 (confidence, (x, y))。"""
+    if template_gray.shape[0] > screen_gray.shape[0] or template_gray.shape[1] > screen_gray.shape[1]:
+        return 0.0, None
+    result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+def downscale(image, scale=PYRAMID_SCALE):
+    """按比例缩小图像，用于构建金字塔的粗层。"""
+    return cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+class ScreenPyramid:
+    """
+    一帧屏幕灰度图的两层金字塔。
+
+    每次轮询只需构建一次，所有候选模板共享同一个粗层。
+    """
+
+    def __init__(self, screen_gray, scale=PYRAMID_SCALE):
+        self.full = screen_gray
+        self.scale = scale
+        self.small = downscale(screen_gray, scale)
+
+
+def find_peaks(result, top_k, suppress_w, suppress_h):
+    """在匹配结果图中依次取出 top_k 个峰值，每取一个就抑制其邻域。"""
+    peaks = []
+    result = result.copy()
+    h, w = result.shape[:2]
+    for _ in range(top_k):
+        _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+        if not np.isfinite(max_val) or max_val <= -1:
+            break
+        peaks.append((x, y))
+        x1, y1 = max(0, x - suppress_w), max(0, y - suppress_h)
+        x2, y2 = min(w, x + suppress_w + 1), min(h, y + suppress_h + 1)
+        result[y1:y2, x1:x2] = -1
+    return peaks
+
+
+def refine_peak(screen_gray, template_gray, x, y, margin):
+    """在全分辨率下，只对 (x, y) 附近 ±margin 的位置重新计算匹配度。"""
+    th, tw = template_gray.shape[:2]
+    sh, sw = screen_gray.shape[:2]
+    x1, y1 = max(0, x - margin), max(0, y - margin)
+    x2, y2 = min(sw - tw, x + margin), min(sh - th, y + margin)
+    if x2 < x1 or y2 < y1:
+        return 0.0, None
+    window = screen_gray[y1:y2 + th, x1:x2 + tw]
+    result = cv2.matchTemplate(window, template_gray, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, (lx, ly) = cv2.minMaxLoc(result)
+    return max_val, (x1 + lx, y1 + ly)
+
+
+def match_template_pyramid(pyramid: ScreenPyramid, template_gray, template_small=None, top_k=PYRAMID_TOP_K):
+    """
+    金字塔匹配：先在 1/4 尺度上全图搜索，再只在 top_k 个峰值附近做全分辨率精确匹配。
+
+    精确匹配阶段计算的是与全图匹配完全相同的 TM_CCOEFF_NORMED 值，
+    因此只要真实峰值落在某个候选邻域内，返回的置信度与全图匹配一致；
+    其余情况下返回值只会小于等于全图匹配（只评估了位置的子集），不会放大误匹配。
+
+    Args:
+        pyramid: 当前帧的 ScreenPyramid。
+        template_gray: 全分辨率灰度模板。
+        template_small: 可选，预先缩小好的模板。
+        top_k: 粗匹配保留的峰值数量。
+
+    Returns:
+        tuple: (confidence, (x, y))，坐标为全分辨率下的左上角。
+    """
+    screen_gray = pyramid.full
+    th, tw = template_gray.shape[:2]
+    if th > screen_gray.shape[0] or tw > screen_gray.shape[1]:
+        return 0.0, None
+
+    if template_small is None:
+        if min(th, tw) * pyramid.scale < PYRAMID_MIN_TEMPLATE_SIZE:
+            return match_template_exhaustive(screen_gray, template_gray)
+        template_small = downscale(template_gray, pyramid.scale)
+
+    small_h, small_w = template_small.shape[:2]
+    if (min(small_h, small_w) < PYRAMID_MIN_TEMPLATE_SIZE
+            or small_h > pyramid.small.shape[0] or small_w > pyramid.small.shape[1]):
+        return match_template_exhaustive(screen_gray, template_gray)
+
+    coarse = cv2.matchTemplate(pyramid.small, template_small, cv2.TM_CCOEFF_NORMED)
+    peaks = find_peaks(coarse, top_k, max(1, small_w // 4), max(1, small_h // 4))
+
+    # 粗层一个像素对应全分辨率 1/scale 个像素，再额外放宽以覆盖缩放取整误差
+    step = int(round(1 / pyramid.scale))
+    margin = 2 * step + 2
+
+    best_val, best_loc = 0.0, None
+    for x, y in peaks:
+        val, loc = refine_peak(screen_gray, template_gray, x * step, y * step, margin)
+        if best_loc is None or val > best_val:
+            best_val, best_loc = val, loc
+    return best_val, best_loc
+
+
+def score_candidates(candidates, score, executor=None, min_conf=0.0, certain_conf=None):
+    """
+    评估所有候选模板，返回置信度最高者。
+
+    cv2.matchTemplate 执行时会释放 GIL，传入 executor 时各候选在线程池上并行评估，
+    分支节点的选择耗时接近单个模板的匹配耗时。
+
+    Args:
+        candidates (list): 候选模板名。
+        score (callable): name -> confidence。
+        executor (Executor, optional): 线程池，None 时顺序评估。
+        min_conf (float): 低于等于该值不认为是匹配。
+        certain_conf (float, optional): 某个候选达到该置信度时立即返回并取消其余候选。
+
+    Returns:
+        tuple: (name, confidence)，无匹配时 name 为 None。
+    """
+    best_name, best_conf = None, min_conf
+    if executor is None or len(candidates) <= 1:
+        for name in candidates:
+            conf = score(name)
+            if conf > best_conf:
+                best_name, best_conf = name, conf
+                if certain_conf is not None and conf >= certain_conf:
+                    break
+        return best_name, best_conf
+
+    futures = {executor.submit(score, name): i for i, name in enumerate(candidates)}
+    results = {}
+    try:
+        for future in as_completed(futures):
+            i = futures[future]
+            conf = future.result()
+            if certain_conf is not None and conf >= certain_conf and conf > min_conf:
+                return candidates[i], conf
+            results[i] = conf
+    finally:
+        # 已开始执行的任务无法中断，只取消尚在排队的
+        for future in futures:
+            future.cancel()
+
+    # 按候选顺序比较，平局时与顺序评估一样保留靠前的候选
+    for i in sorted(results):
+        if results[i] > best_conf:
+            best_name, best_conf = candidates[i], results[i]
+    return best_name, best_conf
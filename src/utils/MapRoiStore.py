@@ -0,0 +1,77 @@
+"""
+外部逻辑地图模板的搜索区域记录
+记住每个模板上次匹配到的位置并保存在 mod 目录下，之后只在该位置附近搜索
+"""
+
+import json
+import os
+import threading
+
+ROI_FILE_NAME = 'roi.json'
+# 达到该置信度的全屏匹配才记录位置
+ROI_RECORD_CONFIDENCE = 0.8
+# 区域内匹配低于该置信度时回退到全屏搜索
+ROI_MIN_CONFIDENCE = 0.8
+# 搜索窗口在记录位置四周扩展的边距 (占屏幕高度的比例)
+ROI_PADDING_RATIO = 0.05
+
+
+class MapRoiStore:
+    """
+    模板名 -> 匹配位置 (左上角相对屏幕宽高的比例)。
+
+    使用比例保存，不同分辨率之间可以共用。
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._locations = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._locations = {name: tuple(loc) for name, loc in json.load(f).items()}
+            except Exception:
+                self._locations = {}
+
+    @classmethod
+    def for_mod(cls, mod_dir):
+        return cls(os.path.join(mod_dir, ROI_FILE_NAME))
+
+    def __contains__(self, name):
+        return name in self._locations
+
+    def __len__(self):
+        return len(self._locations)
+
+    def get(self, name, width, height):
+        """获取模板在 width x height 屏幕上的记录位置，未记录时返回 None。"""
+        loc = self._locations.get(name)
+        if loc is None:
+            return None
+        return int(round(loc[0] * width)), int(round(loc[1] * height))
+
+    def record(self, name, loc, width, height):
+        """记录模板在 width x height 屏幕上的匹配位置。"""
+        value = (round(loc[0] / width, 5), round(loc[1] / height, 5))
+        with self._lock:
+            if self._locations.get(name) != value:
+                self._locations[name] = value
+                self._dirty = True
+
+    def padding(self, height):
+        return max(1, int(height * ROI_PADDING_RATIO))
+
+    def save(self):
+        """有改动时写回磁盘。"""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return False
+            data = {name: list(loc) for name, loc in self._locations.items()}
+            self._dirty = False
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        return True
@@ -0,0 +1,128 @@
+"""
+机械轮盘求解
+每次操作会翻转若干开关：以操作位置为起点，再加上各触角的相对位置。目标是让所有开关都为 True。
+翻转满足交换律，同一位置操作两次等于没有操作，所以问题等价于 GF(2) 上的线性方程组 A·x = b:
+    x 为各位置是否操作，b 为初始为 False 的开关。
+用位掩码做高斯消元，得到一个特解和零空间基，再在 "特解 + 零空间组合" 中找操作次数最少的解。
+结果按 (状态掩码, 触角相对位置, 轮盘数) 缓存
+
+用法 (基准测试):
+    python -m src.utils.MechWheelSolver [最大轮盘数]
+"""
+
+import sys
+import time
+from functools import lru_cache
+
+# control 中的距离以相邻两个轮盘的角度差 (60) 为单位
+CONTROL_UNIT = 60
+# 控制装置的形态 (见 AutoRouletteTask.get_control)
+CONTROL_PATTERNS = ([0], [0, 60, 0], [0, 120, 0])
+
+
+def tentacle_offsets(control):
+    """control (如 [0, 120, 0]) -> 各触角相对操作位置的偏移 (如 (0, 2))。"""
+    offsets = [0]
+    current = 0
+    for i in range(1, len(control), 2):
+        current += control[i] // CONTROL_UNIT
+        offsets.append(current)
+    return tuple(offsets)
+
+
+def state_mask(mech_wheel):
+    """初始为 False 的开关对应的位置 1。"""
+    mask = 0
+    for i, on in enumerate(mech_wheel):
+        if not on:
+            mask |= 1 << i
+    return mask
+
+
+def operation_masks(offsets, num_wheels):
+    """每个操作位置翻转的开关掩码；两个触角落在同一位置时互相抵消。"""
+    masks = []
+    for i in range(num_wheels):
+        mask = 0
+        for offset in offsets:
+            mask ^= 1 << ((i + offset) % num_wheels)
+        masks.append(mask)
+    return masks
+
+
+@lru_cache(maxsize=4096)
+def solve_mask(mask, offsets, num_wheels):
+    """
+    Returns:
+        tuple | None: 操作次数最少的操作位置 (升序)，无解时为 None。
+    """
+    # 列空间消元，combo 记录向量由哪些操作组合而成
+    basis = {}
+    null_space = []
+    for i, vector in enumerate(operation_masks(offsets, num_wheels)):
+        combo = 1 << i
+        while vector:
+            pivot = vector.bit_length() - 1
+            if pivot not in basis:
+                basis[pivot] = (vector, combo)
+                break
+            vector ^= basis[pivot][0]
+            combo ^= basis[pivot][1]
+        else:
+            null_space.append(combo)
+
+    solution = 0
+    while mask:
+        pivot = mask.bit_length() - 1
+        if pivot not in basis:
+            return None
+        mask ^= basis[pivot][0]
+        solution ^= basis[pivot][1]
+
+    # 格雷码遍历零空间的所有组合，每步只异或一个基向量
+    best = current = solution
+    best_count = solution.bit_count()
+    for step in range(1, 1 << len(null_space)):
+        current ^= null_space[(step & -step).bit_length() - 1]
+        count = current.bit_count()
+        if count < best_count:
+            best, best_count = current, count
+    return tuple(i for i in range(num_wheels) if best >> i & 1)
+
+
+def solve(mech_wheel, control):
+    """
+    Args:
+        mech_wheel (list): 开关状态 (e.g., [True, False, ...])。
+        control (list): 控制装置的定义 (e.g., [0, 120, 0])。
+
+    Returns:
+        list | None: 操作位置 (新列表，调用方可以修改)，无解时为 None。
+    """
+    result = solve_mask(state_mask(mech_wheel), tentacle_offsets(control), len(mech_wheel))
+    return None if result is None else list(result)
+
+
+def benchmark(wheel_counts=range(1, 13)):
+    """
+    对每个轮盘数、每种控制装置，求解全部 2^n 个初始状态 (每个组合前清空缓存)。
+
+    Returns:
+        list: [(轮盘数, control, 状态数, 秒/次)]
+    """
+    rows = []
+    for num_wheels in wheel_counts:
+        for control in CONTROL_PATTERNS:
+            states = [[not (mask >> i & 1) for i in range(num_wheels)] for mask in range(1 << num_wheels)]
+            solve_mask.cache_clear()
+            start = time.perf_counter()
+            for state in states:
+                solve(state, control)
+            rows.append((num_wheels, control, len(states), (time.perf_counter() - start) / len(states)))
+    return rows
+
+
+if __name__ == '__main__':
+    max_wheels = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    for num_wheels, control, count, seconds in benchmark(range(1, max_wheels + 1)):
+        print(f"{num_wheels:>2}个轮盘 control={str(control):<12} {count:>5}个状态 {seconds * 1e6:8.1f}us/次")
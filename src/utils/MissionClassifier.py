@@ -0,0 +1,202 @@
+"""
+任务界面状态分类
+把任务结算/开始界面需要的多个模板检测合并处理：相互重叠的区域合并为一个区域，
+每个区域只裁剪、转灰度一次；各检测先在灰度图上做单通道预筛，
+只有灰度得分接近阈值的检测才做彩色匹配确认 (与 find_one 的判定一致)。
+按原有判断顺序确认，命中即得出界面状态
+
+用法 (基准测试):
+    python -m src.utils.MissionClassifier
+"""
+
+import sys
+import time
+from collections import namedtuple
+from enum import Enum
+
+import cv2
+import numpy as np
+
+
+class MissionState(Enum):
+    NONE = 0
+    LETTER_REWARD = 1  # 选择密函奖励
+    LETTER = 2  # 选择密函
+    DROP_RATE = 3  # 选择委托手册
+    START = 4  # 开始/重新开始任务
+    CONTINUE = 5  # 继续任务
+    ESC_MENU = 6  # 任务内 esc 菜单
+
+
+# roi: 帧坐标下的 (x1, y1, x2, y2)
+InterfaceCheck = namedtuple('InterfaceCheck', ['state', 'name', 'template', 'roi'])
+InterfaceHit = namedtuple('InterfaceHit', ['name', 'confidence', 'x', 'y', 'width', 'height'])
+
+# config.py 中 template_matching 的 default_threshold，CommissionsTask 构建时传入实际配置值
+DEFAULT_THRESHOLD = 0.8
+# 灰度预筛的余量：灰度得分低于 threshold - PREFILTER_MARGIN 的检测不再做彩色匹配。
+# 界面图标接近灰度，tests/images 的真实截图中两者得分相差不超过 0.01
+PREFILTER_MARGIN = 0.1
+
+
+def clip_roi(roi, width, height):
+    x1, y1, x2, y2 = (int(round(v)) for v in roi)
+    return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+
+
+def merge_rois(rois):
+    """
+    把相互重叠的区域合并为外接矩形。
+
+    Returns:
+        tuple: (合并后的区域列表, 每个输入区域所属的合并区域下标)。
+    """
+    regions = [list(roi) for roi in rois]
+    owners = list(range(len(rois)))
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(regions)):
+            for j in range(i + 1, len(regions)):
+                a, b = regions[i], regions[j]
+                if a is None or b is None:
+                    continue
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    regions[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    regions[j] = None
+                    owners = [i if owner == j else owner for owner in owners]
+                    merged = True
+    index = {old: new for new, old in enumerate(i for i, region in enumerate(regions) if region is not None)}
+    return [tuple(region) for region in regions if region is not None], [index[owner] for owner in owners]
+
+
+def _best(crop, template):
+    result = cv2.matchTemplate(crop, template, cv2.TM_CCOEFF_NORMED)
+    # 与 find_one 相同：纯色区域产生的 nan/inf 视为不匹配
+    np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+class MissionInterfaceClassifier:
+    """
+    任务界面分类器。
+
+    checks 的顺序即判断优先级 (与 handle_mission_interface 原有的 if/elif 顺序一致)，
+    第一个达到阈值的检测决定状态，后续检测不再进行。
+
+    Args:
+        checks (list[InterfaceCheck]): 检测列表。
+        threshold (float): 彩色匹配阈值。
+        prefilter_margin (float | None): 灰度预筛余量，None 表示逐个做彩色匹配 (不预筛)。
+    """
+
+    def __init__(self, checks, threshold=DEFAULT_THRESHOLD, prefilter_margin=PREFILTER_MARGIN):
+        self.checks = list(checks)
+        self.threshold = threshold
+        self.prefilter_margin = prefilter_margin
+        # 同一模板 (如 start_icon) 只转换一次灰度
+        gray = {}
+        self._gray_templates = [gray.setdefault(id(check.template), cv2.cvtColor(check.template, cv2.COLOR_BGR2GRAY))
+                                for check in self.checks]
+        self._layout = None
+        self._layout_size = None
+        self.gray_matches = 0
+        self.color_matches = 0
+
+    @property
+    def rois(self):
+        """所有检测用到的区域 (去重，保持顺序)。"""
+        return list(dict.fromkeys(tuple(check.roi) for check in self.checks))
+
+    def _ensure_layout(self, width, height):
+        """按帧尺寸裁剪并合并区域：合并区域列表，以及每个检测在合并区域内的 (区域下标, 子区域)。"""
+        if self._layout_size != (width, height):
+            clipped = [clip_roi(check.roi, width, height) for check in self.checks]
+            regions, owners = merge_rois(clipped)
+            placements = []
+            for (x1, y1, x2, y2), owner in zip(clipped, owners):
+                rx, ry = regions[owner][:2]
+                placements.append((owner, (x1, y1), (slice(y1 - ry, y2 - ry), slice(x1 - rx, x2 - rx))))
+            self._layout = (regions, placements)
+            self._layout_size = (width, height)
+        return self._layout
+
+    def classify(self, frame):
+        """
+        Args:
+            frame (np.ndarray): BGR 帧。
+
+        Returns:
+            tuple: (MissionState, list[InterfaceHit])。
+        """
+        height, width = frame.shape[:2]
+        regions, placements = self._ensure_layout(width, height)
+        crops = [None] * len(regions)
+        grays = [None] * len(regions)
+        for check, gray_template, (owner, origin, (rows, cols)) in zip(self.checks, self._gray_templates, placements):
+            th, tw = check.template.shape[:2]
+            if crops[owner] is None:
+                x1, y1, x2, y2 = regions[owner]
+                crops[owner] = frame[y1:y2, x1:x2, :3]
+            crop = crops[owner][rows, cols]
+            if th > crop.shape[0] or tw > crop.shape[1]:
+                continue
+            if self.prefilter_margin is not None:
+                if grays[owner] is None:
+                    grays[owner] = cv2.cvtColor(crops[owner], cv2.COLOR_BGR2GRAY)
+                self.gray_matches += 1
+                gray_val, _ = _best(grays[owner][rows, cols], gray_template)
+                if gray_val < self.threshold - self.prefilter_margin:
+                    continue
+            self.color_matches += 1
+            max_val, (lx, ly) = _best(crop, check.template)
+            if max_val >= self.threshold:
+                return check.state, [InterfaceHit(check.name, max_val, origin[0] + lx, origin[1] + ly, tw, th)]
+        return MissionState.NONE, []
+
+
+def benchmark(checks, frames, repeat=50, threshold=DEFAULT_THRESHOLD):
+    """
+    对比灰度预筛与逐个彩色匹配。
+
+    Returns:
+        dict: {'prefilter' | 'color': (每帧毫秒, 每帧彩色匹配次数, 每帧灰度匹配次数, 各帧状态)}
+    """
+    results = {}
+    for mode, margin in (('prefilter', PREFILTER_MARGIN), ('color', None)):
+        classifier = MissionInterfaceClassifier(checks, threshold, prefilter_margin=margin)
+        states = [classifier.classify(frame)[0] for frame in frames]
+        classifier.gray_matches = classifier.color_matches = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for frame in frames:
+                classifier.classify(frame)
+        count = repeat * len(frames)
+        results[mode] = ((time.perf_counter() - start) / count * 1000, classifier.color_matches / count,
+                         classifier.gray_matches / count, states)
+    return results
+
+
+def _synthetic_checks(rng, width=2560, height=1440, count=10):
+    """随机纹理模板与散布在画面下半部的检测区域 (尺寸与真实界面相近)。"""
+    checks = []
+    for i in range(count):
+        template = rng.integers(0, 255, (50, 50, 3), dtype=np.uint8)
+        x, y = int(rng.integers(0, width - 120)), int(rng.integers(height // 2, height - 90))
+        checks.append(InterfaceCheck(MissionState(i % 6 + 1), f'icon_{i}', template, (x, y, x + 110, y + 80)))
+    return checks
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rng = np.random.default_rng(0)
+    checks = _synthetic_checks(rng)
+    empty = np.full((1440, 2560, 3), 40, dtype=np.uint8)
+    empty += rng.integers(0, 20, empty.shape, dtype=np.uint8)
+    hit = empty.copy()
+    x1, y1 = checks[-1].roi[:2]
+    hit[y1 + 10:y1 + 60, x1 + 20:x1 + 70] = checks[-1].template
+    for name, frame in (('无界面', empty), ('最后一项命中', hit)):
+        for mode, (ms, color, gray, states) in benchmark(checks, [frame], repeat).items():
+            print(f"{name:<8} {mode:<10} {ms:6.3f}ms/帧 彩色匹配{color:4.1f}次 灰度匹配{gray:4.1f}次 {states[0].name}")
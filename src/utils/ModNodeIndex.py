@@ -0,0 +1,62 @@
+"""
+外部逻辑地图节点索引
+在加载 mod 时把节点名解析成树，候选节点查询从 O(全部节点) 降为 O(子节点)
+"""
+
+import re
+from collections import defaultdict
+
+# 以字母结尾的节点为起始节点，如 "30火突破-A"
+ROOT_PATTERN = re.compile(r'[a-zA-Z]$')
+# 子节点后缀 (含 '-') 的最大长度，如 "-12"
+MAX_SUFFIX_LENGTH = 4
+
+
+class ModNodeIndex:
+    """
+    mod 地图节点树。
+
+    节点命名规则: 子节点 = 父节点 + '-' + 序号，序号中不含 '-'。
+    例如 "A" -> "A-1" -> "A-1-1"，"A-1" 不会把 "A-10" 或 "A-1-1-1" 当作子节点。
+    """
+
+    def __init__(self, names, scripts=None):
+        """
+        Args:
+            names (iterable): 节点名，保持 match_map 原有的遍历顺序。
+            scripts (dict, optional): 节点名 -> 脚本内容，用于找出包含 delay 动作的节点。
+        """
+        self.names = list(names)
+        self.roots = [name for name in self.names if ROOT_PATTERN.search(name)]
+        self.children = defaultdict(list)
+        self.parent = {}
+        for name in self.names:
+            parent, sep, tail = name.rpartition('-')
+            if sep and len(sep + tail) <= MAX_SUFFIX_LENGTH:
+                self.children[parent].append(name)
+                self.parent[name] = parent
+        self.delay_nodes = set()
+        for name, data in (scripts or {}).items():
+            actions = data.get('actions', []) if isinstance(data, dict) else []
+            if any(action.get('type') == 'delay' for action in actions):
+                self.delay_nodes.add(name)
+
+    def candidates(self, index=None, pattern=None):
+        """
+        获取下一步可能匹配的节点。
+
+        Args:
+            index (str, optional): 上一个节点，None 表示起始状态。
+            pattern (re.Pattern, optional): 起始节点的自定义匹配规则。
+
+        Returns:
+            list: 候选节点名。
+        """
+        if index is None:
+            if pattern is None or pattern.pattern == ROOT_PATTERN.pattern:
+                return self.roots
+            return [name for name in self.names if pattern.search(name)]
+        return self.children.get(index, [])
+
+    def __len__(self):
+        return len(self.names)
@@ -0,0 +1,267 @@
+"""
+外部逻辑 mod 编译包
+把 mod 的地图模板(各支持分辨率下的灰度图)与脚本编译成单个可内存映射的 mod.pack 文件
+
+文件布局:
+    8 字节  魔数 b'DNAPACK1'
+    8 字节  索引长度 (小端 uint64)
+    N 字节  索引 JSON (模板偏移/尺寸、脚本、源文件签名)
+    对齐到 64 字节后为数据区，依次存放各模板的 uint8 灰度数据 (每块同样 64 字节对齐，
+    索引中的偏移相对于数据区起点)
+
+用法:
+    python -m src.utils.ModPack "mod/<外部文件夹>"
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.utils.TemplateCache import BASE_HEIGHT, scale_template
+
+logger = logging.getLogger(__name__)
+
+PACK_FILE_NAME = 'mod.pack'
+PACK_MAGIC = b'DNAPACK1'
+PACK_VERSION = 1
+PACK_ALIGN = 64
+# 与 config.py 中 supported_resolution.resize_to 的高度一致
+DEFAULT_HEIGHTS = (1440, 1080, 900)
+# 参与过期判断的源文件夹及扩展名
+SOURCE_FOLDERS = (('map', '.png'), ('scripts', '.json'))
+
+
+def pack_path(mod_dir):
+    return os.path.join(mod_dir, PACK_FILE_NAME)
+
+
+def source_signature(mod_dir):
+    """mod 目录下 map/*.png 与 scripts/*.json 的 (文件名, 大小, 修改时间) 签名。"""
+    signature = {}
+    for sub, ext in SOURCE_FOLDERS:
+        folder = os.path.join(mod_dir, sub)
+        if not os.path.isdir(folder):
+            continue
+        for filename in os.listdir(folder):
+            if filename.lower().endswith(ext):
+                stat = os.stat(os.path.join(folder, filename))
+                signature[f'{sub}/{filename}'] = [stat.st_size, int(stat.st_mtime)]
+    return signature
+
+
+def load_gray_png(file_path):
+    """与 ImportTask.load_png_files 相同的读取方式 (PIL -> RGB -> 灰度)。"""
+    img_array = np.array(Image.open(file_path))
+    if len(img_array.shape) == 3:
+        code = cv2.COLOR_RGBA2GRAY if img_array.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+        return cv2.cvtColor(img_array, code)
+    return img_array
+
+
+def _align(offset):
+    return (offset + PACK_ALIGN - 1) // PACK_ALIGN * PACK_ALIGN
+
+
+def _data_start(header_len):
+    return _align(len(PACK_MAGIC) + 8 + header_len)
+
+
+def compile_mod(mod_dir, heights=DEFAULT_HEIGHTS, output=None):
+    """
+    编译 mod 目录为 mod.pack。
+
+    Args:
+        mod_dir (str): mod 目录，需包含 map 和 scripts 子目录。
+        heights (iterable): 需要预先缩放的目标高度。
+        output (str, optional): 输出路径，默认写到 mod 目录下。
+
+    Returns:
+        str: 输出文件路径。
+    """
+    map_folder = os.path.join(mod_dir, 'map')
+    script_folder = os.path.join(mod_dir, 'scripts')
+    if not os.path.isdir(map_folder):
+        raise FileNotFoundError(f"文件夹不存在: {map_folder}")
+
+    names = [f.removesuffix('.png') for f in os.listdir(map_folder) if f.lower().endswith('.png')]
+    names.sort(key=lambda x: (len(x), x))
+
+    scripts = {}
+    if os.path.isdir(script_folder):
+        for filename in os.listdir(script_folder):
+            if filename.endswith('.json'):
+                with open(os.path.join(script_folder, filename), 'r', encoding='utf-8') as f:
+                    scripts[filename.removesuffix('.json')] = json.load(f)
+
+    heights = sorted({int(h) for h in heights} | {BASE_HEIGHT}, reverse=True)
+    blobs = []
+    templates = {}
+    cursor = 0
+    for name in names:
+        gray = load_gray_png(os.path.join(map_folder, f'{name}.png'))
+        entry = {}
+        for height in heights:
+            scaled = np.ascontiguousarray(scale_template(gray, height), dtype=np.uint8)
+            # 偏移相对于数据区起点
+            entry[str(height)] = [cursor, scaled.shape[0], scaled.shape[1]]
+            blobs.append((cursor, scaled))
+            cursor = _align(cursor + scaled.nbytes)
+        templates[name] = entry
+
+    index = {
+        'version': PACK_VERSION,
+        'base_height': BASE_HEIGHT,
+        'heights': heights,
+        'names': names,
+        'templates': templates,
+        'scripts': scripts,
+        'signature': source_signature(mod_dir),
+    }
+    header = json.dumps(index, ensure_ascii=False).encode('utf-8')
+    data_start = _data_start(len(header))
+
+    output = output or pack_path(mod_dir)
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PACK_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for offset, blob in blobs:
+            f.write(b'\0' * (data_start + offset - f.tell()))
+            f.write(blob.tobytes())
+    os.replace(tmp_path, output)
+    return output
+
+
+class PackTemplates(Mapping):
+    """某一分辨率下的模板只读映射，访问时才创建指向 mmap 的零拷贝视图。"""
+
+    def __init__(self, pack, height):
+        self._pack = pack
+        self._height = height
+
+    def __getitem__(self, name):
+        return self._pack.template(name, self._height)
+
+    def __iter__(self):
+        return iter(self._pack.names)
+
+    def __len__(self):
+        return len(self._pack.names)
+
+    def __contains__(self, name):
+        return name in self._pack.index['templates']
+
+
+class ModPack:
+    """
+    已编译的 mod 包。
+
+    打开时只读取索引；模板数据通过 mmap 按需映射，不产生额外拷贝。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                raise ValueError(f"不是有效的 mod.pack: {path}")
+            (header_len,) = struct.unpack('<Q', f.read(8))
+            self.index = json.loads(f.read(header_len).decode('utf-8'))
+        self.data_start = _data_start(header_len)
+        if self.index.get('version') != PACK_VERSION:
+            raise ValueError(f"mod.pack 版本不匹配: {self.index.get('version')}")
+        self.names = self.index['names']
+        self.heights = self.index['heights']
+        self.scripts = self.index['scripts']
+        self._file = None
+        self._mmap = None
+        self._buffer = None
+        self._views = {}
+
+    @classmethod
+    def open(cls, mod_dir, check_stale=True):
+        """打开 mod 目录下的 mod.pack；不存在、损坏或源文件已修改时返回 None。"""
+        path = pack_path(mod_dir)
+        if not os.path.exists(path):
+            return None
+        try:
+            pack = cls(path)
+        except Exception:
+            return None
+        if check_stale and pack.is_stale(mod_dir):
+            return None
+        return pack
+
+    def is_stale(self, mod_dir):
+        """
+        源文件是否已修改。只比较 mod 目录下实际存在的源文件夹：
+        只分发 mod.pack (没有 map/scripts 文件夹) 的 mod 视为未过期。
+        """
+        existing = [sub for sub, _ in SOURCE_FOLDERS if os.path.isdir(os.path.join(mod_dir, sub))]
+        signature = {key: value for key, value in self.index.get('signature', {}).items()
+                     if key.split('/', 1)[0] in existing}
+        return source_signature(mod_dir) != signature
+
+    def _ensure_mapped(self):
+        if self._buffer is None:
+            if self._mmap is None:
+                self._file = open(self.path, 'rb')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            # 上次 close 未能释放时沿用原映射
+            self._buffer = np.frombuffer(self._mmap, dtype=np.uint8)
+        return self._buffer
+
+    def has_height(self, height):
+        return height in self.heights
+
+    def template(self, name, height=BASE_HEIGHT):
+        """获取指定分辨率下的灰度模板 (只读的 mmap 视图)。"""
+        key = (name, height)
+        view = self._views.get(key)
+        if view is None:
+            offset, h, w = self.index['templates'][name][str(height)]
+            start = self.data_start + offset
+            view = self._ensure_mapped()[start:start + h * w].reshape(h, w)
+            self._views[key] = view
+        return view
+
+    def templates(self, height=BASE_HEIGHT):
+        return PackTemplates(self, height)
+
+    @property
+    def mapped(self):
+        return self._mmap is not None
+
+    def close(self):
+        """
+        释放内存映射。调用方需先丢弃自己持有的模板视图 (如 TemplateCache.release)。
+
+        Returns:
+            bool: 是否已释放；仍有视图在外部被引用时保留映射并返回 False，可在引用释放后再次调用。
+        """
+        self._views.clear()
+        self._buffer = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError as e:
+                logger.warning(f"mod.pack 仍有模板视图被引用，无法释放内存映射: {self.path} {e}")
+                return False
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return True
+
+
+if __name__ == '__main__':
+    for folder in sys.argv[1:]:
+        print(f"编译完成: {compile_mod(folder)}")
@@ -0,0 +1,72 @@
+"""
+外部逻辑下一节点预匹配
+宏播放期间在后台对当前节点的子节点持续评分，宏结束时直接给出稳定的匹配结果
+"""
+
+import threading
+
+# 连续多少帧最佳候选相同才认为稳定
+PREMATCH_STABLE_FRAMES = 3
+# 低于该置信度的最佳候选不计入稳定判断
+PREMATCH_MIN_CONFIDENCE = 0.6
+
+
+class NodePrematcher:
+    """
+    子节点预匹配状态。
+
+    由后台线程反复调用 feed 喂入最新帧，主线程通过 stable_match 读取结果。
+    """
+
+    def __init__(self, candidates, match_frame, min_conf=PREMATCH_MIN_CONFIDENCE,
+                 stable_frames=PREMATCH_STABLE_FRAMES):
+        """
+        Args:
+            candidates (list): 候选子节点名。
+            match_frame (callable): (frame, candidates, min_conf) -> (name, confidence)。
+            min_conf (float): 计入稳定判断的最低置信度。
+            stable_frames (int): 判定稳定所需的连续帧数。
+        """
+        self.candidates = list(candidates)
+        self.match_frame = match_frame
+        self.min_conf = min_conf
+        self.stable_frames = stable_frames
+        self.frames = 0
+        self._last_frame = None
+        self._lock = threading.Lock()
+        # (最佳候选, 置信度, 连续帧数, 最近一次评分的帧序号)
+        self._state = (None, 0.0, 0, 0)
+
+    def feed(self, frame):
+        """对新帧评分；与上次相同的帧直接跳过。返回是否进行了评分。"""
+        if frame is None or frame is self._last_frame:
+            return False
+        self._last_frame = frame
+        name, conf = self.match_frame(frame, self.candidates, self.min_conf)
+        with self._lock:
+            best, _, streak, _ = self._state
+            self.frames += 1
+            if name is None:
+                streak = 0
+            elif name == best:
+                streak += 1
+            else:
+                streak = 1
+            self._state = (name, conf, streak, self.frames)
+        return True
+
+    def stable_match(self, after=0):
+        """
+        获取稳定的最佳候选。
+
+        Args:
+            after (int): 要求最近一次评分的帧序号大于该值，用于排除宏结束前的旧结果。
+
+        Returns:
+            tuple: (name, confidence)，尚未稳定时 name 为 None。
+        """
+        with self._lock:
+            name, conf, streak, frame_no = self._state
+        if name is not None and streak >= self.stable_frames and frame_no > after:
+            return name, conf
+        return None, conf
@@ -0,0 +1,199 @@
+"""
+异步 OCR 服务
+任务注册命名区域 (检测框、刷新间隔、正则、解析函数)，每次循环调用 update(frame)；
+到期的区域合并为一个批次提交到线程池，同一时间只有一个批次在识别，
+识别期间到来的新帧只保留最新一帧 (latest wins)，任务随时读取最新解析值及其时效，不再等待 OCR。
+提交时只拷贝各区域的裁剪图，而不是整帧
+"""
+
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.5
+
+
+class OcrRegion:
+    """
+    Args:
+        name (str): 区域名称。
+        box: 传给 ocr 的检测框。
+        match (re.Pattern, optional): 传给 ocr 的正则。
+        parse (callable, optional): texts -> 值；返回 None 表示本次识别无效，保留上一次的值。
+            默认直接使用 texts。
+        interval (float): 两次识别之间的最短间隔 (秒)。
+        frame_processor (callable, optional): 传给 ocr 的预处理函数。
+        digits (bool): 固定字体的数字读数，允许 ocr 使用快速字形识别。
+    """
+
+    def __init__(self, name, box, match=None, parse=None, interval=DEFAULT_INTERVAL, frame_processor=None,
+                 digits=False):
+        self.name = name
+        self.box = box
+        self.match = match
+        self.parse = parse
+        self.interval = interval
+        self.frame_processor = frame_processor
+        self.digits = digits
+        self.value = None
+        self.texts = None
+        # 产生当前值的帧的采集时刻
+        self.value_time = None
+        self.last_request = None
+        self.generation = 0
+
+
+def crop_box(frame, box):
+    """按检测框 (x, y, width, height 属性) 裁剪，box 为 None 时返回整帧。"""
+    if box is None:
+        return frame
+    height, width = frame.shape[:2]
+    x1, y1 = max(0, int(box.x)), max(0, int(box.y))
+    x2, y2 = min(width, int(box.x + box.width)), min(height, int(box.y + box.height))
+    return frame[y1:y2, x1:x2]
+
+
+class OcrService:
+    """
+    Example:
+        service = OcrService(executor.submit, lambda crop, region: task.ocr(frame=crop, match=region.match))
+        service.register('wave', box, match=re.compile(r"\\d/\\d"), parse=parse_wave)
+        service.update(task.frame)
+        wave = service.value('wave')
+    """
+
+    def __init__(self, submit, ocr, clock=time.monotonic, on_error=None, crop=crop_box):
+        """
+        Args:
+            submit (callable): fn -> Future，如 ThreadPoolExecutor.submit。
+            ocr (callable): (crop, OcrRegion) -> texts，crop 为该区域的裁剪图拷贝。
+            on_error (callable, optional): (region, exception)，识别异常时调用。
+            crop (callable): (frame, box) -> 区域图像视图。
+        """
+        self.submit = submit
+        self.ocr = ocr
+        self.clock = clock
+        self.on_error = on_error
+        self.crop = crop
+        # 拷贝统计: 实际拷贝的字节数，以及若拷贝整帧需要的字节数
+        self.copies = 0
+        self.copied_bytes = 0
+        self.full_frame_bytes = 0
+        self.regions = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self._pending = None
+        self.batches = 0
+        self.coalesced = 0
+
+    def register(self, name, box, match=None, parse=None, interval=DEFAULT_INTERVAL, frame_processor=None,
+                 digits=False):
+        """注册 (或替换) 区域，替换时丢弃旧值。"""
+        with self._lock:
+            self.regions[name] = OcrRegion(name, box, match, parse, interval, frame_processor, digits)
+
+    def unregister(self, name):
+        with self._lock:
+            self.regions.pop(name, None)
+
+    def update(self, frame, names=None):
+        """
+        提交到期区域的识别请求，不等待结果。
+
+        Args:
+            frame (np.ndarray): 当前帧。
+            names (iterable, optional): 只考虑这些区域，默认全部。
+        """
+        if frame is None:
+            return
+        now = self.clock()
+        with self._lock:
+            due = [region for name, region in self.regions.items()
+                   if (names is None or name in names)
+                   and (region.last_request is None or now - region.last_request >= region.interval)]
+            if not due:
+                return
+            if self._running:
+                # 正在识别: 只保留最新一帧，上一个待处理请求直接丢弃
+                if self._pending is not None:
+                    self.coalesced += 1
+                self._pending = (frame, names)
+                return
+            self._running = True
+            for region in due:
+                region.last_request = now
+            generations = [region.generation for region in due]
+            self.batches += 1
+        try:
+            # 只拷贝各区域的裁剪图，工作线程不再持有整帧
+            jobs = []
+            for region, generation in zip(due, generations):
+                crop = self.crop(frame, region.box).copy()
+                jobs.append((region, generation, crop))
+                self.copied_bytes += crop.nbytes
+            self.copies += len(jobs)
+            self.full_frame_bytes += frame.nbytes
+            self.submit(self._run_batch, jobs, now)
+        except Exception:
+            with self._lock:
+                self._running = False
+            raise
+
+    def _run_batch(self, jobs, frame_time):
+        try:
+            for region, generation, crop in jobs:
+                try:
+                    texts = self.ocr(crop, region)
+                    value = region.parse(texts) if region.parse is not None else texts
+                except Exception as e:
+                    if self.on_error is not None:
+                        self.on_error(region, e)
+                    continue
+                with self._lock:
+                    # 区域已被重置/替换，或已有更新帧的结果时丢弃
+                    if generation != region.generation or self.regions.get(region.name) is not region:
+                        continue
+                    if region.value_time is not None and region.value_time > frame_time:
+                        continue
+                    region.texts = texts
+                    if value is not None:
+                        region.value = value
+                        region.value_time = frame_time
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._running = False
+        if pending is not None:
+            self.update(*pending)
+
+    def value(self, name, default=None, max_age=None):
+        """
+        最新解析值；区域不存在、尚无结果或超过 max_age 秒时返回 default。
+        """
+        region = self.regions.get(name)
+        if region is None or region.value_time is None:
+            return default
+        if max_age is not None and self.clock() - region.value_time > max_age:
+            return default
+        return region.value
+
+    def age(self, name):
+        """最新值距今的秒数，尚无结果时为 None。"""
+        region = self.regions.get(name)
+        if region is None or region.value_time is None:
+            return None
+        return self.clock() - region.value_time
+
+    def reset(self, name=None):
+        """清空值；进行中的识别结果会被丢弃，下一次 update 立即重新识别。"""
+        with self._lock:
+            regions = self.regions.values() if name is None else [self.regions[name]] if name in self.regions else []
+            for region in regions:
+                region.generation += 1
+                region.value = None
+                region.texts = None
+                region.value_time = None
+                region.last_request = None
+
+    def summary(self):
+        return (f"批次{self.batches} 合并{self.coalesced} "
+                f"拷贝{self.copied_bytes / 1048576:.1f}MB (整帧需{self.full_frame_bytes / 1048576:.1f}MB)")
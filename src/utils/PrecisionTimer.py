@@ -0,0 +1,137 @@
+"""
+宏播放计时器
+粗等待用可中断的任务 sleep，临近目标时改用系统高精度等待，最后极短的一段才让出式自旋，
+在保持毫秒级精度的同时避免整段忙等占满一个 CPU 核心
+"""
+
+import ctypes
+import sys
+import time
+from collections import deque
+
+# 距目标多久之前结束粗等待 (任务 sleep 会顺带检查暂停/停止，精度较差)
+DEFAULT_COARSE_MARGIN = 0.02
+# 距目标多久之前结束高精度等待，改为自旋
+DEFAULT_SPIN_MARGIN = 0.001
+# 抖动统计保留的最近样本数
+JITTER_WINDOW = 1000
+
+
+class _WindowsHighResolutionWaiter:
+    """Windows 10 1803+ 的高精度可等待计时器，不依赖 timeBeginPeriod。"""
+
+    CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+    TIMER_ALL_ACCESS = 0x1F0003
+    INFINITE = 0xFFFFFFFF
+
+    def __init__(self):
+        self._kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self._kernel32.CreateWaitableTimerExW.restype = ctypes.c_void_p
+        self._kernel32.SetWaitableTimer.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_longlong), ctypes.c_long,
+                                                    ctypes.c_void_p, ctypes.c_void_p, ctypes.c_bool]
+        self._kernel32.WaitForSingleObject.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        self._handle = self._kernel32.CreateWaitableTimerExW(None, None, self.CREATE_WAITABLE_TIMER_HIGH_RESOLUTION,
+                                                             self.TIMER_ALL_ACCESS)
+        if not self._handle:
+            raise OSError(ctypes.get_last_error(), "CreateWaitableTimerExW failed")
+
+    def wait(self, seconds):
+        # 负数表示相对时间，单位 100ns
+        due = ctypes.c_longlong(-int(seconds * 10_000_000))
+        if self._kernel32.SetWaitableTimer(self._handle, ctypes.byref(due), 0, None, None, False):
+            self._kernel32.WaitForSingleObject(self._handle, self.INFINITE)
+        else:
+            time.sleep(seconds)
+
+
+def create_fine_waiter():
+    """返回 seconds -> None 的高精度等待函数。"""
+    if sys.platform == 'win32':
+        try:
+            return _WindowsHighResolutionWaiter().wait
+        except (OSError, AttributeError):
+            pass
+    # 其他平台(以及 Python 3.11+ 的 Windows) time.sleep 本身即为高精度实现
+    return time.sleep
+
+
+class JitterStats:
+    """动作实际执行时刻相对目标时刻的偏差统计 (单位: 秒，正数表示迟到)。"""
+
+    def __init__(self, window=JITTER_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.max_late = 0.0
+        self.spin_time = 0.0
+
+    def add(self, jitter, spin_time=0.0):
+        self.samples.append(jitter)
+        self.count += 1
+        self.spin_time += spin_time
+        if jitter > self.max_late:
+            self.max_late = jitter
+
+    @property
+    def mean(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def summary(self):
+        return (f"{self.count}次 平均{self.mean * 1000:.2f}ms "
+                f"p95 {self.percentile(0.95) * 1000:.2f}ms 最大{self.max_late * 1000:.2f}ms "
+                f"自旋{self.spin_time * 1000:.0f}ms")
+
+
+class PrecisionTimer:
+    """
+    低 CPU 占用的高精度等待。
+
+    等待分三段:
+        1. 距目标 coarse_margin 之前: coarse_sleep (可传入任务的 sleep，保证可暂停/停止)
+        2. 距目标 spin_margin 之前: 系统高精度等待
+        3. 最后 spin_margin: time.sleep(0) 让出式自旋
+    """
+
+    def __init__(self, coarse_sleep=time.sleep, coarse_margin=DEFAULT_COARSE_MARGIN,
+                 spin_margin=DEFAULT_SPIN_MARGIN, fine_wait=None):
+        self.coarse_sleep = coarse_sleep
+        self.coarse_margin = coarse_margin
+        self.spin_margin = spin_margin
+        self.fine_wait = fine_wait or create_fine_waiter()
+        self.stats = JitterStats()
+
+    def wait(self, delay):
+        """等待 delay 秒，返回实际偏差。"""
+        return self.wait_until(time.perf_counter() + delay)
+
+    def wait_until(self, target):
+        """
+        等待到 perf_counter 时刻 target。
+
+        Returns:
+            float: 返回时刻与 target 的偏差 (秒)，正数表示迟到。
+        """
+        remaining = target - time.perf_counter()
+        if remaining > self.coarse_margin:
+            self.coarse_sleep(remaining - self.coarse_margin)
+            remaining = target - time.perf_counter()
+        if remaining > self.spin_margin:
+            self.fine_wait(remaining - self.spin_margin)
+
+        spin_start = time.perf_counter()
+        now = spin_start
+        while now < target:
+            time.sleep(0)
+            now = time.perf_counter()
+
+        jitter = now - target
+        self.stats.add(jitter, now - spin_start)
+        return jitter
+
+    def reset_stats(self):
+        self.stats = JitterStats()
@@ -0,0 +1,206 @@
+"""
+固定 UI 提示检测
+"space" 等按键提示位置固定、外观不变，每次空闲都做一次完整 OCR 开销过大。
+先用亮像素占比快速排除，再与已确认过的区域签名 (降采样二值图) 比较，
+只有遇到没见过的画面时才调用 OCR 确认，并记住结果。
+单次 OCR 误判不会被缓存：同一画面连续多次确认为有提示后才记为正签名，
+记住的签名超过 max_age 秒后下一次命中会重新用 OCR 验证
+
+用法 (基准测试):
+    python -m src.utils.PromptDetector [截图.png x1 y1 x2 y2]
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# 亮像素判定阈值 (灰度)
+DEFAULT_WHITE_THRESHOLD = 200
+# 未校准前，亮像素占比低于该值直接判定为无提示
+DEFAULT_MIN_RATIO = 0.01
+# 校准后允许的亮像素占比范围 (相对于已确认提示的占比)
+RATIO_MARGIN = 0.5
+# 签名尺寸 (宽, 高)
+SIGNATURE_SIZE = (24, 8)
+# 签名平均差 (0-1) 小于该值视为同一画面
+DEFAULT_MAX_DISTANCE = 0.08
+# 记住的正/负签名数量
+MAX_SIGNATURES = 8
+# 同一画面连续多少次 OCR 确认有提示后才缓存为正签名
+DEFAULT_CONFIRMATIONS = 2
+# 签名缓存有效期 (秒)，过期后下一次命中重新 OCR
+DEFAULT_MAX_AGE = 30.0
+
+
+class PromptDetector:
+    """
+    Args:
+        confirm (callable): crop -> bool，完整 OCR 确认。
+        confirmations (int): 缓存正签名前需要的连续确认次数。
+        max_age (float): 签名缓存的有效期 (秒)。
+    """
+
+    def __init__(self, confirm, white_threshold=DEFAULT_WHITE_THRESHOLD, min_ratio=DEFAULT_MIN_RATIO,
+                 max_distance=DEFAULT_MAX_DISTANCE, confirmations=DEFAULT_CONFIRMATIONS, max_age=DEFAULT_MAX_AGE,
+                 clock=time.monotonic):
+        self.confirm = confirm
+        self.white_threshold = white_threshold
+        self.min_ratio = min_ratio
+        self.max_distance = max_distance
+        self.confirmations_required = confirmations
+        self.max_age = max_age
+        self.clock = clock
+        # [签名, 最近一次 OCR 确认的时刻]
+        self.positives = []
+        self.negatives = []
+        # 尚未缓存的正签名候选: [签名, 连续确认次数]
+        self._candidate = None
+        self.ratio_range = None
+        self.rejects = 0
+        self.hits = 0
+        self.confirmations = 0
+        self.revalidations = 0
+
+    def _binary(self, crop):
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        return cv2.threshold(gray, self.white_threshold, 255, cv2.THRESH_BINARY)[1]
+
+    def _ratio_ok(self, ratio):
+        if self.ratio_range is None:
+            return ratio >= self.min_ratio
+        low, high = self.ratio_range
+        return low * (1 - RATIO_MARGIN) <= ratio <= high * (1 + RATIO_MARGIN)
+
+    def _same(self, signature, known):
+        return cv2.mean(cv2.absdiff(signature, known))[0] / 255 < self.max_distance
+
+    def _find(self, signature, entries):
+        for entry in entries:
+            if self._same(signature, entry[0]):
+                return entry
+        return None
+
+    def _remember(self, entries, signature, now):
+        entries.append([signature, now])
+        if len(entries) > MAX_SIGNATURES:
+            entries.pop(0)
+
+    def check(self, crop):
+        """判断区域内是否出现提示。"""
+        if crop is None or crop.size == 0:
+            return False
+        binary = self._binary(crop)
+        ratio = cv2.countNonZero(binary) / binary.size
+        if not self._ratio_ok(ratio):
+            self.rejects += 1
+            return False
+        signature = cv2.resize(binary, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+        now = self.clock()
+        positive = self._find(signature, self.positives)
+        if positive is not None and now - positive[1] <= self.max_age:
+            self.hits += 1
+            return True
+        negative = self._find(signature, self.negatives)
+        if negative is not None and now - negative[1] <= self.max_age:
+            self.hits += 1
+            return False
+
+        self.confirmations += 1
+        present = bool(self.confirm(crop))
+        if positive is not None:
+            # 过期的正签名: 重新验证，不再成立时移除
+            self.revalidations += 1
+            if present:
+                positive[1] = now
+                return True
+            self.positives.remove(positive)
+        if negative is not None:
+            self.negatives.remove(negative)
+        if not present:
+            self._candidate = None
+            self._remember(self.negatives, signature, now)
+            return False
+
+        if self._candidate is not None and self._same(signature, self._candidate[0]):
+            self._candidate[1] += 1
+        else:
+            self._candidate = [signature, 1]
+        if self._candidate[1] >= self.confirmations_required:
+            self._candidate = None
+            self._remember(self.positives, signature, now)
+            low, high = self.ratio_range or (ratio, ratio)
+            self.ratio_range = (min(low, ratio), max(high, ratio))
+        return True
+
+    def summary(self):
+        return f"排除{self.rejects} 签名命中{self.hits} OCR确认{self.confirmations} 重新验证{self.revalidations}"
+
+
+def benchmark(detector, crops, ocr=None, repeat=200):
+    """
+    对比每个 tick 的耗时：检测器 (含首次确认与过期重新验证的 OCR，按 tick 摊销) 与每个 tick 都做完整 OCR。
+
+    Args:
+        detector (PromptDetector): 待测检测器，confirm 应使用真实 OCR。
+        crops (list): 提示区域截图 (有提示与无提示的画面)。
+        ocr (callable, optional): crop -> 结果，即原先每个 tick 执行的完整 OCR。
+
+    Returns:
+        dict: {'detector': 秒/次, 'ocr': 秒/次 或 None, 'ocr_calls': 检测器调用 OCR 的次数}
+    """
+    result = {'detector': _time_per_call(detector.check, crops, repeat), 'ocr': None,
+              'ocr_calls': detector.confirmations}
+    if ocr is not None:
+        result['ocr'] = _time_per_call(ocr, crops, max(1, repeat // 20))
+    return result
+
+
+def _time_per_call(fn, crops, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for crop in crops:
+            fn(crop)
+    return (time.perf_counter() - start) / (repeat * len(crops))
+
+
+def _load_onnx_ocr():
+    """与 ok 相同的 onnxocr 模型 (CPU)，返回 crop -> 识别文本列表。"""
+    try:
+        from onnxocr.onnx_paddleocr import ONNXPaddleOcr
+    except ImportError:
+        return None
+    model = ONNXPaddleOcr(use_angle_cls=False, use_gpu=False, use_dml=False, use_openvino=False)
+
+    def ocr(crop):
+        lines = model.ocr(crop)[0] or []
+        return [text for _, (text, _) in lines]
+
+    return ocr
+
+
+def _prompt_crop(rng, text="space"):
+    crop = np.full((33, 85, 3), 40, dtype=np.uint8)
+    cv2.putText(crop, text, (5, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return np.clip(crop + rng.integers(-6, 7, crop.shape), 0, 255).astype(np.uint8)
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    if len(sys.argv) >= 6:
+        image = cv2.imread(sys.argv[1])
+        x1, y1, x2, y2 = (int(v) for v in sys.argv[2:6])
+        crops = [image[y1:y2, x1:x2]]
+    else:
+        # 默认: 与 space_text 区域尺寸相近 (2560x1440 下约 85x33) 的提示画面与暗色空闲画面
+        crops = [_prompt_crop(rng) for _ in range(4)] + [rng.integers(0, 120, (33, 85, 3), dtype=np.uint8)
+                                                         for _ in range(4)]
+    ocr = _load_onnx_ocr()
+    if ocr is None:
+        print("未安装 onnxocr，无法测量 OCR 路径")
+        sys.exit(1)
+    detector = PromptDetector(lambda crop: any("space" in text.lower() for text in ocr(crop)))
+    stats = benchmark(detector, crops, ocr)
+    print(f"完整 OCR: {stats['ocr'] * 1e3:.2f}ms/tick")
+    print(f"检测器: {stats['detector'] * 1e6:.1f}us/tick (共 {stats['ocr_calls']} 次 OCR，{detector.summary()})")
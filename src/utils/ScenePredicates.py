@@ -0,0 +1,95 @@
+"""
+场景谓词缓存
+各触发任务在同一帧上查询的命名谓词 (在队伍中、交互提示、区域内的按键提示)，每帧只求值一次，
+结果在所有触发任务间共享，并统计每个谓词的求值/复用次数与耗时。
+DNAScene 在执行器截新帧 (reset_scene) 时调用 clear()
+"""
+
+import time
+
+IN_TEAM = 'in_team'
+INTERACT_PROMPT = 'interact_prompt'
+
+
+class PredicateStats:
+    """单个谓词的求值次数、复用次数与耗时。"""
+
+    __slots__ = ('evaluations', 'hits', 'total_time', 'max_time')
+
+    def __init__(self):
+        self.evaluations = 0
+        self.hits = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def average_time(self):
+        return self.total_time / self.evaluations if self.evaluations else 0.0
+
+    def __str__(self):
+        return (f"求值{self.evaluations} 复用{self.hits} "
+                f"平均{self.average_time * 1000:.2f}ms 最大{self.max_time * 1000:.2f}ms")
+
+
+def prompt_key(kind, box):
+    """以检测区域为键的按键提示谓词名称，不同任务查询同一区域时得到同一个名称。"""
+    return f"{kind}_prompt@{box.x},{box.y},{box.width}x{box.height}"
+
+
+class ScenePredicates:
+    """
+    当前帧的共享谓词。
+
+    共享谓词统一在这里命名，触发任务不再各自起名：
+        in_team: 是否在队伍界面。
+        interact_prompt: 交互列表中的 F/E 提示 (f_search_box 内的 pick_up_f / pick_up_e)，值为匹配框。
+        prompt(kind, box): box 区域内 kind 类提示 (如 'space'、'f'、'mech_retry') 是否出现，
+            同一类提示、同一区域的查询共享结果；kind 表示检测的内容，不同模板不能共用同一个 kind。
+    """
+
+    def __init__(self):
+        self._values = {}
+        self.stats = {}
+
+    def clear(self):
+        self._values = {}
+
+    def get(self, name, fun):
+        """
+        获取当前帧上名为 name 的谓词结果，未求值时调用 fun()。
+
+        Args:
+            name (str): 谓词名称，不同检测区域/参数需使用不同名称。
+            fun (callable): 无参求值函数。
+        """
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = PredicateStats()
+        if name in self._values:
+            stats.hits += 1
+            return self._values[name]
+        start = time.perf_counter()
+        value = fun()
+        elapsed = time.perf_counter() - start
+        stats.evaluations += 1
+        stats.total_time += elapsed
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+        self._values[name] = value
+        return value
+
+    def in_team(self, fun):
+        return self.get(IN_TEAM, fun)
+
+    def interact_prompt(self, fun):
+        return self.get(INTERACT_PROMPT, fun)
+
+    def prompt(self, kind, box, fun):
+        return self.get(prompt_key(kind, box), fun)
+
+    def summary(self):
+        ordered = sorted(self.stats.items(), key=lambda item: item[1].total_time, reverse=True)
+        return ', '.join(f"{name}: {stats}" for name, stats in ordered)
+
+    def reset_stats(self):
+        self.stats = {}
@@ -0,0 +1,139 @@
+"""
+外部逻辑地图模板缓存
+按 (mod 文件夹, 模板名, 目标高度) 缓存缩放后的灰度模板，避免每次匹配都重复 cv2.resize
+"""
+
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from src.utils.MapMatcher import PYRAMID_SCALE, downscale
+
+# 外部逻辑的地图模板均以 1080p 录制
+BASE_HEIGHT = 1080
+CACHE_FOLDER_NAME = '.cache'
+
+
+def scale_template(template_gray, height, base_height=BASE_HEIGHT):
+    """与 match_map 原有逻辑一致的缩放方式。"""
+    if height == base_height:
+        return template_gray
+    scale_factor = height / base_height
+    return cv2.resize(template_gray, (0, 0), fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_LINEAR)
+
+
+class TemplateCache:
+    """
+    缩放模板仓库。
+
+    首次使用或窗口分辨率变化时才缩放一次；可选地把缩放结果保存到
+    mod 目录下的 .cache 文件夹，下次启动直接读取。
+    """
+
+    def __init__(self, base_height=BASE_HEIGHT):
+        self.base_height = base_height
+        self.persist = False
+        self._sources = {}
+        self._scaled = {}
+        self._current_height = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, mod_folder, templates, map_folder=None, pack=None):
+        """
+        登记一个 mod 的原始(1080p)灰度模板。
+
+        Args:
+            mod_folder (str): mod 目录名，作为缓存键的一部分。
+            templates (dict): 模板名 -> 灰度图。
+            map_folder (str, optional): 模板 png 所在目录，用于磁盘缓存的失效判断。
+            pack (ModPack, optional): 已编译的 mod 包，包含的分辨率直接读取预缩放模板。
+        """
+        with self._lock:
+            self._sources[mod_folder] = (templates, map_folder, pack)
+            self.release(mod_folder)
+
+    def release(self, mod_folder):
+        """丢弃某个 mod 的缩放结果 (其中可能有 mod.pack 的 mmap 视图)，关闭 mod.pack 前调用。"""
+        with self._lock:
+            for key in [k for k in self._scaled if k[0] == mod_folder]:
+                del self._scaled[key]
+            self._current_height.pop(mod_folder, None)
+
+    def get(self, mod_folder, name, height):
+        """获取缩放到目标高度的灰度模板。"""
+        return self._get(mod_folder, name, height, 1.0)
+
+    def get_small(self, mod_folder, name, height, scale=PYRAMID_SCALE):
+        """获取缩放到目标高度后，再缩小到金字塔粗层的灰度模板。"""
+        return self._get(mod_folder, name, height, scale)
+
+    def _get(self, mod_folder, name, height, level_scale):
+        key = (mod_folder, name, height, level_scale)
+        template = self._scaled.get(key)
+        if template is not None:
+            self.hits += 1
+            return template
+        self.misses += 1
+        with self._lock:
+            if self._current_height.get(mod_folder) != height:
+                # 分辨率变化，丢弃旧分辨率的缩放结果
+                for old_key in [k for k in self._scaled if k[0] == mod_folder and k[2] != height]:
+                    del self._scaled[old_key]
+                self._current_height[mod_folder] = height
+            if level_scale == 1.0:
+                template = self._load_or_scale(mod_folder, name, height)
+            else:
+                template = downscale(self._get(mod_folder, name, height, 1.0), level_scale)
+            self._scaled[key] = template
+        return template
+
+    def _load_or_scale(self, mod_folder, name, height):
+        templates, map_folder, pack = self._sources[mod_folder]
+        if pack is not None and pack.has_height(height):
+            return pack.template(name, height)
+        source = templates[name]
+        cache_path = self._cache_path(map_folder, name, height)
+        if self.persist and cache_path is not None:
+            cached = self._read_cache(cache_path, os.path.join(map_folder, f'{name}.png'))
+            if cached is not None:
+                return cached
+        template = scale_template(source, height, self.base_height)
+        if self.persist and cache_path is not None and template is not source:
+            self._write_cache(cache_path, template)
+        return template
+
+    def _cache_path(self, map_folder, name, height):
+        if map_folder is None or height == self.base_height:
+            return None
+        return os.path.join(os.path.dirname(map_folder), CACHE_FOLDER_NAME, str(height), f'{name}.npy')
+
+    @staticmethod
+    def _read_cache(cache_path, source_path):
+        try:
+            if not os.path.exists(cache_path):
+                return None
+            if os.path.exists(source_path) and os.path.getmtime(source_path) > os.path.getmtime(cache_path):
+                return None
+            return np.load(cache_path)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _write_cache(cache_path, template):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, template)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            pass
+
+    def clear(self):
+        with self._lock:
+            self._scaled.clear()
+            self._current_height.clear()
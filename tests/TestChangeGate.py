@@ -0,0 +1,68 @@
+# Test case
+import unittest
+
+import numpy as np
+
+from src.utils.ChangeGate import ChangeGate
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChangeGate(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.gate = ChangeGate(clock=self.clock)
+        self.calls = 0
+        self.frame = np.full((180, 320, 3), 50, dtype=np.uint8)
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_static_frame_skips(self):
+        self.assertEqual(self.gate.get('a', self.frame, self.compute), 1)
+        self.assertEqual(self.gate.get('a', self.frame.copy(), self.compute), 1)
+        self.assertEqual((self.gate.evaluations, self.gate.skips), (1, 1))
+
+    def test_change_in_roi_reevaluates(self):
+        roi = (100, 50, 200, 100)
+        self.gate.get('a', self.frame, self.compute, roi=roi)
+        changed = self.frame.copy()
+        changed[60:90, 120:180] = 255
+        self.assertEqual(self.gate.get('a', changed, self.compute, roi=roi), 2)
+
+    def test_change_outside_roi_ignored(self):
+        roi = (100, 50, 200, 100)
+        self.gate.get('a', self.frame, self.compute, roi=roi)
+        changed = self.frame.copy()
+        changed[120:180, 0:100] = 255
+        self.assertEqual(self.gate.get('a', changed, self.compute, roi=roi), 1)
+
+    def test_multiple_rois(self):
+        rois = [(0, 0, 40, 40), (280, 140, 320, 180)]
+        self.gate.get('a', self.frame, self.compute, roi=rois)
+        changed = self.frame.copy()
+        changed[150:170, 290:310] = 255
+        self.assertEqual(self.gate.get('a', changed, self.compute, roi=rois), 2)
+
+    def test_max_age_forces_reevaluation(self):
+        self.gate.get('a', self.frame, self.compute)
+        self.clock.now = 1.5
+        self.assertEqual(self.gate.get('a', self.frame, self.compute), 2)
+
+    def test_changed(self):
+        self.assertTrue(self.gate.changed('b', self.frame))
+        self.assertFalse(self.gate.changed('b', self.frame.copy()))
+        self.assertTrue(self.gate.changed('b', np.zeros_like(self.frame)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# Test case
+import unittest
+
+import cv2
+import numpy as np
+
+from src.utils.DigitReader import DigitReader, segment, binarize
+
+
+def render_text(text, scale=1.0, thickness=2):
+    """白底黑字的 HUD 文本。"""
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+    image = np.full((h + baseline + 10, w + 10, 3), 255, dtype=np.uint8)
+    cv2.putText(image, text, (5, 5 + h), font, scale, (0, 0, 0), thickness, cv2.LINE_AA)
+    return image
+
+
+class TestDigitReader(unittest.TestCase):
+
+    def test_segment_counts_glyphs(self):
+        self.assertEqual(len(segment(binarize(render_text("1/5")))), 3)
+        self.assertEqual(len(segment(binarize(render_text("37%")))), 3)
+
+    def test_uncalibrated_falls_back(self):
+        reader = DigitReader()
+        self.assertIsNone(reader.read(render_text("3/5")))
+        self.assertEqual(reader.fallbacks, 1)
+
+    def test_learn_then_read(self):
+        reader = DigitReader()
+        for text in ("0123", "4567", "89", "1/5", "37%"):
+            self.assertTrue(reader.learn(render_text(text), text))
+        for text in ("2/5", "4/5", "98%", "100%", "17"):
+            result = reader.read(render_text(text))
+            self.assertIsNotNone(result, text)
+            self.assertEqual(result[0], text)
+
+    def test_unknown_glyph_low_confidence(self):
+        reader = DigitReader()
+        reader.learn(render_text("0123"), "0123")
+        self.assertIsNone(reader.read(render_text("W")))
+
+    def test_mismatched_text_not_learned(self):
+        reader = DigitReader()
+        self.assertFalse(reader.learn(render_text("1/5"), "1/50"))
+        self.assertFalse(reader.calibrated)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# Test case
+import unittest
+
+from src.utils.FishingControl import (AlphaBetaTracker, FishingLoop, HysteresisController, PredictiveController,
+                                      zone_hold)
+from src.utils.FishingVision import NOT_FOUND
+
+BAR = (0, 100, 20, 300)
+BAR_CENTER = (10, 200)
+
+
+class TestFishingControl(unittest.TestCase):
+
+    def test_zone_hold(self):
+        self.assertTrue(zone_hold(120, 100, 300, 0.25))
+        self.assertFalse(zone_hold(290, 100, 300, 0.25))
+        self.assertIsNone(zone_hold(200, 100, 300, 0.25))
+
+    def test_tracker_learns_constant_velocity(self):
+        tracker = AlphaBetaTracker()
+        for i in range(60):
+            tracker.update(i / 60, 300 - 120 * i / 60)
+        self.assertAlmostEqual(tracker.velocity, -120, delta=5)
+        self.assertAlmostEqual(tracker.predict(1.0 + 0.1), 300 - 120 * 1.1, delta=2)
+
+    def test_hysteresis_keeps_original_behaviour(self):
+        controller = HysteresisController()
+        self.assertTrue(controller.update(0.0, BAR, BAR_CENTER, (10, 110), 0.25))
+        self.assertIsNone(controller.update(0.1, BAR, BAR_CENTER, (10, 200), 0.25))
+        # 合并: 第一帧按合并前的相对位置 (在鱼条中心上方 -> 按住)
+        controller.update(0.2, BAR, BAR_CENTER, (10, 190), 0.25)
+        self.assertTrue(controller.update(0.3, BAR, BAR_CENTER, None, 0.25))
+        self.assertIsNone(controller.update(0.4, BAR, BAR_CENTER, None, 0.25))
+        self.assertFalse(controller.update(0.5, None, None, None, 0.25))
+
+    def test_predictive_reacts_before_icon_enters_zone(self):
+        hysteresis, predictive = HysteresisController(), PredictiveController()
+        first = {}
+        for i in range(120):
+            t = i / 60
+            icon = (10, 240 - 60 * t)
+            for name, controller in (('hysteresis', hysteresis), ('predictive', predictive)):
+                if controller.update(t, BAR, BAR_CENTER, icon, 0.25, lead=0.1) and name not in first:
+                    first[name] = t
+        self.assertLess(first['predictive'], first['hysteresis'])
+
+    def test_predictive_coasts_while_merged(self):
+        controller = PredictiveController(max_coast=0.3)
+        for i in range(30):
+            controller.update(i / 60, BAR, BAR_CENTER, (10, 200 - 2 * i), 0.25)
+        # 鱼标向上移动时消失，外推仍判定为需要按住
+        self.assertTrue(controller.update(0.6, BAR, BAR_CENTER, None, 0.25, lead=0.1))
+        self.assertIsNotNone(controller.last_merge_event)
+        self.assertIsNone(controller.update(1.0, BAR, BAR_CENTER, None, 0.25))
+
+    def test_loop_toggles_key_once_per_change(self):
+        events = []
+
+        class Keyboard:
+            def send_key_down(self, key):
+                events.append(('down', key))
+
+            def send_key_up(self, key):
+                events.append(('up', key))
+
+        frames = [NOT_FOUND._replace(has_bar=True, bar_center=BAR_CENTER, bar_rect=BAR, bar_area=3000.0,
+                                     has_icon=True, icon_center=(10, y)) for y in (110, 120, 200, 290)]
+        loop = FishingLoop(lambda detection: detection, HysteresisController(), Keyboard(), roi_area=10000,
+                           clock=lambda: 0.0)
+        for detection in frames:
+            loop.step(detection, 0.0)
+        loop.step(NOT_FOUND, 0.0)
+        self.assertEqual(events, [('down', 'space'), ('up', 'space')])
+        self.assertFalse(loop.holding)
+        self.assertAlmostEqual(loop.zone_ratio, 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# Test case
+import unittest
+
+from src.utils.FishingSimulator import FishingSimulator, StubKeyboard
+
+
+class TestFishingSimulator(unittest.TestCase):
+
+    def test_stub_keyboard_applies_latency(self):
+        now = [0.0]
+        keyboard = StubKeyboard(lambda: now[0], latency=0.05)
+        keyboard.send_key_down()
+        self.assertFalse(keyboard.pressed(0.04))
+        self.assertTrue(keyboard.pressed(0.05))
+        now[0] = 0.1
+        keyboard.send_key_up()
+        self.assertTrue(keyboard.pressed(0.12))
+        self.assertFalse(keyboard.pressed(0.2))
+        self.assertEqual(keyboard.toggles, 2)
+
+    def test_deterministic(self):
+        first = FishingSimulator(seed=3).run(3)
+        second = FishingSimulator(seed=3).run(3)
+        for key in ('in_zone', 'toggles_per_sec', 'frames', 'catch_time'):
+            self.assertEqual(first[key], second[key])
+        self.assertGreater(first['cpu_us'], 0)
+
+    def test_controller_keeps_icon_in_bar(self):
+        idle = FishingSimulator(seed=1, lift=0.0).run(5)
+        controlled = FishingSimulator(seed=1).run(5)
+        self.assertGreater(controlled['in_zone'], idle['in_zone'] + 0.2)
+
+    def test_predictive_compensates_latency(self):
+        def in_zone(controller):
+            return sum(FishingSimulator(controller=controller, capture_latency=0.05, input_latency=0.05,
+                                        seed=seed).run(8)['in_zone'] for seed in range(2))
+
+        self.assertGreater(in_zone('预测'), in_zone('滞回'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+# Test case
+import os
+import unittest
+
+import cv2
+import numpy as np
+
+from src.utils.FishingVision import (BAR_MIN_AREA, ICON_MAX_AREA, ICON_MIN_AREA, detect_by_contours,
+                                     detect_by_projection, load_roi_sequence)
+
+RECORDED_DIR = os.path.join(os.path.dirname(__file__), 'images', 'fishing')
+
+
+def synthetic_sequence(frames=60, seed=0):
+    """模拟录制的 ROI 序列 (25x400, 1080p)：鱼条上下移动，鱼标在条外往返，带模糊和噪点。"""
+    rng = np.random.default_rng(seed)
+    sequence = []
+    for i in range(frames):
+        roi = np.full((400, 25, 3), 60, dtype=np.uint8)
+        bar_top = 40 + int(120 * (1 + np.sin(i / 7)))
+        cv2.rectangle(roi, (3, bar_top), (21, bar_top + 110), (255, 255, 255), -1)
+        icon_y = 20 + (i * 23) % 360
+        if icon_y + 16 < bar_top - 2 or icon_y > bar_top + 113:
+            cv2.circle(roi, (12, icon_y + 8), 7, (240, 240, 240), -1)
+        roi = cv2.GaussianBlur(roi, (3, 3), 0)
+        noise = rng.integers(-8, 9, roi.shape)
+        sequence.append(np.clip(roi.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    return sequence
+
+
+def speckle(roi, rate=0.03, seed=0):
+    """随机把 rate 比例的像素置为纯白 (孤立亮噪点)。"""
+    roi = roi.copy()
+    roi[np.random.default_rng(seed).random(roi.shape[:2]) < rate] = 255
+    return roi
+
+
+def baseline_detect(roi_img, res_ratio=1.0):
+    """原 AutoFishTask.find_bar_and_fish_by_area 的轮廓逻辑，作为对照。"""
+    gray = cv2.cvtColor(roi_img, cv2.COLOR_BGR2GRAY)
+    _, scene_bin = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+    contours, _ = cv2.findContours(scene_bin, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    blobs = [{"contour": c, "area": cv2.contourArea(c)} for c in contours]
+    blobs = [b for b in blobs if b["area"] > ICON_MIN_AREA * res_ratio ** 2]
+    blobs.sort(key=lambda b: b["area"], reverse=True)
+
+    def locate(contour):
+        moments = cv2.moments(contour)
+        x, y, w, h = cv2.boundingRect(contour)
+        return (int(moments["m10"] / moments["m00"]), int(moments["m01"] / moments["m00"])), (x, y, x + w, y + h)
+
+    bar = icon = None
+    bar_area = 0.0
+    for blob in blobs:
+        if blob["area"] > BAR_MIN_AREA * res_ratio ** 2:
+            bar = locate(blob["contour"])
+            bar_area = blob["area"]
+        break
+    for blob in blobs:
+        if blob["area"] == bar_area:
+            continue
+        if ICON_MIN_AREA * res_ratio ** 2 < blob["area"] < ICON_MAX_AREA * res_ratio ** 2:
+            icon = locate(blob["contour"])
+            break
+    return bar, icon
+
+
+def multi_blob_rois():
+    """鱼条、鱼标之外还有比鱼标大的碎块 (如鱼条断开的一截) 或其他亮块。"""
+    layouts = [
+        # (鱼条 y 范围, 其他亮块 y 范围列表, 鱼标中心 y)
+        ((40, 150), [(170, 205)], 255),
+        ((200, 310), [(20, 60)], 120),
+        ((40, 150), [(170, 205), (330, 345)], 255),
+        (None, [(40, 80)], 255),
+        ((120, 230), [(20, 50), (260, 300)], 360),
+    ]
+    for bar, pieces, icon_y in layouts:
+        roi = np.full((400, 25, 3), 60, dtype=np.uint8)
+        if bar is not None:
+            cv2.rectangle(roi, (3, bar[0]), (21, bar[1]), (255, 255, 255), -1)
+        for top, bottom in pieces:
+            cv2.rectangle(roi, (3, top), (21, bottom), (255, 255, 255), -1)
+        cv2.circle(roi, (12, icon_y), 7, (240, 240, 240), -1)
+        yield roi
+
+
+class TestFishingVision(unittest.TestCase):
+
+    def assertEquivalent(self, roi, res_ratio=1.0, rect_delta=1, expected=None):
+        expected = expected or detect_by_contours(roi, res_ratio)
+        actual = detect_by_projection(roi, res_ratio)
+        self.assertEqual((actual.has_bar, actual.has_icon), (expected.has_bar, expected.has_icon))
+        for name in ('bar', 'icon'):
+            center = getattr(expected, f'{name}_center')
+            if center is None:
+                continue
+            other = getattr(actual, f'{name}_center')
+            self.assertLessEqual(abs(other[0] - center[0]), 1)
+            self.assertLessEqual(abs(other[1] - center[1]), 1)
+            for a, b in zip(getattr(actual, f'{name}_rect'), getattr(expected, f'{name}_rect')):
+                self.assertLessEqual(abs(a - b), rect_delta)
+            self.assertAlmostEqual(getattr(actual, f'{name}_area'), getattr(expected, f'{name}_area'),
+                                   delta=getattr(expected, f'{name}_area') * 0.1)
+
+    def test_synthetic_sequence_equivalent(self):
+        found_icon = 0
+        for roi in synthetic_sequence():
+            self.assertEquivalent(roi)
+            found_icon += detect_by_projection(roi).has_icon
+        self.assertGreater(found_icon, 10)
+
+    def test_scaled_sequence_equivalent(self):
+        for roi in synthetic_sequence(frames=20, seed=1):
+            self.assertEquivalent(cv2.resize(roi, None, fx=1.333, fy=1.333), res_ratio=1.333)
+
+    def test_noisy_sequence_equivalent(self):
+        for index, roi in enumerate(synthetic_sequence(frames=40, seed=2)):
+            noisy = speckle(roi, seed=index)
+            # 贴在鱼条/鱼标边缘的噪点会并入轮廓，轮廓实现的外接矩形因此外扩几个像素
+            self.assertEquivalent(noisy, rect_delta=2)
+            # 投影实现去掉噪点后与无噪点帧上的轮廓结果一致
+            self.assertEquivalent(noisy, expected=detect_by_contours(roi))
+
+    def test_multi_blob_matches_baseline(self):
+        for roi in multi_blob_rois():
+            bar, icon = baseline_detect(roi)
+            self.assertIsNotNone(icon)
+            for detect in (detect_by_contours, detect_by_projection):
+                detection = detect(roi)
+                self.assertEqual((detection.has_bar, detection.has_icon), (bar is not None, True))
+                for expected, center, rect in ((bar, detection.bar_center, detection.bar_rect),
+                                               (icon, detection.icon_center, detection.icon_rect)):
+                    if expected is None:
+                        continue
+                    for a, b in zip(center + rect, expected[0] + expected[1]):
+                        self.assertLessEqual(abs(a - b), 1)
+
+    def test_empty_roi(self):
+        roi = np.zeros((400, 25, 3), dtype=np.uint8)
+        self.assertFalse(detect_by_projection(roi).has_bar)
+        self.assertFalse(detect_by_contours(roi).has_bar)
+
+    def test_recorded_sequence_equivalent(self):
+        if not os.path.isdir(RECORDED_DIR):
+            self.skipTest("no recorded fishing ROI sequence")
+        for roi in load_roi_sequence(RECORDED_DIR):
+            self.assertEquivalent(roi, res_ratio=roi.shape[0] / 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# Test case
+import unittest
+
+import numpy as np
+
+from src.utils.FrameCache import FrameCache
+
+
+class TestFrameCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = FrameCache()
+        self.calls = 0
+
+    def compute(self, value=None):
+        def run():
+            self.calls += 1
+            return value
+        return run
+
+    def test_same_frame_hits(self):
+        frame = np.zeros((4, 4), dtype=np.uint8)
+        self.assertEqual(self.cache.get(frame, ('a', None, 0.8), self.compute('box')), 'box')
+        self.assertEqual(self.cache.get(frame, ('a', None, 0.8), self.compute('other')), 'box')
+        self.assertEqual((self.cache.hits, self.cache.misses, self.calls), (1, 1, 1))
+
+    def test_none_result_is_cached(self):
+        frame = np.zeros((4, 4), dtype=np.uint8)
+        self.cache.get(frame, 'a', self.compute())
+        self.cache.get(frame, 'a', self.compute())
+        self.assertEqual(self.calls, 1)
+
+    def test_new_frame_invalidates(self):
+        frame1 = np.zeros((4, 4), dtype=np.uint8)
+        frame2 = frame1.copy()
+        self.cache.get(frame1, 'a', self.compute(1))
+        self.assertEqual(self.cache.get(frame2, 'a', self.compute(2)), 2)
+        self.assertEqual(self.cache.get(frame1, 'a', self.compute(3)), 3)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_different_keys_miss(self):
+        frame = np.zeros((4, 4), dtype=np.uint8)
+        self.cache.get(frame, ('a', 0.8), self.compute(1))
+        self.cache.get(frame, ('a', 0.9), self.compute(2))
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(self.cache.hit_rate, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
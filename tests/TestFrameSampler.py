@@ -0,0 +1,72 @@
+# Test case
+import threading
+import time
+import unittest
+
+from src.utils.FrameSampler import FrameSampler
+
+
+class TestFrameSampler(unittest.TestCase):
+
+    def test_latest_frame_published(self):
+        counter = iter(range(1_000_000))
+        published = []
+        with FrameSampler(lambda: next(counter), fps=100, on_frame=published.append) as sampler:
+            time.sleep(0.2)
+        self.assertGreater(sampler.frames, 5)
+        self.assertEqual(published[-1], sampler.latest)
+        frames = sampler.frames
+        time.sleep(0.05)
+        self.assertEqual(sampler.frames, frames)
+
+    def test_reader_does_not_wait_for_capture(self):
+        release = threading.Event()
+
+        def slow_grab():
+            release.wait(1)
+            return object()
+
+        sampler = FrameSampler(slow_grab, fps=100).start()
+        start = time.perf_counter()
+        self.assertIsNone(sampler.latest)
+        self.assertLess(time.perf_counter() - start, 0.01)
+        release.set()
+        sampler.stop()
+
+    def test_grab_errors_are_counted(self):
+        def failing_grab():
+            raise RuntimeError("capture lost")
+
+        with FrameSampler(failing_grab, fps=100) as sampler:
+            time.sleep(0.05)
+        self.assertGreater(sampler.errors, 0)
+        self.assertIsNone(sampler.latest)
+
+    def test_wait_next_returns_each_new_frame(self):
+        counter = iter(range(1_000_000))
+        with FrameSampler(lambda: next(counter), fps=None) as sampler:
+            frame, seen, captured_at = sampler.wait_next(0, timeout=1)
+            self.assertIsNotNone(frame)
+            self.assertGreater(captured_at, 0)
+            next_frame, next_seen, _ = sampler.wait_next(seen, timeout=1)
+            self.assertGreater(next_seen, seen)
+            self.assertGreater(next_frame, frame)
+
+    def test_wait_next_times_out(self):
+        with FrameSampler(lambda: None, fps=100) as sampler:
+            self.assertEqual(sampler.wait_next(0, timeout=0.05), (None, 0, 0.0))
+
+    def test_unthrottled_backs_off_without_frames(self):
+        calls = []
+
+        def empty_grab():
+            calls.append(1)
+            return None
+
+        with FrameSampler(empty_grab, fps=None, idle_backoff=0.01):
+            time.sleep(0.1)
+        self.assertLess(len(calls), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# Test case
+import unittest
+
+import cv2
+import numpy as np
+
+from src.utils.IconArea import IconAreaMatcher, max_inverted_area
+
+
+def reference_invert_max_area(mat):
+    """BaseDNATask.invert_max_area_only 的面积部分 (原实现)。"""
+    gray = cv2.cvtColor(mat, cv2.COLOR_BGR2GRAY)
+    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY)
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(thresh)
+    areas = stats[1:, 4]
+    if len(areas) == 0:
+        return 0
+    max_region = (labels == np.argmax(areas) + 1).astype(np.uint8) * 255
+    _, _, stats2, _ = cv2.connectedComponentsWithStats(255 - max_region)
+    areas2 = stats2[1:, 4]
+    if len(areas2) == 0:
+        return 0
+    return int(np.max(areas2))
+
+
+def ring_icon(size=40, outer=16, inner=8):
+    img = np.zeros((size, size, 3), dtype=np.uint8)
+    cv2.circle(img, (size // 2, size // 2), outer, (200, 200, 200), -1)
+    cv2.circle(img, (size // 2, size // 2), inner, (0, 0, 0), -1)
+    return img
+
+
+class TestIconArea(unittest.TestCase):
+
+    def test_same_as_reference(self):
+        rng = np.random.default_rng(0)
+        samples = [ring_icon(), np.zeros((20, 20, 3), np.uint8), np.full((20, 20, 3), 255, np.uint8)]
+        for _ in range(20):
+            samples.append((rng.random((30, 30, 3)) > 0.6).astype(np.uint8) * 255)
+        for mat in samples:
+            self.assertEqual(max_inverted_area(mat), reference_invert_max_area(mat))
+
+    def test_matcher(self):
+        matcher = IconAreaMatcher()
+        template = ring_icon()
+        self.assertTrue(matcher.matches(template, ring_icon()))
+        self.assertFalse(matcher.matches(template, ring_icon(outer=19, inner=2)))
+        self.assertFalse(matcher.matches(template, np.full((40, 40, 3), 255, np.uint8)))
+
+    def test_reference_cached_per_template(self):
+        matcher = IconAreaMatcher()
+        template = ring_icon()
+        area = matcher.reference_area(template)
+        template[:] = 0
+        self.assertEqual(matcher.reference_area(template), area)
+        self.assertEqual(matcher.reference_area(ring_icon(outer=12)), reference_invert_max_area(ring_icon(outer=12)))
+
+
+if __name__ == '__main__':
+    unittest.main()
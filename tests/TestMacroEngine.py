@@ -0,0 +1,123 @@
+# Test case
+import json
+import os
+import unittest
+
+from src.utils.MacroEngine import (MacroPlayer, OP_DELAY, OP_INTERACT_DOWN, OP_INTERACT_UP, OP_KEY_DOWN, OP_KEY_UP,
+                                   OP_MOUSE_DOWN, OP_MOVE, OP_TRANSPORT, compile_actions)
+from src.utils.PrecisionTimer import PrecisionTimer
+
+ESCORT_PATHS = os.path.join('mod', 'builtin', 'escort_paths.json')
+
+
+class FakeTimer:
+    """记录等待目标的计时器，返回预设的迟到时间。"""
+
+    def __init__(self, lateness=None):
+        self.targets = []
+        self.lateness = lateness or {}
+
+    def wait_until(self, target):
+        self.targets.append(target)
+        return self.lateness.get(len(self.targets) - 1, 0.0)
+
+
+class TestMacroEngine(unittest.TestCase):
+
+    def test_absolute_script(self):
+        actions = [
+            {'type': 'key_down', 'key': 'SHIFT', 'time': 0.5},
+            {'type': 'key_up', 'key': 'shift', 'time': 0.7},
+            {'type': 'key_down', 'key': 'f', 'time': 1.0},
+            {'type': 'key_up', 'key': 'f', 'time': 1.1},
+            {'type': 'key_down', 'key': 'f4', 'time': 1.2},
+            {'type': 'key_up', 'key': 'f4', 'time': 1.3},
+            {'type': 'key_down', 'key': 'alt', 'time': 1.4},
+            {'type': 'delay', 'time': 1.5},
+            {'type': 'mouse_rotation', 'direction': 'left', 'angle': 3, 'sensitivity': 10, 'time': 1.6},
+        ]
+        macro = compile_actions(actions, key_map={'lshift': 'space'},
+                                scale_mouse=lambda dx, dy: (dx / 2, dy / 2), game_keys=True, normalize_keys=True,
+                                truncate_rotation=True)
+        self.assertEqual([(s.at, s.op, s.args) for s in macro], [
+            (0.5, OP_KEY_DOWN, ('space',)),
+            (0.7, OP_KEY_UP, ('space',)),
+            (1.0, OP_INTERACT_DOWN, ()),
+            (1.1, OP_INTERACT_UP, ()),
+            (1.2, OP_TRANSPORT, ()),
+            (1.5, OP_DELAY, ()),
+            (1.6, OP_MOVE, (-15, 0)),
+        ])
+
+    def test_relative_script(self):
+        actions = [
+            {'type': 'mouse_down', 'delay': 0.2, 'button': 'left'},
+            {'type': 'key_down', 'delay': 0.3, 'key': 'f'},
+            {'type': 'mouse_rotation', 'delay': 0.1, 'direction': 'up', 'angle': 69.5, 'sensitivity': 10},
+        ]
+        macro = compile_actions(actions, skip_first_delay=True)
+        self.assertEqual([s.at for s in macro], [0.0, 0.3, 0.4])
+        self.assertEqual(macro.steps[0].op, OP_MOUSE_DOWN)
+        self.assertEqual(macro.steps[1].args, ('f',))
+        self.assertEqual(macro.steps[2].args, (0, -695))
+
+    def test_escort_keys_and_rotation_unchanged(self):
+        # 护送路径原先不标准化按键，旋转像素在灵敏度换算后才截断
+        actions = [
+            {'type': 'key_down', 'delay': 0, 'key': 'shift'},
+            {'type': 'mouse_rotation', 'delay': 0, 'direction': 'right', 'angle': 2.55, 'sensitivity': 10},
+        ]
+        scale = lambda dx, dy: (dx * 1.5, dy * 1.5)
+        macro = compile_actions(actions, key_map={'lshift': 'space'}, scale_mouse=scale)
+        self.assertEqual(macro.steps[0].args, ('shift',))
+        self.assertEqual(macro.steps[1].args, (38, 0))
+        # 外部逻辑先取整 (25 -> 37.5)，并把 shift 标准化为 lshift 后映射
+        macro = compile_actions(actions, key_map={'lshift': 'space'}, scale_mouse=scale, normalize_keys=True,
+                                truncate_rotation=True)
+        self.assertEqual(macro.steps[0].args, ('space',))
+        self.assertEqual(macro.steps[1].args, (37, 0))
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            compile_actions([{'type': 'jump', 'time': 0}])
+        macro = compile_actions([{'type': 'jump', 'delay': 0}], strict=False)
+        self.assertEqual(len(macro), 0)
+        self.assertEqual(len(macro.skipped), 1)
+
+    def test_escort_paths_compile(self):
+        with open(ESCORT_PATHS, encoding='utf-8') as f:
+            paths = json.load(f)['paths']
+        for path in paths.values():
+            actions = path['data']
+            macro = compile_actions(actions, strict=False)
+            self.assertEqual(len(macro), len(actions))
+            self.assertAlmostEqual(macro.duration, sum(a.get('delay', 0) for a in actions))
+
+    def test_player_schedules_on_absolute_timeline(self):
+        macro = compile_actions([{'type': 'key_down', 'key': 'w', 'delay': 0.1}] * 4)
+        sent = []
+        timer = FakeTimer(lateness={1: 0.02, 2: 1.0})
+        player = MacroPlayer(timer, {OP_KEY_DOWN: sent.append})
+        player.play(macro)
+        self.assertEqual(sent, ['w'] * 4)
+        start = timer.targets[0] - 0.1
+        offsets = [round(t - start, 6) for t in timer.targets]
+        # 小的迟到不影响后续目标；大的迟到 (暂停) 平移时间轴
+        self.assertEqual(offsets, [0.1, 0.2, 0.3, 1.4])
+        self.assertEqual(player.resyncs, 1)
+
+    def test_player_reports_errors(self):
+        macro = compile_actions([{'type': 'key_down', 'key': 'w', 'time': 0}])
+        errors = []
+
+        def fail(key):
+            raise RuntimeError(key)
+
+        player = MacroPlayer(PrecisionTimer(), {OP_KEY_DOWN: fail})
+        with self.assertRaises(RuntimeError):
+            player.play(macro, on_error=lambda step, e: errors.append(step.args))
+        self.assertEqual(errors, [('w',)])
+
+
+if __name__ == '__main__':
+    unittest.main()
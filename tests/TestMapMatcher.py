@@ -0,0 +1,119 @@
+# Test case
+import glob
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from src.utils.MapMatcher import ScreenPyramid, match_template_exhaustive, match_template_pyramid, score_candidates
+
+MAP_FOLDER = os.path.join('mod', '示例-无巧手30火突破素材(1080p) by望目', 'map')
+
+
+def load_gray(path):
+    return cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+
+
+def make_screen(template, x, y, seed, width=1920, height=1080):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 256, (height // 8, width // 8), dtype=np.uint8)
+    screen = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    th, tw = template.shape[:2]
+    screen[y:y + th, x:x + tw] = template
+    return screen
+
+
+class TestMapMatcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        files = sorted(glob.glob(os.path.join(MAP_FOLDER, '*.png')))
+        cls.templates = {os.path.basename(f): load_gray(f) for f in files}
+
+    def test_confidence_equivalence(self):
+        names = list(self.templates.keys())
+        rng = np.random.default_rng(1)
+        for seed, target in enumerate(names[::4]):
+            template = self.templates[target]
+            th, tw = template.shape[:2]
+            x = int(rng.integers(0, 1920 - tw))
+            y = int(rng.integers(0, 1080 - th))
+            screen = make_screen(template, x, y, seed)
+            pyramid = ScreenPyramid(screen)
+
+            best_exhaustive = best_pyramid = None
+            for name, candidate in self.templates.items():
+                conf_exhaustive, _ = match_template_exhaustive(screen, candidate)
+                conf_pyramid, _ = match_template_pyramid(pyramid, candidate)
+                # 金字塔只评估位置子集，置信度不会高于全图匹配
+                self.assertLessEqual(conf_pyramid, conf_exhaustive + 1e-4, name)
+                if best_exhaustive is None or conf_exhaustive > best_exhaustive[1]:
+                    best_exhaustive = (name, conf_exhaustive)
+                if best_pyramid is None or conf_pyramid > best_pyramid[1]:
+                    best_pyramid = (name, conf_pyramid)
+
+            conf_exhaustive, loc_exhaustive = match_template_exhaustive(screen, template)
+            conf_pyramid, loc_pyramid = match_template_pyramid(pyramid, template)
+            self.assertAlmostEqual(conf_pyramid, conf_exhaustive, places=3)
+            self.assertEqual(loc_pyramid, loc_exhaustive)
+            self.assertEqual(best_pyramid[0], best_exhaustive[0])
+            self.assertAlmostEqual(best_pyramid[1], best_exhaustive[1], places=3)
+
+    def test_scaled_screen(self):
+        template = next(iter(self.templates.values()))
+        scaled = cv2.resize(template, (0, 0), fx=1440 / 1080, fy=1440 / 1080, interpolation=cv2.INTER_LINEAR)
+        screen = make_screen(scaled, 1000, 300, 7, width=2560, height=1440)
+        conf_exhaustive, _ = match_template_exhaustive(screen, scaled)
+        conf_pyramid, _ = match_template_pyramid(ScreenPyramid(screen), scaled)
+        self.assertAlmostEqual(conf_pyramid, conf_exhaustive, places=3)
+
+    def test_small_template_falls_back(self):
+        screen = make_screen(np.zeros((1, 1), dtype=np.uint8), 0, 0, 3)
+        template = screen[500:540, 800:840].copy()
+        conf_exhaustive, loc_exhaustive = match_template_exhaustive(screen, template)
+        conf_pyramid, loc_pyramid = match_template_pyramid(ScreenPyramid(screen), template)
+        self.assertEqual(loc_pyramid, loc_exhaustive)
+        self.assertAlmostEqual(conf_pyramid, conf_exhaustive, places=5)
+
+    def test_parallel_scoring_equivalence(self):
+        names = list(self.templates.keys())
+        target = names[len(names) // 2]
+        screen = make_screen(self.templates[target], 600, 200, 11)
+        pyramid = ScreenPyramid(screen)
+
+        def score(name):
+            return match_template_pyramid(pyramid, self.templates[name])[0]
+
+        sequential = score_candidates(names, score)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parallel = score_candidates(names, score, executor)
+            certain = score_candidates(names, score, executor, certain_conf=0.95)
+        self.assertEqual(sequential[0], target)
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(certain[0], target)
+
+    def test_certain_match_cancels_rest(self):
+        started = []
+        lock = threading.Lock()
+
+        def score(name):
+            with lock:
+                started.append(name)
+            return 1.0 if name == 0 else 0.5
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            name, conf = score_candidates(list(range(50)), score, executor, certain_conf=0.95)
+        self.assertEqual((name, conf), (0, 1.0))
+        self.assertLess(len(started), 50)
+
+    def test_tie_keeps_first_candidate(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(score_candidates(['a', 'b', 'c'], lambda name: 0.7, executor), ('a', 0.7))
+        self.assertEqual(score_candidates(['a', 'b'], lambda name: 0.0, min_conf=0.0), (None, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+# Test case
+import os
+import tempfile
+import unittest
+
+from src.utils.MapRoiStore import MapRoiStore
+
+
+class TestMapRoiStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_location_scales_with_resolution(self):
+        store = MapRoiStore()
+        store.record('A-1', (600, 300), 1920, 1080)
+        self.assertIn('A-1', store)
+        self.assertEqual(store.get('A-1', 1920, 1080), (600, 300))
+        self.assertEqual(store.get('A-1', 2560, 1440), (800, 400))
+        self.assertIsNone(store.get('A-2', 1920, 1080))
+
+    def test_persist_only_when_changed(self):
+        store = MapRoiStore.for_mod(self.tmp.name)
+        self.assertFalse(store.save())
+        store.record('A', (10, 20), 1920, 1080)
+        self.assertTrue(store.save())
+        self.assertFalse(store.save())
+
+        reloaded = MapRoiStore.for_mod(self.tmp.name)
+        self.assertEqual(reloaded.get('A', 1920, 1080), (10, 20))
+        reloaded.record('A', (10, 20), 1920, 1080)
+        self.assertFalse(reloaded.save())
+
+    def test_corrupt_file_is_ignored(self):
+        with open(os.path.join(self.tmp.name, 'roi.json'), 'w') as f:
+            f.write('{')
+        self.assertEqual(len(MapRoiStore.for_mod(self.tmp.name)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
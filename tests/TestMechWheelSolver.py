@@ -0,0 +1,76 @@
+# Test case
+import unittest
+from collections import deque
+
+from src.utils.MechWheelSolver import CONTROL_PATTERNS, solve, solve_mask, state_mask, tentacle_offsets
+
+
+def bfs_solve(mech_wheel, control):
+    """原 AutoRouletteTask 的 BFS 实现 (不含奇偶性预检)，作为最少操作次数的对照。"""
+    offsets = tentacle_offsets(control)
+    num_wheels = len(mech_wheel)
+    initial_state = tuple(mech_wheel)
+    target_state = tuple([True] * num_wheels)
+    if initial_state == target_state:
+        return []
+    queue = deque([(initial_state, [])])
+    visited = {initial_state}
+    while queue:
+        current_state, path = queue.popleft()
+        for i in range(num_wheels):
+            next_state_list = list(current_state)
+            for offset in offsets:
+                flip_index = (i + offset) % num_wheels
+                next_state_list[flip_index] = not next_state_list[flip_index]
+            next_state = tuple(next_state_list)
+            if next_state == target_state:
+                return path + [i]
+            if next_state not in visited:
+                visited.add(next_state)
+                queue.append((next_state, path + [i]))
+    return None
+
+
+def apply(mech_wheel, control, solution):
+    state = list(mech_wheel)
+    for position in solution:
+        for offset in tentacle_offsets(control):
+            index = (position + offset) % len(state)
+            state[index] = not state[index]
+    return state
+
+
+class TestMechWheelSolver(unittest.TestCase):
+
+    def test_tentacle_offsets(self):
+        self.assertEqual(tentacle_offsets([0]), (0,))
+        self.assertEqual(tentacle_offsets([0, 60, 0]), (0, 1))
+        self.assertEqual(tentacle_offsets([0, 120, 0]), (0, 2))
+
+    def test_matches_bfs_length(self):
+        for num_wheels in range(1, 8):
+            for control in CONTROL_PATTERNS:
+                for mask in range(1 << num_wheels):
+                    wheel = [not (mask >> i & 1) for i in range(num_wheels)]
+                    expected = bfs_solve(wheel, control)
+                    actual = solve(wheel, control)
+                    if expected is None:
+                        self.assertIsNone(actual)
+                        continue
+                    self.assertEqual(len(actual), len(expected))
+                    self.assertTrue(all(apply(wheel, control, actual)))
+
+    def test_cached_result_is_copied(self):
+        wheel = [False, False, True, True, True, True]
+        solution = solve(wheel, [0, 60, 0])
+        self.assertEqual(solution, [0])
+        solution.pop()
+        self.assertEqual(solve(wheel, [0, 60, 0]), [0])
+        self.assertGreater(solve_mask.cache_info().hits, 0)
+
+    def test_state_mask(self):
+        self.assertEqual(state_mask([True, False, False]), 0b110)
+
+
+if __name__ == '__main__':
+    unittest.main()
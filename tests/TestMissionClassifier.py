@@ -0,0 +1,78 @@
+# Test case
+import unittest
+
+import numpy as np
+
+from src.utils.MissionClassifier import InterfaceCheck, MissionInterfaceClassifier, MissionState, merge_rois
+
+
+def make_icon(seed, size=16):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (size, size, 3), dtype=np.uint8)
+
+
+class TestMissionClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = np.zeros((200, 300, 3), dtype=np.uint8)
+        self.start = make_icon(1)
+        self.continue_icon = make_icon(2)
+        self.quit = make_icon(3)
+        self.classifier = MissionInterfaceClassifier([
+            InterfaceCheck(MissionState.LETTER, 'start_icon', self.start, (0, 0, 60, 60)),
+            InterfaceCheck(MissionState.START, 'start_icon', self.start, (100, 100, 160, 160)),
+            InterfaceCheck(MissionState.CONTINUE, 'ingame_continue_icon', self.continue_icon, (100, 100, 160, 160)),
+            InterfaceCheck(MissionState.ESC_MENU, 'quit_big_icon', self.quit, (200, 0, 320, 60)),
+        ])
+
+    def test_none_on_empty_frame(self):
+        self.assertEqual(self.classifier.classify(self.frame), (MissionState.NONE, []))
+
+    def test_hit_returns_state_and_box(self):
+        self.frame[120:136, 130:146] = self.continue_icon
+        state, hits = self.classifier.classify(self.frame)
+        self.assertEqual(state, MissionState.CONTINUE)
+        self.assertEqual(len(hits), 1)
+        hit = hits[0]
+        self.assertEqual((hit.name, hit.x, hit.y, hit.width, hit.height), ('ingame_continue_icon', 130, 120, 16, 16))
+        self.assertGreater(hit.confidence, 0.99)
+
+    def test_priority_follows_check_order(self):
+        self.frame[10:26, 10:26] = self.start
+        self.frame[20:36, 240:256] = self.quit
+        state, _ = self.classifier.classify(self.frame)
+        self.assertEqual(state, MissionState.LETTER)
+
+    def test_roi_clipped_to_frame(self):
+        self.frame[40:56, 280:296] = self.quit
+        state, hits = self.classifier.classify(self.frame)
+        self.assertEqual(state, MissionState.ESC_MENU)
+        self.assertEqual((hits[0].x, hits[0].y), (280, 40))
+
+    def test_prefilter_skips_color_matches(self):
+        self.classifier.classify(self.frame)
+        self.assertEqual(self.classifier.color_matches, 0)
+        self.assertEqual(self.classifier.gray_matches, 4)
+        self.frame[120:136, 130:146] = self.continue_icon
+        self.classifier.classify(self.frame)
+        # 只有命中的检测做了彩色确认
+        self.assertEqual(self.classifier.color_matches, 1)
+
+    def test_prefilter_matches_color_only(self):
+        color_only = MissionInterfaceClassifier(self.classifier.checks, prefilter_margin=None)
+        rng = np.random.default_rng(5)
+        for icon, (y, x) in ((self.start, (10, 10)), (self.continue_icon, (130, 110)), (self.quit, (5, 250))):
+            frame = rng.integers(0, 60, self.frame.shape, dtype=np.uint8)
+            frame[y:y + 16, x:x + 16] = icon
+            self.assertEqual(self.classifier.classify(frame), color_only.classify(frame))
+        self.assertEqual(color_only.gray_matches, 0)
+        self.assertGreater(color_only.color_matches, self.classifier.color_matches)
+
+    def test_merge_rois(self):
+        regions, owners = merge_rois([(0, 0, 10, 10), (50, 50, 60, 60), (5, 5, 20, 20), (15, 15, 30, 25)])
+        self.assertEqual(regions, [(0, 0, 30, 25), (50, 50, 60, 60)])
+        self.assertEqual(owners, [0, 1, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,10 @@ from src.config import config
 from ok.test.TaskTestCase import TaskTestCase
 
 from src.tasks.CommissionsTask import CommissionsTask
+from src.utils.MissionClassifier import MissionState
+
+INTERFACE_IMAGES = ['tests/images/iface_cont.png', 'tests/images/iface_drop.png', 'tests/images/iface_esc.png',
+                    'tests/images/iface_ltr.png', 'tests/images/iface_start.png']
 
 
 class TestMissonInterface(TaskTestCase):
@@ -48,6 +52,33 @@ class TestMissonInterface(TaskTestCase):
         self.assertIsNotNone(feature)
         self.logger.info(feature)
 
+    def find_one_state(self):
+        # 与原 handle_mission_interface 中逐个 find_xxx 的判断顺序一致
+        task = self.task
+        if task.find_letter_reward_btn():
+            return MissionState.LETTER_REWARD
+        if task.find_letter_interface():
+            return MissionState.LETTER
+        if task.find_drop_item() or task.find_drop_item(800):
+            return MissionState.DROP_RATE
+        if task.find_retry_btn() or task.find_bottom_start_btn() or task.find_big_bottom_start_btn():
+            return MissionState.START
+        if task.find_continue_btn():
+            return MissionState.CONTINUE
+        if task.find_esc_menu():
+            return MissionState.ESC_MENU
+        return MissionState.NONE
+
+    def test_classifier_matches_find_one(self):
+        for image in INTERFACE_IMAGES:
+            with self.subTest(image=image):
+                self.set_image(image)
+                expected = self.find_one_state()
+                self.assertNotEqual(expected, MissionState.NONE)
+                state, hits = self.task.classify_mission_interface()
+                self.assertEqual(state, expected)
+                self.logger.info(f'{image} {state} {hits}')
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,45 @@
+# Test case
+import glob
+import os
+import re
+import unittest
+
+from src.utils.ModNodeIndex import ModNodeIndex
+
+MAP_FOLDER = os.path.join('mod', '示例-无巧手30火突破素材(1080p) by望目', 'map')
+
+
+def legacy_candidates(names, index, pattern=re.compile(r'[a-zA-Z]$')):
+    """match_map 原有的逐节点过滤逻辑。"""
+    result = []
+    for name in names:
+        if index is None and not pattern.search(name):
+            continue
+        if index is not None:
+            if index == name or not name.startswith(index):
+                continue
+            suffix = name[len(index):]
+            if not suffix.startswith('-') or suffix.count('-') >= 2 or len(suffix) > 4:
+                continue
+        result.append(name)
+    return result
+
+
+class TestModNodeIndex(unittest.TestCase):
+
+    def test_matches_legacy_filter(self):
+        names = [os.path.basename(f).removesuffix('.png') for f in glob.glob(os.path.join(MAP_FOLDER, '*.png'))]
+        names += ['60角色-A', '60角色-A-1', '60角色-A-10', '60角色-A-1-1', '60角色-A-1-10', '60角色-A-1-1-1',
+                  '60角色-A-12345', '60角色-B', '60角色-B-1', 'X-', 'X--1']
+        names = sorted(names, key=lambda x: (len(x), x))
+        index = ModNodeIndex(names)
+        for parent in [None] + names + ['不存在']:
+            self.assertEqual(index.candidates(parent), legacy_candidates(names, parent), parent)
+
+    def test_delay_nodes(self):
+        scripts = {'A': {'actions': [{'type': 'delay', 'time': 1}]}, 'A-1': {'actions': [{'type': 'key_down'}]}}
+        self.assertEqual(ModNodeIndex(['A', 'A-1'], scripts).delay_nodes, {'A'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# Test case
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.utils.ModPack import ModPack, compile_mod, load_gray_png
+from src.utils.TemplateCache import TemplateCache, scale_template
+
+MOD_FOLDER = os.path.join('mod', '示例-无巧手30火突破素材(1080p) by望目')
+
+
+class TestModPack(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.mod_dir = os.path.join(self.tmp.name, 'demo')
+        shutil.copytree(MOD_FOLDER, self.mod_dir)
+        compile_mod(self.mod_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_templates_match_loose_files(self):
+        pack = ModPack.open(self.mod_dir)
+        self.assertIsNotNone(pack)
+        map_folder = os.path.join(self.mod_dir, 'map')
+        names = sorted((f.removesuffix('.png') for f in os.listdir(map_folder)), key=lambda x: (len(x), x))
+        self.assertEqual(list(pack.templates().keys()), names)
+        for name in names[:5]:
+            gray = load_gray_png(os.path.join(map_folder, f'{name}.png'))
+            for height in (1440, 1080, 900):
+                self.assertTrue(np.array_equal(pack.template(name, height), scale_template(gray, height)))
+        self.assertEqual(set(pack.scripts), {f.removesuffix('.json') for f in os.listdir(os.path.join(self.mod_dir, 'scripts'))})
+        pack.close()
+
+    def test_template_cache_uses_pack(self):
+        pack = ModPack.open(self.mod_dir)
+        cache = TemplateCache()
+        cache.register('demo', pack.templates(), None, pack)
+        name = pack.names[0]
+        self.assertIs(cache.get('demo', name, 1440), pack.template(name, 1440))
+        scaled = cache.get('demo', name, 720)
+        self.assertTrue(np.array_equal(scaled, scale_template(pack.template(name, 1080), 720)))
+
+    def test_close_releases_mapping_after_cache_release(self):
+        pack = ModPack.open(self.mod_dir)
+        cache = TemplateCache()
+        cache.register('demo', pack.templates(), None, pack)
+        for name in pack.names[:3]:
+            cache.get('demo', name, 1440)
+            cache.get_small('demo', name, 1440)
+        mapping = pack._mmap
+        # 缓存仍持有视图时无法释放，保留映射
+        with self.assertLogs('src.utils.ModPack', level='WARNING'):
+            self.assertFalse(pack.close())
+        self.assertTrue(pack.mapped)
+        self.assertFalse(mapping.closed)
+        # 与 ImportTask.close_mod_pack 相同：先清空模板缓存再关闭
+        cache.clear()
+        self.assertTrue(pack.close())
+        self.assertTrue(mapping.closed)
+        self.assertFalse(pack.mapped)
+        # 关闭后仍可重新映射
+        self.assertIsNotNone(cache.get('demo', pack.names[0], 1440))
+        cache.release('demo')
+        self.assertTrue(pack.close())
+
+    def test_stale_pack_is_ignored(self):
+        script_folder = os.path.join(self.mod_dir, 'scripts')
+        script = os.path.join(script_folder, os.listdir(script_folder)[0])
+        future = time.time() + 10
+        os.utime(script, (future, future))
+        self.assertIsNone(ModPack.open(self.mod_dir))
+        self.assertIsNotNone(ModPack.open(self.mod_dir, check_stale=False))
+
+    def test_pack_without_sources_is_not_stale(self):
+        shutil.rmtree(os.path.join(self.mod_dir, 'map'))
+        shutil.rmtree(os.path.join(self.mod_dir, 'scripts'))
+        pack = ModPack.open(self.mod_dir)
+        self.assertIsNotNone(pack)
+        self.assertTrue(pack.names)
+        self.assertTrue(pack.scripts)
+        pack.close()
+
+    def test_missing_folder_only_ignores_its_files(self):
+        shutil.rmtree(os.path.join(self.mod_dir, 'scripts'))
+        self.assertIsNotNone(ModPack.open(self.mod_dir))
+        map_folder = os.path.join(self.mod_dir, 'map')
+        os.remove(os.path.join(map_folder, os.listdir(map_folder)[0]))
+        self.assertIsNone(ModPack.open(self.mod_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
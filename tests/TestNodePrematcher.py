@@ -0,0 +1,57 @@
+# Test case
+import unittest
+
+import numpy as np
+
+from src.utils.MapMatcher import score_candidates
+from src.utils.NodePrematcher import NodePrematcher
+
+
+def make_frame(best):
+    frame = np.zeros((1, 1), dtype=np.uint8)
+    frame[0, 0] = best
+    return frame
+
+
+def match_frame(frame, candidates, min_conf):
+    best = int(frame[0, 0])
+    return score_candidates(candidates, lambda name: 0.9 if name == best else 0.3, min_conf=min_conf)
+
+
+class TestNodePrematcher(unittest.TestCase):
+
+    def test_stable_after_consecutive_frames(self):
+        prematcher = NodePrematcher([1, 2, 3], match_frame, stable_frames=3)
+        for best in (1, 2, 2):
+            prematcher.feed(make_frame(best))
+        self.assertEqual(prematcher.stable_match()[0], None)
+        prematcher.feed(make_frame(2))
+        self.assertEqual(prematcher.stable_match(), (2, 0.9))
+
+    def test_same_frame_scored_once(self):
+        prematcher = NodePrematcher([1], match_frame)
+        frame = make_frame(1)
+        self.assertTrue(prematcher.feed(frame))
+        self.assertFalse(prematcher.feed(frame))
+        self.assertFalse(prematcher.feed(None))
+        self.assertEqual(prematcher.frames, 1)
+
+    def test_requires_frame_after_mark(self):
+        prematcher = NodePrematcher([1, 2], match_frame, stable_frames=2)
+        prematcher.feed(make_frame(1))
+        prematcher.feed(make_frame(1))
+        end_mark = prematcher.frames
+        self.assertEqual(prematcher.stable_match(after=end_mark)[0], None)
+        prematcher.feed(make_frame(1))
+        self.assertEqual(prematcher.stable_match(after=end_mark)[0], 1)
+
+    def test_low_confidence_resets_streak(self):
+        prematcher = NodePrematcher([1, 2], match_frame, stable_frames=2)
+        prematcher.feed(make_frame(1))
+        prematcher.feed(make_frame(9))
+        prematcher.feed(make_frame(1))
+        self.assertEqual(prematcher.stable_match()[0], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
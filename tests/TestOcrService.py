@@ -0,0 +1,126 @@
+# Test case
+import unittest
+
+import numpy as np
+
+from src.utils.OcrService import OcrService
+
+
+class ManualExecutor:
+    """记录提交的任务，由测试决定何时执行。"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+    def run_next(self):
+        fn, args = self.jobs.pop(0)
+        fn(*args)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame_of(value):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+
+class TestOcrService(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ManualExecutor()
+        self.clock = FakeClock()
+        self.seen = []
+
+        def ocr(frame, region):
+            self.seen.append((region.name, int(frame[0, 0])))
+            return [str(int(frame[0, 0]))]
+
+        self.service = OcrService(self.executor.submit, ocr, clock=self.clock)
+        self.service.register('a', None, parse=lambda texts: int(texts[0]), interval=0)
+        self.service.register('b', None, parse=lambda texts: int(texts[0]), interval=1.0)
+
+    def test_batch_and_value(self):
+        self.service.update(frame_of(1))
+        self.assertEqual(len(self.executor.jobs), 1)
+        self.assertIsNone(self.service.value('a'))
+        self.executor.run_next()
+        self.assertEqual(self.seen, [('a', 1), ('b', 1)])
+        self.assertEqual(self.service.value('a'), 1)
+        self.clock.now = 0.3
+        self.assertAlmostEqual(self.service.age('a'), 0.3)
+        self.assertIsNone(self.service.value('a', max_age=0.1))
+
+    def test_latest_wins_while_busy(self):
+        self.service.update(frame_of(1))
+        self.service.update(frame_of(2))
+        self.service.update(frame_of(3))
+        self.assertEqual(len(self.executor.jobs), 1)
+        self.assertEqual(self.service.coalesced, 1)
+        self.executor.run_next()
+        # 完成后立即用最新一帧提交下一批
+        self.assertEqual(len(self.executor.jobs), 1)
+        self.executor.run_next()
+        self.assertEqual(self.service.value('a'), 3)
+        self.assertNotIn(('a', 2), self.seen)
+
+    def test_interval(self):
+        self.service.update(frame_of(1))
+        self.executor.run_next()
+        self.clock.now = 0.5
+        self.service.update(frame_of(2))
+        self.executor.run_next()
+        self.assertEqual((self.service.value('a'), self.service.value('b')), (2, 1))
+
+    def test_reset_drops_in_flight_result(self):
+        self.service.update(frame_of(1))
+        self.service.reset('a')
+        self.executor.run_next()
+        self.assertIsNone(self.service.value('a'))
+        self.assertEqual(self.service.value('b'), 1)
+
+    def test_invalid_parse_keeps_previous_value(self):
+        self.service.register('c', None, parse=lambda texts: None if texts[0] == '9' else int(texts[0]), interval=0)
+        self.service.update(frame_of(1), names=('c',))
+        self.executor.run_next()
+        self.service.update(frame_of(9), names=('c',))
+        self.executor.run_next()
+        self.assertEqual(self.service.value('c'), 1)
+
+    def test_error_does_not_block(self):
+        errors = []
+        service = OcrService(self.executor.submit, lambda frame, region: 1 / 0,
+                             on_error=lambda region, e: errors.append(region.name))
+        service.register('a', None, interval=0)
+        service.update(frame_of(1))
+        self.executor.run_next()
+        service.update(frame_of(2))
+        self.assertEqual(len(self.executor.jobs), 1)
+        self.assertEqual(errors, ['a'])
+
+    def test_copies_only_crop(self):
+        crops = []
+
+        class Region:
+            x, y, width, height = 10, 20, 30, 5
+
+        service = OcrService(self.executor.submit, lambda crop, region: crops.append(crop) or ['1'])
+        service.register('r', Region(), interval=0)
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        service.update(frame)
+        self.executor.run_next()
+        self.assertEqual(crops[0].shape, (5, 30, 3))
+        self.assertFalse(np.shares_memory(crops[0], frame))
+        self.assertEqual((service.copies, service.copied_bytes, service.full_frame_bytes), (1, 450, frame.nbytes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# Test case
+import time
+import unittest
+
+from src.utils.PrecisionTimer import JitterStats, PrecisionTimer
+
+
+class TestPrecisionTimer(unittest.TestCase):
+
+    def test_wait_precision(self):
+        timer = PrecisionTimer()
+        for delay in (0.001, 0.005, 0.03, 0.05):
+            start = time.perf_counter()
+            jitter = timer.wait(delay)
+            elapsed = time.perf_counter() - start
+            self.assertGreaterEqual(jitter, 0.0)
+            self.assertGreaterEqual(elapsed, delay)
+            self.assertLess(jitter, 0.005)
+        self.assertEqual(timer.stats.count, 4)
+
+    def test_low_cpu(self):
+        timer = PrecisionTimer()
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for _ in range(10):
+            timer.wait(0.03)
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        # 忙等时 CPU 时间约等于墙钟时间
+        self.assertLess(cpu, wall * 0.5)
+
+    def test_coarse_sleep_is_used(self):
+        calls = []
+
+        def coarse_sleep(timeout):
+            calls.append(timeout)
+            time.sleep(timeout)
+
+        timer = PrecisionTimer(coarse_sleep=coarse_sleep, coarse_margin=0.02)
+        timer.wait(0.05)
+        timer.wait(0.01)
+        self.assertEqual(len(calls), 1)
+        self.assertAlmostEqual(calls[0], 0.03, delta=0.005)
+
+    def test_past_target_returns_immediately(self):
+        timer = PrecisionTimer(coarse_sleep=lambda timeout: self.fail("不应等待"))
+        self.assertGreater(timer.wait_until(time.perf_counter() - 0.01), 0.0)
+
+    def test_stats(self):
+        stats = JitterStats(window=3)
+        for value in (0.001, 0.002, 0.003, 0.004):
+            stats.add(value)
+        self.assertEqual(stats.count, 4)
+        self.assertAlmostEqual(stats.mean, 0.003)
+        self.assertAlmostEqual(stats.max_late, 0.004)
+        self.assertAlmostEqual(stats.percentile(0.95), 0.004)
+
+
+if __name__ == '__main__':
+    unittest.main()
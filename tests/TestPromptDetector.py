@@ -0,0 +1,81 @@
+# Test case
+import unittest
+
+import cv2
+import numpy as np
+
+from src.utils.PromptDetector import PromptDetector, benchmark
+
+
+def prompt_image(text="space"):
+    image = np.full((33, 85, 3), 40, dtype=np.uint8)
+    cv2.putText(image, text, (5, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return image
+
+
+class TestPromptDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        def confirm(crop):
+            self.calls.append(crop)
+            return crop[:, :, 1].mean() > 45
+
+        self.now = 0.0
+        self.detector = PromptDetector(confirm, clock=lambda: self.now)
+
+    def test_dark_region_rejected_without_ocr(self):
+        self.assertFalse(self.detector.check(np.full((33, 85, 3), 40, dtype=np.uint8)))
+        self.assertEqual((self.detector.rejects, len(self.calls)), (1, 0))
+
+    def test_confirmed_prompt_reused(self):
+        for _ in range(3):
+            self.assertTrue(self.detector.check(prompt_image()))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.detector.hits, 1)
+
+    def test_single_positive_not_cached(self):
+        answers = iter([True, False, False])
+        self.detector.confirm = lambda crop: self.calls.append(crop) or next(answers)
+        self.assertTrue(self.detector.check(prompt_image()))
+        # 单次误判不会被重放
+        self.assertFalse(self.detector.check(prompt_image()))
+        self.assertEqual(len(self.calls), 2)
+        self.assertFalse(self.detector.positives)
+
+    def test_positive_revalidated_after_max_age(self):
+        self.detector.check(prompt_image())
+        self.detector.check(prompt_image())
+        self.now = self.detector.max_age + 1
+        self.detector.confirm = lambda crop: self.calls.append(crop) or False
+        self.assertFalse(self.detector.check(prompt_image()))
+        self.assertEqual(self.detector.revalidations, 1)
+        self.assertFalse(self.detector.positives)
+        self.assertFalse(self.detector.check(prompt_image()))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_negative_remembered(self):
+        bright = np.full((33, 85, 3), 40, dtype=np.uint8)
+        bright[:, :3] = 255
+        self.detector.confirm = lambda crop: self.calls.append(crop) or False
+        self.assertFalse(self.detector.check(bright))
+        self.assertFalse(self.detector.check(bright.copy()))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_ratio_band_after_calibration(self):
+        self.detector.check(prompt_image())
+        self.detector.check(prompt_image())
+        flooded = np.full((33, 85, 3), 255, dtype=np.uint8)
+        self.assertFalse(self.detector.check(flooded))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_benchmark(self):
+        stats = benchmark(self.detector, [prompt_image()], ocr=lambda crop: None, repeat=20)
+        self.assertGreater(stats['detector'], 0)
+        self.assertGreater(stats['ocr'], 0)
+        self.assertEqual(stats['ocr_calls'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
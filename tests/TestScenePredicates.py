@@ -0,0 +1,69 @@
+# Test case
+import unittest
+from collections import namedtuple
+
+from src.utils.ScenePredicates import ScenePredicates
+
+Box = namedtuple('Box', ['x', 'y', 'width', 'height'])
+
+
+class FakeTriggerTask:
+    """只用到 scene 的触发任务：各自带检测函数，计数实际求值次数。"""
+
+    def __init__(self, scene, calls):
+        self.scene = scene
+        self.calls = calls
+
+    def in_team(self):
+        self.calls['in_team'] += 1
+        return False
+
+    def space_prompt(self):
+        self.calls['space'] += 1
+        return True
+
+    def run(self, box):
+        if self.scene.in_team(self.in_team):
+            return None
+        return self.scene.prompt('space', box, self.space_prompt)
+
+
+class TestScenePredicates(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = ScenePredicates()
+        self.calls = {'in_team': 0, 'space': 0}
+        self.box = Box(10, 20, 30, 40)
+
+    def test_tasks_share_predicates_on_same_frame(self):
+        first, second = FakeTriggerTask(self.scene, self.calls), FakeTriggerTask(self.scene, self.calls)
+        self.assertTrue(first.run(self.box))
+        self.assertTrue(second.run(Box(10, 20, 30, 40)))
+        self.assertEqual(self.calls, {'in_team': 1, 'space': 1})
+        self.assertEqual(self.scene.stats['in_team'].evaluations, 1)
+        self.assertEqual(self.scene.stats['in_team'].hits, 1)
+
+    def test_new_frame_reevaluates(self):
+        task = FakeTriggerTask(self.scene, self.calls)
+        task.run(self.box)
+        self.scene.clear()
+        task.run(self.box)
+        self.assertEqual(self.calls, {'in_team': 2, 'space': 2})
+
+    def test_prompt_keyed_on_kind_and_roi(self):
+        task = FakeTriggerTask(self.scene, self.calls)
+        task.run(self.box)
+        task.run(Box(11, 20, 30, 40))
+        self.scene.prompt('f', self.box, lambda: None)
+        self.assertEqual(self.calls['space'], 2)
+        self.assertEqual(len([name for name in self.scene.stats if name.endswith('@10,20,30x40')]), 2)
+
+    def test_none_result_is_cached(self):
+        calls = []
+        self.scene.interact_prompt(lambda: calls.append(1))
+        self.assertIsNone(self.scene.interact_prompt(lambda: calls.append(1)))
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# Test case
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from src.utils.TemplateCache import TemplateCache, scale_template
+
+
+class TestTemplateCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.map_folder = os.path.join(self.tmp.name, 'demo', 'map')
+        os.makedirs(self.map_folder)
+        rng = np.random.default_rng(0)
+        self.templates = {'A': rng.integers(0, 256, (200, 200), dtype=np.uint8)}
+        cv2.imwrite(os.path.join(self.map_folder, 'A.png'), self.templates['A'])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scale_once_per_height(self):
+        cache = TemplateCache()
+        cache.register('demo', self.templates, self.map_folder)
+        first = cache.get('demo', 'A', 1440)
+        self.assertIs(cache.get('demo', 'A', 1440), first)
+        self.assertTrue(np.array_equal(first, scale_template(self.templates['A'], 1440)))
+        self.assertIs(cache.get('demo', 'A', 1080), self.templates['A'])
+        self.assertIsNot(cache.get('demo', 'A', 1440), first)
+
+    def test_persist_to_disk(self):
+        cache = TemplateCache()
+        cache.persist = True
+        cache.register('demo', self.templates, self.map_folder)
+        scaled = cache.get('demo', 'A', 900)
+        cache_file = os.path.join(self.tmp.name, 'demo', '.cache', '900', 'A.npy')
+        self.assertTrue(os.path.exists(cache_file))
+
+        reloaded = TemplateCache()
+        reloaded.persist = True
+        reloaded.register('demo', self.templates, self.map_folder)
+        self.assertTrue(np.array_equal(reloaded.get('demo', 'A', 900), scaled))
+
+
+if __name__ == '__main__':
+    unittest.main()